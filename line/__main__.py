@@ -14,6 +14,7 @@ line: Visualizing sequential data smartly.
 Available options are:
 -e, --eval: Entering evaluation mode, where args will be treated as commands;
 -p, --plot: Entering plotting mode, where args will be treated as arguments of command `plot`;
+--batch: Defer style computing and rendering until saving or displaying (same as --render-on-demand=true);
 -h, --help: Display this help.
 By default, reads script files from args.
 Additional options can be shown by `line -e 'show option'`'''
@@ -30,6 +31,8 @@ Additional options can be shown by `line -e 'show option'`'''
         elif arg in ('-h', '--help'):
             print(help_str)
             exit(0)
+        elif arg == '--batch':
+            kwargs.append(['render-on-demand', 'true'])
         elif arg in ('-d', '--debug'):
             logging.getLogger('line').setLevel(logging.DEBUG)
             terminal.CMDHandler._debug = True
@@ -30,8 +30,10 @@ def initialize(m_state:state.GlobalState, *args, **kwargs):
         setattr(myself, 'finalize', m.finalize)
         setattr(myself, 'update_figure', m.update_figure)
         setattr(myself, 'update_subfigure', m.update_subfigure)
+        setattr(myself, 'estimate_figure', m.estimate_figure)
         setattr(myself, 'save_figure', m.save_figure)
         setattr(myself, 'update_focus_figure', m.update_focus_figure)
+        setattr(myself, 'pause', m.pause)
         setattr(myself, 'close_figure', m.close_figure)
         setattr(myself, 'show', m.show)
 
@@ -2,19 +2,28 @@
 """
 
 import numpy as np
+import functools
 import logging
 import os
+import time
+import weakref
 
 import matplotlib
 import matplotlib.pyplot as plt
+import matplotlib.figure
+import matplotlib.legend
 import matplotlib.lines as lines
+import matplotlib.text
 import matplotlib.ticker as ticker
+import matplotlib.transforms as transforms
 import matplotlib.font_manager as font_manager
 import matplotlib.tight_layout as tight_layout
+import matplotlib.backends.backend_agg as backend_agg
 
 from . import state
 from . import style
 from . import defaults
+from .. import stat_util
 
 logger = logging.getLogger('line')
 
@@ -84,12 +93,11 @@ def _update_figure(m_fig:state.Figure, name:str, redraw_subfigures=True):
     size_inches = (size[0]/dpi, size[1]/dpi)
 
     if m_fig.backend == None or not plt.fignum_exists(m_fig.backend.number):
+        m_fig.clear_backend()
         m_fig.backend = plt.figure(name, figsize=size_inches, dpi=dpi)
+        m_fig.backend.clear()   # a detached figure of the same name may still exist
         logger.debug('Creating new figure: %s' % name)
 
-        for subfig in m_fig.subfigures:
-            subfig.backend = None
-
         #m_fig.backend.set_dpi(dpi) # TODO incorrect behavior in Windows
         m_fig.backend.set_size_inches(*size_inches)
     else:
@@ -97,31 +105,27 @@ def _update_figure(m_fig:state.Figure, name:str, redraw_subfigures=True):
         m_fig.backend.set_size_inches(*size_inches)
 
     m_plt_fig = m_fig.backend
-    m_plt_fig.clear()
-    margin = m_fig.attr('margin')
-
-    def scale(x):
-        return x[0]*(1-margin[2]-margin[0])+margin[0], x[1]*(1-margin[3]-margin[1])+margin[1], \
-            x[2]*(1-margin[2]-margin[0]), x[3]*(1-margin[3]-margin[1])
 
     for subfig in m_fig.subfigures:
-        
-        pos = subfig.attr('rpos')
-        rsize = subfig.attr('rsize')
-        padding = subfig.attr('padding')
 
         ax = subfig.backend
-        frame = scale((pos[0]+padding[0], pos[1]+padding[1], 
-            rsize[0]-padding[0]-padding[2], rsize[1]-padding[1]-padding[3]))
+        frame = _get_axes_position(m_fig, subfig)
         if ax is None:
             ax = plt.Axes(m_plt_fig, frame)
             subfig.backend = ax
         else:
             ax.set_position(frame)
 
-        m_plt_fig.add_axes(ax)
+        if ax not in m_plt_fig.axes:
+            m_plt_fig.add_axes(ax)
         logger.debug('Subfigure found at %s' % str(ax.get_position().bounds))
 
+    # axes (and their artists) are kept between renders, except those of removed subfigures
+    used_axes = [a for subfig in m_fig.subfigures for a in (subfig.backend, subfig.axes[2].backend, subfig.axes[3].backend)]
+    for a in m_plt_fig.axes:
+        if a not in used_axes:
+            a.remove()
+
     renderer = tight_layout.get_renderer(m_fig.backend)
     if redraw_subfigures:
         for subfig in m_fig.subfigures:
@@ -132,11 +136,18 @@ def _update_figure(m_fig:state.Figure, name:str, redraw_subfigures=True):
 
     if m_fig.title.attr('text') and m_fig.title.attr('visible'):
         st = m_fig.backend.suptitle(m_fig.title.attr('text'),
-            fontproperties=font_manager.FontProperties(
-                family=m_fig.title.attr('fontfamily'), **m_fig.title.attr('fontprops').export())
+            fontproperties=_get_font(m_fig.title.attr('fontfamily'), m_fig.title.attr('fontprops')),
+            visible=True,
         )
+        m_fig.title.backend = st
         m_fig.title.computed_style['frame'] = style.Rect(st.get_window_extent(renderer).bounds)
         # TODO in mpl figure title does not care legend position so they may overlap
+    elif m_fig.title.backend is not None:
+        m_fig.title.backend.set_visible(False)
+
+    if m_fig.legend.backend is not None:
+        _remove_artist(m_fig.legend.backend)
+        m_fig.legend.backend = None
 
     if m_fig.legend.attr('source') and m_fig.legend.attr('visible'):
 
@@ -164,13 +175,14 @@ def _update_figure(m_fig:state.Figure, name:str, redraw_subfigures=True):
             fancybox=False,
             facecolor=m_style['color'],
             edgecolor=m_style['linecolor'],
-            prop=font_manager.FontProperties(family=m_style['fontfamily'], **m_style['fontprops'].export()),
+            prop=_get_font(m_style['fontfamily'], m_style['fontprops']),
             loc=p,
             bbox_to_anchor=b,
             ncol=m_style['column'],
             frameon=True,
             framealpha=m_style['alpha'],
         )
+        m_fig.legend.backend = legend
 
         lt = m_style['linetype'].to_str()
         frame = legend.get_frame()
@@ -183,6 +195,9 @@ def _update_figure(m_fig:state.Figure, name:str, redraw_subfigures=True):
 
         m_fig.legend.computed_style['frame'] = style.Rect(*legend.get_window_extent(renderer).bounds)
 
+    for subfig in m_fig.subfigures:     # figure-level elements may be drawn over subfigures
+        subfig._blit_background = None
+
     #plt.show(block=False)
 
 
@@ -197,20 +212,22 @@ def update_subfigure(m_state:state.GlobalState):
     
     logger.debug('Updating figure %s, subfigure %d' % (m_state.cur_figurename, m_state.cur_figure().cur_subfigure))
     fig = plt.figure(m_state.cur_figurename)
+    if _blit_subfigure(m_state.cur_subfigure()):
+        return
     _update_subfigure(m_state.cur_subfigure(), tight_layout.get_renderer(fig))
 
 def _update_subfigure(m_subfig:state.Subfigure, renderer):
 
     ax = m_subfig.backend
-    ax.cla()
     ax.set_visible(m_subfig.attr('visible'))
     ax.set_frame_on(True)
 
     if m_subfig.title.attr('text') and m_subfig.title.attr('visible'):
         ax.set_title(m_subfig.title.attr('text'),
-            fontproperties=font_manager.FontProperties(
-                family=m_subfig.title.attr('fontfamily'), **m_subfig.title.attr('fontprops').export()),
+            fontproperties=_get_font(m_subfig.title.attr('fontfamily'), m_subfig.title.attr('fontprops')),
         )
+    else:
+        ax.set_title('')
 
     spine_names = ('bottom', 'left', 'right', 'top')
 
@@ -230,18 +247,17 @@ def _update_subfigure(m_subfig:state.Subfigure, renderer):
         tick_styles.append(m_subfig.axes[i].tick.computed_style)
         grid_styles.append(m_subfig.axes[i].grid.computed_style)
 
-    # creating additional axes for right/top
+    # additional axes for right/top; kept between renders until disabled
     for j in (2, 3):
+        twin_ax = m_subfig.axes[j].backend
         if m_subfig.axes[j].attr('enabled'):
-            if m_subfig.axes[j].backend:
-                try:
-                    m_subfig.axes[j].backend.remove()
-                except KeyError:
-                    pass
-            m_subfig.axes[j].backend = ax.twinx() if j == 2 else ax.twiny()
-            for d in spine_names:
-                m_subfig.axes[j].backend.spines[d].set_visible(False)
-        else:
+            if twin_ax is None or twin_ax not in ax.figure.axes:
+                twin_ax = ax.twinx() if j == 2 else ax.twiny()
+                for d in spine_names:
+                    twin_ax.spines[d].set_visible(False)
+                m_subfig.axes[j].backend = twin_ax
+        elif twin_ax is not None:
+            _remove_artist(twin_ax)
             m_subfig.axes[j].backend = None
 
     backends = (ax, ax, m_subfig.axes[2].backend, m_subfig.axes[3].backend)
@@ -257,8 +273,7 @@ def _update_subfigure(m_subfig:state.Subfigure, renderer):
         set_labelfunc(
             m_subfig.axes[i].label.attr('text'),
             color=label_styles[i]['color'],
-            fontproperties=font_manager.FontProperties(
-                family=label_styles[i]['fontfamily'], **label_styles[i]['fontprops'].export()),
+            fontproperties=_get_font(label_styles[i]['fontfamily'], label_styles[i]['fontprops']),
             visible=label_styles[i]['visible'],
             **{posname: label_styles[i]['pos'][0]},
         )
@@ -290,9 +305,9 @@ def _update_subfigure(m_subfig:state.Subfigure, renderer):
     
         # tick labels
         major_tick_labels = b.get_xmajorticklabels() if is_xside[i] else b.get_ymajorticklabels()
+        tick_font = _get_font(tick_styles[i]['fontfamily'], tick_styles[i]['fontprops'])
         for mtl in major_tick_labels:
-            mtl.set_fontproperties(font_manager.FontProperties(
-                family=tick_styles[i]['fontfamily'], **tick_styles[i]['fontprops'].export())),
+            mtl.set_fontproperties(tick_font)
             mtl.set_visible(tick_styles[i]['visible'])
 
         # tick format
@@ -306,6 +321,8 @@ def _update_subfigure(m_subfig:state.Subfigure, renderer):
         len(m_subfig.datalines), len(m_subfig.drawlines), len(m_subfig.texts)))
 
     m_subfig._legend_candidates.clear()
+    drawn_artists = set()   # artists of current elements; others are removed at last
+
     # lines
     for dataline in m_subfig.datalines:
         m_style = dataline.computed_style
@@ -317,9 +334,8 @@ def _update_subfigure(m_subfig:state.Subfigure, renderer):
         else:
             target_ax = ax
 
-        b = target_ax.plot( 
-            dataline.data.get_x(),
-            dataline.data.get_y(),
+        x, y = _get_decimated_data(dataline, _get_x_axis(m_subfig, dataline), target_ax)
+        b = _plot_retained(dataline, target_ax, x, y, dict(
             clip_on=m_style['clip'],
             color=m_style['linecolor'],
             label=m_style['label'],
@@ -332,11 +348,13 @@ def _update_subfigure(m_subfig:state.Subfigure, renderer):
             ms=m_style['pointsize'],
             fillstyle=m_style['fillstyle'],
             markevery=m_style['skippoint'],
+            rasterized=_is_rasterized(dataline, len(x)),
             visible=m_style['visible'],
             zorder=m_style['zindex']
-        )
-        if b and m_style['label']:
-            m_subfig._legend_candidates.append((b[0], m_style['label']))
+        ))
+        drawn_artists.add(b)
+        if m_style['label']:
+            m_subfig._legend_candidates.append((b, m_style['label']))
 
     for bar in m_subfig.bars:
         m_style = bar.computed_style
@@ -348,6 +366,8 @@ def _update_subfigure(m_subfig:state.Subfigure, renderer):
         else:
             target_ax = ax
 
+        if bar.backend is not None:
+            _remove_artist(bar.backend)
         b = target_ax.bar(
             bar.data.get_x(),
             bar.data.get_y(),
@@ -361,6 +381,12 @@ def _update_subfigure(m_subfig:state.Subfigure, renderer):
             linewidth=m_style['linewidth'],
             tick_label=None
         )
+        bar.backend = b
+        if _is_rasterized(bar, len(b)):
+            for p in b:
+                p.set_rasterized(True)
+        drawn_artists.add(b)
+        drawn_artists.update(b)
         if b and m_style['label']:
             m_subfig._legend_candidates.append((b[0], m_style['label']))
 
@@ -382,9 +408,7 @@ def _update_subfigure(m_subfig:state.Subfigure, renderer):
         else:
             trans = ax.transData if m_style['coord'] == 'data' else ax.transAxes
 
-        ax.add_line(lines.Line2D(
-            (xlo, xhi),
-            (ylo, yhi),
+        l = _plot_retained(drawline, ax, (xlo, xhi), (ylo, yhi), dict(
             color=m_style['linecolor'],
             linestyle=m_style['linetype'].to_str(),
             linewidth=m_style['linewidth'],
@@ -397,12 +421,16 @@ def _update_subfigure(m_subfig:state.Subfigure, renderer):
             transform=trans,
             visible=m_style['visible'],
             zorder=m_style['zindex']
-        ))
+        ), create=lambda x, y, **props: ax.add_line(lines.Line2D(x, y, **props)))
+        drawn_artists.add(l)
 
     for polygon in m_subfig.polygons:
         m_style = polygon.computed_style
 
-        ax.fill(
+        if polygon.backend is not None:
+            for p in polygon.backend:
+                _remove_artist(p)
+        polygon.backend = ax.fill(
             polygon.data.get_x(),
             polygon.data.get_y(),
             alpha=m_style['alpha'],
@@ -410,9 +438,11 @@ def _update_subfigure(m_subfig:state.Subfigure, renderer):
             edgecolor=m_style['linecolor'],
             linestyle=m_style['linetype'].to_str() if m_style['linetype'] != style.LineType.NONE else None,
             linewidth=m_style['linewidth'],
+            rasterized=_is_rasterized(polygon, len(polygon.data.get_x())),
             visible=m_style['visible'],
             zorder=m_style['zindex']
         )
+        drawn_artists.update(polygon.backend)
 
     for text in m_subfig.texts:
 
@@ -420,16 +450,16 @@ def _update_subfigure(m_subfig:state.Subfigure, renderer):
 
         x, y = _translate_loc_normal(*text.attr('pos'))
 
-        t = ax.text(
-            x,
-            y,
-            text.attr('text'),
+        t = _plot_retained(text, ax, None, None, dict(
+            text=text.attr('text'),
             color=m_style['color'],
-            fontproperties=font_manager.FontProperties(family=m_style['fontfamily'], **m_style['fontprops'].export()),
+            fontproperties=_get_font(m_style['fontfamily'], m_style['fontprops']),
             transform=ax.transData if m_style['coord'] == 'data' else ax.transAxes,
             visible=m_style['visible'],
             zorder=m_style['zindex']
-        )
+        ), create=lambda x, y, text, **props: ax.text(0, 0, text, **props))
+        t.set_position((x, y))  # frame is measured at the unadjusted position
+        drawn_artists.add(t)
         text.computed_style['frame'] = style.Rect(*t.get_window_extent(renderer).bounds)
         t.set_position(_get_text_loc(m_subfig, text, text.attr('pos')))
 
@@ -469,7 +499,13 @@ def _update_subfigure(m_subfig:state.Subfigure, renderer):
             visible=grid_styles[i]['visible']
         )
 
+    for b in set(backends):
+        if b is not None:
+            _remove_undrawn_artists(b, drawn_artists)
+
     # legend
+    if ax.get_legend() is not None:
+        ax.get_legend().remove()
     if m_subfig.legend.attr('visible') and m_subfig.datalines + m_subfig.bars:
 
         m_style = m_subfig.legend.computed_style
@@ -487,7 +523,7 @@ def _update_subfigure(m_subfig:state.Subfigure, renderer):
             fancybox=False,
             facecolor=m_style['color'],
             edgecolor=m_style['linecolor'],
-            prop=font_manager.FontProperties(family=m_style['fontfamily'], **m_style['fontprops'].export()),
+            prop=_get_font(m_style['fontfamily'], m_style['fontprops']),
             loc=p,
             bbox_to_anchor=b,
             ncol=m_style['column'],
@@ -521,6 +557,156 @@ def _update_subfigure(m_subfig:state.Subfigure, renderer):
 
     m_subfig.computed_style['frame'] = style.Rect(*ax.get_window_extent(renderer).bounds)
     m_subfig.title.computed_style['frame'] = style.Rect(ax.title.get_window_extent(renderer).bounds)
+    m_subfig._render_state = _get_render_state(m_subfig)
+    m_subfig._blit_background = None
+
+
+def estimate_figure(m_state:state.GlobalState):
+    """ Estimate frames of subfigures, axes, tick labels, labels and titles of current figure
+    from (cached) font metrics, without updating the figure. Texts are placed by transforms of
+    a figure of the same size, so the frames are those matplotlib computes.
+    Returns `False` if the figure has elements that cannot be estimated.
+    """
+    m_fig = m_state.cur_figure()
+    if m_fig.legend.attr('source') and m_fig.legend.attr('visible'):
+        return False
+    for m_subfig in m_fig.subfigures:
+        if m_subfig.legend.attr('visible') and m_subfig.datalines + m_subfig.bars and \
+            m_subfig.legend.attr('pos') != style.FloatingPos.AUTO and \
+            _translate_loc(*m_subfig.legend.attr('pos'))[1] is not None:
+            return False    # outside of axes
+        for i, m_axis in enumerate(m_subfig.axes):
+            if (i < 2 or m_axis.attr('enabled')) and (m_axis.attr('scale') != 'linear' or
+                m_axis.attr('range')[0] == m_axis.attr('range')[1] or not len(m_axis.attr('tickpos'))):
+                return False
+
+    dpi = m_fig.attr('dpi')
+    size = m_fig.attr('size')
+    ax = _get_layout_axes((size[0]/dpi, size[1]/dpi), dpi)
+    m_fig.computed_style['frame'] = style.Rect(*ax.figure.bbox.bounds)
+    if m_fig.title.attr('text') and m_fig.title.attr('visible'):
+        m_fig.title.computed_style['frame'] = style.Rect(*_get_text_bbox(m_fig.title.attr('text'),
+            m_fig.title.computed_style, ax.figure.transSubfigure.transform((0.5, 0.98)), 'center', 'top', dpi).bounds)
+
+    for m_subfig in m_fig.subfigures:
+        ax.set_position(_get_axes_position(m_fig, m_subfig))
+        if not _estimate_subfigure(m_subfig, ax, dpi):
+            return False
+    return True
+
+def _estimate_subfigure(m_subfig:state.Subfigure, ax, dpi):
+    """ Estimate frames of `m_subfig', whose axes is placed as `ax'. Returns `False' if the
+    legend may not fit in axes.
+    """
+    frame = style.Rect(*ax.bbox.bounds)
+    m_subfig.computed_style['frame'] = frame
+    m_subfig.title.computed_style['frame'] = style.Rect(*_get_text_bbox(
+        m_subfig.title.attr('text') if m_subfig.title.attr('text') and m_subfig.title.attr('visible') else '',
+        m_subfig.title.computed_style, ax.title.get_transform().transform((0.5, 1.0)), 'center', 'baseline', dpi).bounds)
+    if m_subfig.legend.attr('visible') and m_subfig.datalines + m_subfig.bars:
+        # an inner legend does not change the layout as long as it fits in axes
+        m_style = m_subfig.legend.computed_style
+        labels = tuple(e.computed_style['label'] for e in m_subfig.datalines + m_subfig.bars if e.computed_style['label'])
+        w, h, fontsize = _get_legend_extent(labels, m_style['fontfamily'], _get_font_key(m_style['fontprops']),
+            m_style['column'], dpi)
+        pad = 2 * matplotlib.rcParams['legend.borderaxespad'] * fontsize * dpi / 72 + 1
+        if w + pad > frame.width or h + pad > frame.height:
+            return False
+        m_subfig.legend.computed_style['frame'] = frame
+
+    tickdir_padding = {'in': 0.0, 'inout': 0.5, 'out': 1.0}
+    for i, m_axis in enumerate(m_subfig.axes):
+        if i >= 2 and not m_axis.attr('enabled'):
+            m_axis.computed_style['frame'] = style.Rect(0,0,0,0)
+            m_axis.tick.computed_style['frame'] = style.Rect(0,0,0,0)
+            m_axis.label.computed_style['frame'] = style.Rect(0,0,0,0)
+            continue
+
+        is_xside = i in (0, 3)
+        m_tick_style = m_axis.tick.computed_style
+        m_label_style = m_axis.label.computed_style
+        a_begin, a_end, a_interval = m_axis.attr('range')
+        lo, hi = min(a_begin, a_end), max(a_begin, a_end)
+        (ax.set_xlim if is_xside else ax.set_ylim)(lo, hi)
+        if a_interval is None:
+            locs = ticker.MaxNLocator(nbins=len(m_axis.attr('tickpos')), 
+                steps=[1,1.5,2,2.5,3,4,5,6,7.5,8,10]).tick_values(lo, hi)
+        else:
+            locs = m_axis.attr('tickpos')
+        if 'formatter' in m_tick_style:
+            ticklabels = [m_tick_style['formatter'](l, j) for j, l in enumerate(locs)]
+        else:
+            ticklabels = [m_tick_style['format'] % l for l in locs]
+
+        # tick labels are placed outside of the spine by pad + tick length (see `matplotlib.axis.Tick')
+        tick_pad = matplotlib.rcParams['%stick.major.pad' % ('x' if is_xside else 'y')] + \
+            m_tick_style['length'] * tickdir_padding[m_tick_style['orient']]
+        minor_pad = matplotlib.rcParams['%stick.minor.pad' % ('x' if is_xside else 'y')] + \
+            m_tick_style['length-minor'] * tickdir_padding[m_tick_style['orient-minor']]
+        if i == 0:
+            get_text_transform, get_spine_transform, side = ax.get_xaxis_text1_transform, ax.get_xaxis_transform, 0
+            to_xy = lambda l: (l, 0)
+        elif i == 1:
+            get_text_transform, get_spine_transform, side = ax.get_yaxis_text1_transform, ax.get_yaxis_transform, 0
+            to_xy = lambda l: (0, l)
+        elif i == 2:
+            get_text_transform, get_spine_transform, side = ax.get_yaxis_text2_transform, ax.get_yaxis_transform, 1
+            to_xy = lambda l: (1, l)
+        else:
+            get_text_transform, get_spine_transform, side = ax.get_xaxis_text2_transform, ax.get_xaxis_transform, 1
+            to_xy = lambda l: (l, 1)
+        tick_transform, va, ha = get_text_transform(tick_pad)
+
+        tick_bboxes = []
+        drawn_bboxes = []
+        tol = (hi - lo) * 1e-10     # as `matplotlib.axis.Axis._update_ticks'
+        is_drawn = [lo - tol <= l <= hi + tol for l in locs]
+        if m_tick_style['visible']:
+            for l, t, d in zip(locs, ticklabels, is_drawn):
+                bbox = _get_text_bbox(t, m_tick_style, tick_transform.transform(to_xy(l)), ha, va, dpi)
+                tick_bboxes.append(bbox)
+                if d:
+                    drawn_bboxes.append(bbox)
+        m_axis.tick.computed_style['frame'] = [style.Rect(*b.bounds) for b in tick_bboxes]
+
+        # axis label is placed outside of the drawn tick labels and the spine (with ticks) by labelpad;
+        # labels of minor ticks are empty, but still count (see `matplotlib.axis.XAxis._update_label_position').
+        spine = get_spine_transform('grid').transform(to_xy(lo))[1 if is_xside else 0]
+        outer_bounds = [spine]
+        has_minor = m_tick_style['minor'] > 0 and len(locs) > 1
+        for length, orient, has_tick in ((m_tick_style['length'], m_tick_style['orient'], any(is_drawn)),
+            (m_tick_style['length-minor'], m_tick_style['orient-minor'], has_minor)):
+            if has_tick:
+                padout = tickdir_padding[orient] * length / 72 * dpi
+                outer_bounds.append(spine + padout if side else spine - padout)
+        if has_minor:
+            minor_anchor = get_text_transform(minor_pad)[0].transform(to_xy(lo))
+            outer_bounds.append(minor_anchor[1] if is_xside else minor_anchor[0])
+        corner = 3 if is_xside else 2   # index of outer bound in bbox extents (x0, y0, x1, y1)
+        corner -= 0 if side else 2
+        outer_bounds.extend(b.extents[corner] for b in drawn_bboxes)
+        outer = max(outer_bounds) if side else min(outer_bounds)
+
+        if m_label_style['visible']:
+            label_pad = matplotlib.rcParams['axes.labelpad'] * dpi / 72
+            label_outer = outer + label_pad if side else outer - label_pad
+            if is_xside:
+                anchor = ax.xaxis.label.get_transform().transform((m_label_style['pos'][0], label_outer))
+                label_bbox = _get_text_bbox(m_axis.label.attr('text'), m_label_style, anchor,
+                    'center', 'baseline' if side else 'top', dpi)
+            else:
+                anchor = ax.yaxis.label.get_transform().transform((label_outer, m_label_style['pos'][0]))
+                label_bbox = _get_text_bbox(m_axis.label.attr('text'), m_label_style, anchor,
+                    'center', 'top' if side else 'bottom', dpi, 90, 'anchor')
+            m_axis.label.computed_style['frame'] = style.Rect(*label_bbox.bounds)
+        else:
+            label_bbox = None
+            m_axis.label.computed_style['frame'] = style.Rect(0,0,1,1)  # as matplotlib does for invisible texts
+
+        # tight bounding box of tick labels and label
+        bboxes = [b for b in drawn_bboxes + ([label_bbox] if label_bbox else []) if b.width > 0 and b.height > 0]
+        m_axis.computed_style['frame'] = style.Rect(transforms.Bbox.union(bboxes).bounds if bboxes else (0,0,0,0))
+    return True
 
 
 def save_figure(m_state:state.GlobalState, filename):
@@ -529,9 +715,17 @@ def save_figure(m_state:state.GlobalState, filename):
 
     if not m_state.is_interactive:  # delayed evaluation
         update_figure(m_state)
-    plt.savefig(
-        filename, dpi=m_state.cur_figure().get_style('dpi')
-    )
+    is_vector = os.path.splitext(filename)[1].lower() in _vector_formats
+    try:
+        if is_vector:
+            with matplotlib.rc_context({'path.simplify_threshold': defaults.default_options['simplify-threshold']}):
+                _recache_lines(m_state.cur_figure())
+        plt.savefig(
+            filename, dpi=m_state.cur_figure().get_style('dpi')
+        )
+    finally:
+        if is_vector:
+            _recache_lines(m_state.cur_figure())  # back to simplification of screen
     if not m_state.is_interactive:
         m_state.cur_figure().clear_backend()
 
@@ -553,6 +747,16 @@ def update_focus_figure(m_state:state.GlobalState):
         plt.get_current_fig_manager().window.attributes('-topmost', 0)
 
 
+def pause(m_state:state.GlobalState, interval):
+    """ Wait for `interval' seconds, keeping figures responsive. Only called
+    in interactive mode.
+    """
+    if plt.get_fignums():
+        plt.pause(interval)
+    else:
+        time.sleep(interval)
+
+
 def close_figure(m_state:state.GlobalState):
     """ Close current figure. Only called in interactive mode.
     """
@@ -572,6 +776,283 @@ def show(m_state:state.GlobalState):
     for figure in m_state.figures.values():
         figure.clear_backend()
 
+_applied_props = weakref.WeakKeyDictionary()  # artist => properties set by last render
+_decimated_data = weakref.WeakKeyDictionary()   # dataline => (key, x, y) of last decimation
+_vector_formats = ('.pdf', '.svg', '.svgz', '.eps', '.ps')
+
+
+def _recache_lines(m_fig):
+    """ Rebuild paths of lines, so they are simplified by current `path.simplify_threshold'.
+    """
+    for m_subfig in m_fig.subfigures:
+        for dataline in m_subfig.datalines:
+            if dataline.backend is not None:
+                dataline.backend.recache_always()
+
+def _get_render_state(m_subfig):
+    """ Return computed styles of all elements in subfigure (and data, except for lines),
+    to find if only data of lines are changed.
+    """
+    return [(e, {k: v for k, v in e.computed_style.items() if k != 'frame'},
+        None if e.typename == 'line' else getattr(e, 'data', None))
+        for e in m_subfig.get_index().elements]
+
+def _is_same_render_state(old_state, new_state):
+    if len(old_state) != len(new_state):
+        return False
+    for (e0, s0, d0), (e1, s1, d1) in zip(old_state, new_state):
+        if e0 is not e1 or d0 is not d1 or s0.keys() != s1.keys() or \
+            not all(_style_equal(v, s1[k]) for k, v in s0.items()):
+            return False
+    return True
+
+def _style_equal(a, b):
+    # styles like `tickpos' are recomputed as new arrays
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return np.array_equal(a, b)
+    return _prop_equal(a, b)
+
+def _blit_subfigure(m_subfig):
+    """ Update lines of subfigure by blitting, if only their data are changed since last
+    rendering. The background (everything drawn below the lines) is cached.
+    Returns `False` if a full update is required.
+    """
+    ax = m_subfig.backend
+    canvas = ax.figure.canvas
+    if m_subfig._render_state is None or not m_subfig.datalines or not canvas.supports_blit or \
+        any(d.backend is None for d in m_subfig.datalines) or \
+        not _is_same_render_state(m_subfig._render_state, _get_render_state(m_subfig)):
+        return False
+
+    # animated artists do not mark the figure stale, so no full redraw is triggered
+    for dataline in m_subfig.datalines:
+        artist = dataline.backend
+        x, y = _get_decimated_data(dataline, _get_x_axis(m_subfig, dataline), artist.axes)
+        applied = _applied_props[artist]
+        if not _prop_equal(applied.get('_data'), (x, y)):
+            artist.set_animated(True)
+            artist.set_data(x, y)
+            artist.set_rasterized(_is_rasterized(dataline, len(x)))
+            artist.set_animated(False)
+            applied['_data'] = (x, y)
+            applied['rasterized'] = artist.get_rasterized()
+
+    # artists above the lowest line, in the order of `Axes.draw'
+    zmin = min(d.backend.get_zorder() for d in m_subfig.datalines)
+    layers = []
+    for b in (ax, m_subfig.axes[2].backend, m_subfig.axes[3].backend):
+        if b is not None:
+            layers.append((b, sorted((c for c in b.get_children() if c is not b.patch and
+                c.get_visible() and c.get_zorder() >= zmin), key=lambda c: c.get_zorder())))
+
+    bg = m_subfig._blit_background
+    if bg is None or bg[0] is not canvas or bg[1] != canvas.get_width_height():
+        renderer = canvas.get_renderer()
+        bbox = transforms.Bbox.union([b.get_tightbbox(renderer) for b, _ in layers]).padded(1)
+        for _, artists in layers:
+            for c in artists:
+                c.set_animated(True)    # excluded from drawing
+        canvas.draw()
+        bg = (canvas, canvas.get_width_height(), bbox, canvas.copy_from_bbox(bbox))
+        m_subfig._blit_background = bg
+        for _, artists in layers:
+            for c in artists:
+                c.set_animated(False)
+
+    canvas.restore_region(bg[3])
+    for b, artists in layers:
+        for c in artists:
+            b.draw_artist(c)
+    canvas.blit(bg[2])
+    ax.figure.stale = False     # redrawing ticks marks it stale, but the canvas is up to date
+    logger.debug('Blitted subfigure %s' % m_subfig.name)
+    return True
+
+def _get_axes_position(m_fig, m_subfig):
+    """ Position of axes of subfigure, in figure coordinates.
+    """
+    margin = m_fig.attr('margin')
+    pos = m_subfig.attr('rpos')
+    rsize = m_subfig.attr('rsize')
+    padding = m_subfig.attr('padding')
+    x = (pos[0]+padding[0], pos[1]+padding[1], rsize[0]-padding[0]-padding[2], rsize[1]-padding[1]-padding[3])
+    return x[0]*(1-margin[2]-margin[0])+margin[0], x[1]*(1-margin[3]-margin[1])+margin[1], \
+        x[2]*(1-margin[2]-margin[0]), x[3]*(1-margin[3]-margin[1])
+
+def _get_x_axis(m_subfig, dataline):
+    return m_subfig.axes[3] if dataline.attr('side') == (style.FloatingPos.LEFT, style.FloatingPos.TOP) else m_subfig.axes[0]
+
+def _get_decimated_data(dataline, x_axis, target_ax):
+    """ Return (x, y) of `dataline'. If style `decimate' is set, lines without markers
+    are reduced to 4 points per column of the visible range, which looks the same as the
+    full line. Columns are half pixels if `decimate' is 'auto'.
+    """
+    x, y = dataline.data.get_x(), dataline.data.get_y()
+    decimate = dataline.attr('decimate')
+    if decimate == 'none' or dataline.attr('pointtype') != style.PointType.NONE:
+        return x, y
+
+    # 2 columns per pixel, as columns are not aligned with pixels
+    columns = int(np.ceil(target_ax.bbox.width * 2)) if decimate == 'auto' else decimate
+    lo, hi = x_axis.attr('range')[:2]
+    scale = x_axis.attr('scale')
+    if len(x) <= 4 * columns:
+        return x, y
+
+    key = (x, y, lo, hi, columns, scale)
+    cached = _decimated_data.get(dataline)
+    if cached and all(a is b or (np.isscalar(a) and a == b) for a, b in zip(cached[0], key)):
+        return cached[1:]
+
+    x_, y_ = np.asarray(x), np.asarray(y)
+    if x_.dtype.kind not in 'iuf' or y_.dtype.kind not in 'iuf':
+        return x, y
+    if scale == 'log':
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_, lo, hi = np.log10(x_), np.log10(lo), np.log10(hi)
+    # missing values break the line, and unsorted lines cannot be split into columns
+    if not (np.isfinite(lo) and np.isfinite(hi) and hi > lo) or \
+        not np.isfinite(x_).all() or not np.isfinite(y_).all() or (np.diff(x_) < 0).any():
+        return x, y
+
+    idx = stat_util.minmax_decimate(x_, y_, lo, hi, columns)
+    logger.debug('Decimating %s: %d -> %d points' % (dataline.name, len(x_), len(idx)))
+    _decimated_data[dataline] = (key, np.asarray(x)[idx], y_[idx])
+    return _decimated_data[dataline][1:]
+
+
+def _is_rasterized(element, size):
+    """ Whether the element is drawn as image in vector outputs. If style `rasterize' is 'auto',
+    elements of more than `rasterize-threshold' points (or bars) are rasterized.
+    """
+    rasterize = element.attr('rasterize')
+    if rasterize == 'auto':
+        return 0 < defaults.default_options['rasterize-threshold'] < size
+    return rasterize
+
+def _plot_retained(element, target_ax, x, y, props, create=None):
+    """ Return the artist of `element' in `target_ax' (`element.backend'), with data (x, y)
+    and properties `props'. Existing artist is reused and only changed properties are set;
+    a new one is created by `create(x, y, **props)' (default: `target_ax.plot').
+    """
+    artist = element.backend
+    if artist is None or artist.axes is not target_ax:
+        if artist is not None:
+            _remove_artist(artist)
+        artist = create(x, y, **props) if create else target_ax.plot(x, y, **props)[0]
+        element.backend = artist
+        _applied_props[artist] = dict(props, _data=(x, y))
+        return artist
+
+    applied = _applied_props.setdefault(artist, {})
+    changed = {k: v for k, v in props.items() if not _prop_equal(applied.get(k, _prop_equal), v)}
+    if changed:
+        artist.set(**changed)
+        applied.update(changed)
+    if not _prop_equal(applied.get('_data'), (x, y)):
+        artist.set_data(x, y)
+        applied['_data'] = (x, y)
+    return artist
+
+def _prop_equal(a, b):
+    # data arrays are only compared by identity
+    if a is b:
+        return True
+    if isinstance(a, tuple) and isinstance(b, tuple):
+        return len(a) == len(b) and all(a_ is b_ or (np.isscalar(a_) and a_ == b_) for a_, b_ in zip(a, b))
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return False
+    try:
+        return bool(a == b)
+    except (TypeError, ValueError):
+        return False
+
+def _remove_artist(artist):
+    try:
+        artist.remove()
+    except (ValueError, KeyError, NotImplementedError, AttributeError):
+        pass    # already removed, or its axes are gone
+
+def _remove_undrawn_artists(ax, drawn_artists):
+    """ Remove artists in `ax' not belonging to any element.
+    """
+    for c in list(ax.containers):
+        if c not in drawn_artists:
+            _remove_artist(c)
+    for artists in (ax.lines, ax.patches, ax.texts, ax.collections):
+        for a in list(artists):
+            if a not in drawn_artists:
+                _remove_artist(a)
+
+def _get_text_bbox(text, m_style, anchor, ha, va, dpi, rotation=0, rotation_mode=None):
+    """ `Bbox' of text anchored at `anchor' in pixels, with font of `m_style`.
+    """
+    extent = _get_text_extent(text, m_style['fontfamily'], _get_font_key(m_style['fontprops']),
+        ha, va, rotation, rotation_mode, dpi)
+    return transforms.Bbox(np.reshape(extent, (2, 2)) + anchor)   # as `Bbox.translated'
+
+def _get_font(fontfamily, fontprops):
+    """ `FontProperties' of `fontfamily' and `fontprops' (`style.FontProperty'), shared
+    by all texts with the same font. It must not be modified; matplotlib copies it when
+    applied to a text.
+    """
+    return _get_font_properties(fontfamily, _get_font_key(fontprops))
+
+def _get_font_key(fontprops):
+    return tuple(sorted(fontprops.export().items()))
+
+@functools.lru_cache(maxsize=256)
+def _get_font_properties(fontfamily, fontprops):
+    """ Cached by value of the font, so a changed style simply maps to another entry.
+    """
+    return font_manager.FontProperties(family=fontfamily, **dict(fontprops))
+
+_text_figure = None     # figure holding the renderer of text extents
+_layout_axes = None     # axes in `_text_figure' placing texts in estimation
+
+def _get_text_figure(dpi):
+    global _text_figure
+    if _text_figure is None:
+        _text_figure = matplotlib.figure.Figure(figsize=(1, 1))
+        backend_agg.FigureCanvasAgg(_text_figure)
+    _text_figure.set_dpi(dpi)
+    return _text_figure
+
+def _get_layout_axes(size_inches, dpi):
+    """ Axes of a figure sized as `size_inches', whose transforms are those of axes in
+    a figure of the same size.
+    """
+    global _layout_axes
+    fig = _get_text_figure(dpi)
+    fig.set_size_inches(*size_inches)
+    if _layout_axes is None:
+        _layout_axes = fig.add_axes((0, 0, 1, 1))
+    return _layout_axes
+
+@functools.lru_cache(maxsize=4096)
+def _get_text_extent(text, fontfamily, fontprops, ha, va, rotation, rotation_mode, dpi):
+    """ Extent (x0, y0, x1, y1) in pixels of text anchored at the origin. Only font metrics
+    are used (nothing is drawn), and results are cached by font and string.
+    """
+    fig = _get_text_figure(dpi)
+    t = matplotlib.text.Text(0, 0, text,
+        fontproperties=_get_font_properties(fontfamily, fontprops),
+        ha=ha, va=va, rotation=rotation, rotation_mode=rotation_mode,
+        transform=transforms.IdentityTransform())
+    t.set_figure(fig)
+    return tuple(t.get_window_extent(fig.canvas.get_renderer()).extents)
+
+@functools.lru_cache(maxsize=1024)
+def _get_legend_extent(labels, fontfamily, fontprops, column, dpi):
+    """ Size (width, height) in pixels and font size in points of legend with `labels'.
+    Handles are drawn in boxes of fixed size, so any line can stand for them.
+    """
+    fig = _get_text_figure(dpi)
+    legend = matplotlib.legend.Legend(fig, [lines.Line2D([], []) for l in labels], list(labels),
+        prop=_get_font_properties(fontfamily, fontprops), ncol=column, fancybox=False, frameon=True)
+    bbox = legend.get_window_extent(fig.canvas.get_renderer())
+    return bbox.width, bbox.height, legend.prop.get_size_in_points()
+
 def _translate_loc(x, y):
     # this is just ad-hoc. Should use redrawing or float system in the future.
 
@@ -2,6 +2,8 @@
 
 class DataPack:
 
+    reduced = False     # data are a reduction of raw samples (e.g. extremes of buckets)
+
     def __init__(self, source=None):
         self.source = source
 
@@ -22,9 +24,10 @@ class StaticDataPack(DataPack):
 
 class StaticPairedDataPack(DataPack):
 
-    def __init__(self, x, y):
+    def __init__(self, x, y, reduced=False):
         assert x.shape == y.shape
         self.data = [x, y]
+        self.reduced = reduced
 
     def get_x(self):
         return self.data[0]
@@ -47,15 +50,16 @@ class StaticPairedDataPack(DataPack):
 
 class DistributionDataPack(DataPack):
 
-    def __init__(self, x, bins=10, norm='density'):
+    def __init__(self, x, bins=10, norm='density', weights=None):
         self.data = x
+        self.weights = weights
         self.bins = bins
         self.norm = norm
         self._refresh()
         
     def _refresh(self):
         from ..stat_util import histogram
-        self._cache = histogram(self.data, self.bins, self.norm)
+        self._cache = histogram(self.data, self.bins, self.norm, self.weights)
 
     def set_bins(self, bins):
         if bins != self.bins:
@@ -73,8 +77,9 @@ class DistributionDataPack(DataPack):
     def get_y(self):
         return self._cache[:, 1]
 
-    def update(self, newdata):
+    def update(self, newdata, weights=None):
         self.data = newdata
+        self.weights = weights
         self._refresh()
 
 
@@ -113,6 +113,8 @@ def fit_dataline(subfigure, dataline, function='linear', range_=None, labelfmt='
             
     if not func:
         raise ValueError(function)
+    if dataline.data.reduced:
+        raise ValueError('Cannot fit %s: data are reduced when loading. Set option "stream-threshold" to 0 and plot again' % dataline.name)
 
     fitresult = func(dataline.data)
 
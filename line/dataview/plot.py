@@ -2,6 +2,7 @@
 import numpy as np
 
 from . import datapack
+from .. import model
 
 
 class PlottingGroup:
@@ -52,20 +53,22 @@ def do_plot(m_state, plot_groups, keep_existed=False, labelfmt=None, auto_range=
 def plot_single_group(subfigure, pg, labelfmt, chart_type='line'):
 
     m_ylabel = labelfmt.replace('%T', pg.ylabel).replace(r'%F', str(pg.source))
-    m_xdata = np.array(pg.xdata).flatten()
-    m_ydata = np.array(pg.ydata).flatten()
+    m_xdata = np.asarray(pg.xdata).reshape(-1)
+    m_ydata = np.asarray(pg.ydata).reshape(-1)
+    reduced = model.util.is_reduced(pg.xdata) or model.util.is_reduced(pg.ydata)
 
     if chart_type == 'line':
         return subfigure.add_dataline(
-            datapack.StaticPairedDataPack(m_xdata, m_ydata), m_ylabel, pg.xlabel, pg.style)
+            datapack.StaticPairedDataPack(m_xdata, m_ydata, reduced), m_ylabel, pg.xlabel, pg.style)
     elif chart_type == 'bar':
         return subfigure.add_bar(
-            datapack.StaticPairedDataPack(m_xdata, m_ydata), m_ylabel, pg.xlabel, False, pg.style)
+            datapack.StaticPairedDataPack(m_xdata, m_ydata, reduced), m_ylabel, pg.xlabel, False, pg.style)
     elif chart_type == 'hist':
         pg.style.setdefault('norm', 'Distribution')
         pg.style.setdefault('width', 1.0)
         return subfigure.add_bar(
-            datapack.DistributionDataPack(m_ydata, pg.style.get('bin', 10), pg.style.get('norm', 'Distribution')),
+            datapack.DistributionDataPack(m_ydata, pg.style.get('bin', 10), pg.style.get('norm', 'Distribution'),
+                model.util.get_weights(pg.ydata)),
             m_ylabel, pg.ylabel, True, pg.style)
         # m_ylabel is not used for axis label.
 
@@ -80,15 +83,17 @@ def do_update(m_state, targets, plot_groups, chart_type='line', auto_range=None)
         raise ValueError("Number of targets and plot_groups are not same")
 
     for t, pg in zip(targets, plot_groups):
-        m_xdata = np.array(pg.xdata).flatten()
-        m_ydata = np.array(pg.ydata).flatten()
+        m_xdata = np.asarray(pg.xdata).reshape(-1)
+        m_ydata = np.asarray(pg.ydata).reshape(-1)
+        reduced = model.util.is_reduced(pg.xdata) or model.util.is_reduced(pg.ydata)
 
         if chart_type == 'line' or chart_type == 'bar':
             assert t.typename == chart_type # this is lazy
-            t.update_style(data=datapack.StaticPairedDataPack(m_xdata, m_ydata))
+            t.update_style(data=datapack.StaticPairedDataPack(m_xdata, m_ydata, reduced))
         elif chart_type == 'hist':
             assert t.typename == 'bar'
-            t.update_style(data=datapack.DistributionDataPack(m_ydata, t.get_style('bin'), t.get_style('norm')))
+            t.update_style(data=datapack.DistributionDataPack(m_ydata, t.get_style('bin'), t.get_style('norm'),
+                model.util.get_weights(pg.ydata)))
             
     if auto_range or (auto_range is None and m_state.options['auto-adjust-range']):
         m_state.cur_subfigure().update_style({'xrange':(None,None,None), 'yrange':(None,None,None)})
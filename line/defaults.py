@@ -12,6 +12,40 @@ default_style_entries = {}
 default_style_sheet = None  # we export default CSS here to help elements initialize themselves
 
 
+def _to_positive_int(token):
+    v = int(token)
+    if v < 1:
+        raise ValueError(token)
+    return v
+
+
+def _to_nonnegative_int(token):
+    v = int(token)
+    if v < 0:
+        raise ValueError(token)
+    return v
+
+
+def _to_nonnegative_float(token):
+    v = float(token)
+    if v < 0:
+        raise ValueError(token)
+    return v
+
+
+def _to_unit_float(token):
+    v = float(token)
+    if not 0 <= v <= 1:
+        raise ValueError(token)
+    return v
+
+
+def _to_expr_backend(token):
+    if token not in ('auto', 'numpy', 'python'):
+        raise ValueError(token)
+    return token
+
+
 def parse_default_options(option_list, option_range=None, raise_error=False):
 
     return option_util.parse_option_list(option_list, 
@@ -23,6 +57,12 @@ def parse_default_options(option_list, option_range=None, raise_error=False):
             'data-delimiter': lambda x: x,
             'data-title': lambda x: x if x == 'auto' else option_util.to_bool(x),
             'safety': lambda x: int(x),
+            'load-workers': _to_positive_int,
+            'expr-backend': _to_expr_backend,
+            'stream-threshold': _to_nonnegative_float,
+            'data-cache-size': _to_nonnegative_float,
+            'rasterize-threshold': _to_nonnegative_int,
+            'simplify-threshold': _to_unit_float,
         })
 
 
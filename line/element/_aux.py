@@ -1,7 +1,10 @@
 
 """ Factory style setter/getter
+Generated setters/getters are shared by a class, and accept the element as the first argument.
 """
 
+from . import defaults
+
 
 def _set_color(m_style, value):
     m_style['linecolor'] = value
@@ -13,88 +16,89 @@ def _set_data(target, value):
 
 _get_computed_style = lambda o, n, d: o.computed_style.get(n, d) if o.computed_style else d
 
-def _merge_2(o, d, n, k, v):
+def _merge_2(o, typename, n, k, v):
+    d = defaults.default_style_sheet.find_type(typename)
     c = _get_computed_style(o, n, d[n]).copy()  # since sometimes the style might be set in lower priority. Also to prevent inheritance.
     c[k] = v
     return c
 
-def _gen_fontprops_setter(obj, default_val):
+def _gen_fontprops_setter(typename):
 
     name = 'fontprops'
     return {
-        'fontstyle': lambda s, v: s.update({name:_merge_2(obj, default_val, name, 'style', v)}),
-        'fontweight': lambda s, v: s.update({name:_merge_2(obj, default_val, name, 'weight', v)}),
-        'fontvariant': lambda s, v: s.update({name:_merge_2(obj, default_val, name, 'variant', v)}),
-        'fontstretch': lambda s, v: s.update({name:_merge_2(obj, default_val, name, 'stretch', v)}),
-        'fontsize': lambda s, v: s.update({name:_merge_2(obj, default_val, name, 'size', v)}),
+        'fontstyle': lambda o, s, v: s.update({name:_merge_2(o, typename, name, 'style', v)}),
+        'fontweight': lambda o, s, v: s.update({name:_merge_2(o, typename, name, 'weight', v)}),
+        'fontvariant': lambda o, s, v: s.update({name:_merge_2(o, typename, name, 'variant', v)}),
+        'fontstretch': lambda o, s, v: s.update({name:_merge_2(o, typename, name, 'stretch', v)}),
+        'fontsize': lambda o, s, v: s.update({name:_merge_2(o, typename, name, 'size', v)}),
     }
 
-def _gen_fontprops_getter(obj):
+def _gen_fontprops_getter():
     return {
-        'fontsize': lambda s: _get_computed_style(obj, 'fontprops', None)['size'],
-        'fontweight': lambda s: _get_computed_style(obj, 'fontprops', None)['weight'],
-        'fontstyle': lambda s: _get_computed_style(obj, 'fontprops', None)['style'],
+        'fontsize': lambda o, s: _get_computed_style(o, 'fontprops', None)['size'],
+        'fontweight': lambda o, s: _get_computed_style(o, 'fontprops', None)['weight'],
+        'fontstyle': lambda o, s: _get_computed_style(o, 'fontprops', None)['style'],
     }
 
-def _gen_margin_setter(obj, default_val):
+def _gen_margin_setter(typename):
     name = 'margin'
 
     return {
-        'margin-left': lambda s, v: s.update({name:_merge_2(obj, default_val, name, 0, v)}),
-        'margin-bottom': lambda s, v: s.update({name:_merge_2(obj, default_val, name, 1, v)}),
-        'margin-right': lambda s, v: s.update({name:_merge_2(obj, default_val, name, 2, v)}),
-        'margin-top': lambda s, v: s.update({name:_merge_2(obj, default_val, name, 3, v)}),
+        'margin-left': lambda o, s, v: s.update({name:_merge_2(o, typename, name, 0, v)}),
+        'margin-bottom': lambda o, s, v: s.update({name:_merge_2(o, typename, name, 1, v)}),
+        'margin-right': lambda o, s, v: s.update({name:_merge_2(o, typename, name, 2, v)}),
+        'margin-top': lambda o, s, v: s.update({name:_merge_2(o, typename, name, 3, v)}),
     }
     
-def _gen_margin_getter(obj):
+def _gen_margin_getter():
     return {
-        'margin-left': lambda s: _get_computed_style(obj, 'margin', None)[0],
-        'margin-bottom': lambda s: _get_computed_style(obj, 'margin', None)[1],
-        'margin-right': lambda s: _get_computed_style(obj, 'margin', None)[2],
-        'margin-top': lambda s: _get_computed_style(obj, 'margin', None)[3],
+        'margin-left': lambda o, s: _get_computed_style(o, 'margin', None)[0],
+        'margin-bottom': lambda o, s: _get_computed_style(o, 'margin', None)[1],
+        'margin-right': lambda o, s: _get_computed_style(o, 'margin', None)[2],
+        'margin-top': lambda o, s: _get_computed_style(o, 'margin', None)[3],
     }
 
-def _gen_padding_setter(obj, default_val):
+def _gen_padding_setter(typename):
     name = 'padding'
 
     return {
-        'padding-left': lambda s, v: s.update({name:_merge_2(obj, default_val, name, 0, v)}),
-        'padding-bottom': lambda s, v: s.update({name:_merge_2(obj, default_val, name, 1, v)}),
-        'padding-right': lambda s, v: s.update({name:_merge_2(obj, default_val, name, 2, v)}),
-        'padding-top': lambda s, v: s.update({name:_merge_2(obj, default_val, name, 3, v)}),
+        'padding-left': lambda o, s, v: s.update({name:_merge_2(o, typename, name, 0, v)}),
+        'padding-bottom': lambda o, s, v: s.update({name:_merge_2(o, typename, name, 1, v)}),
+        'padding-right': lambda o, s, v: s.update({name:_merge_2(o, typename, name, 2, v)}),
+        'padding-top': lambda o, s, v: s.update({name:_merge_2(o, typename, name, 3, v)}),
     }
 
-def _gen_padding_getter(obj):
+def _gen_padding_getter():
     return {
-        'padding-left': lambda s: _get_computed_style(obj, 'padding', None)[0],
-        'padding-bottom': lambda s: _get_computed_style(obj, 'padding', None)[1],
-        'padding-right': lambda s: _get_computed_style(obj, 'padding', None)[2],
-        'padding-top': lambda s: _get_computed_style(obj, 'padding', None)[3],
+        'padding-left': lambda o, s: _get_computed_style(o, 'padding', None)[0],
+        'padding-bottom': lambda o, s: _get_computed_style(o, 'padding', None)[1],
+        'padding-right': lambda o, s: _get_computed_style(o, 'padding', None)[2],
+        'padding-top': lambda o, s: _get_computed_style(o, 'padding', None)[3],
     }
 
-def _gen_spacing_setter(obj, default_val):
+def _gen_spacing_setter(typename):
     name = 'spacing'
     return {
-        'hspacing': lambda s, v: s.update({name:_merge_2(obj, default_val, name, 0, v)}),
-        'vspacing': lambda s, v: s.update({name:_merge_2(obj, default_val, name, 1, v)}),
+        'hspacing': lambda o, s, v: s.update({name:_merge_2(o, typename, name, 0, v)}),
+        'vspacing': lambda o, s, v: s.update({name:_merge_2(o, typename, name, 1, v)}),
     }
 
 
-def _gen_spacing_getter(obj):
+def _gen_spacing_getter():
     return {
-        'hspacing': lambda s: _get_computed_style(obj, 'spacing', None)[0],
-        'vspacing': lambda s: _get_computed_style(obj, 'spacing', None)[1],
+        'hspacing': lambda o, s: _get_computed_style(o, 'spacing', None)[0],
+        'vspacing': lambda o, s: _get_computed_style(o, 'spacing', None)[1],
     }
 
-def _gen_size_setter(obj, default_val):
+def _gen_size_setter(typename):
     name = 'size'
     return {
-        'width': lambda s, v: s.update({name:_merge_2(obj, default_val, name, 0, v)}),
-        'height': lambda s, v: s.update({name:_merge_2(obj, default_val, name, 1, v)}),
+        'width': lambda o, s, v: s.update({name:_merge_2(o, typename, name, 0, v)}),
+        'height': lambda o, s, v: s.update({name:_merge_2(o, typename, name, 1, v)}),
     }
 
-def _gen_size_getter(obj):
+def _gen_size_getter():
     return {
-        'width': lambda s: _get_computed_style(obj, 'size', None)[0],
-        'height': lambda s: _get_computed_style(obj, 'size', None)[1],
+        'width': lambda o, s: _get_computed_style(o, 'size', None)[0],
+        'height': lambda o, s: _get_computed_style(o, 'size', None)[1],
     }
\ No newline at end of file
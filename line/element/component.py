@@ -3,7 +3,6 @@ import numpy as np
 import re
 
 from ..graphing import scale
-from .. import defaults
 
 from . import style
 from . import errors
@@ -13,6 +12,16 @@ from ._aux import _set_color, _set_data, _gen_fontprops_setter, _gen_fontprops_g
 
 class Axis(FigObject):
 
+    custom_style_setter = {
+        'scale': lambda self, s, v: self._set_scale(s, v),
+        **_gen_fontprops_setter('axis'),
+    }
+    custom_style_getter = _gen_fontprops_getter()
+    style_change_handler = {
+        'range': lambda self, o, n: self._update_ticks(),
+        'scale': lambda self, o, n: self._update_scale(o, n),
+    }
+
     def __init__(self, axis_name, extent_callback=None):
 
         self.label = Label(axis_name[:-4] + 'label')
@@ -22,15 +31,7 @@ class Axis(FigObject):
         self.extent_callback = extent_callback  # called to get data extent
         self.backend = None
 
-        super().__init__('axis', axis_name, {
-            'scale':self._set_scale,
-            **_gen_fontprops_setter(self, defaults.default_style_sheet.find_type('axis')),
-        }, {
-            **_gen_fontprops_getter(self),
-        }, {
-            'range': lambda o,n: self._update_ticks(),
-            'scale': self._update_scale,
-        })
+        super().__init__('axis', axis_name)
 
     def get_children(self):
         return [self.label, self.tick, self.grid]
@@ -48,9 +49,18 @@ class Axis(FigObject):
         elif value == 'log' and fmt not in ('%mp', '%mP'):
             self.tick.update_style({'format': r'%mp'})
 
+    def invalidate_ticks(self):
+        """ Recompute range and ticks at next style computation, since data extents are changed.
+        """
+        self.last_exported_style = None
+        self.mark_style_dirty()
+
     def _update_scale(self, oldval, value):
+        if oldval is None:  # first computation; ticks are computed by the range handler
+            return
         r = self.computed_style['range']
-        self.computed_style['range'] = (r[0], r[1], None)   # clear the step
+        r_set = self.export_style().get('range')
+        self.computed_style['range'] = (r[0], r[1], r_set[2] if r_set else None)   # clear the step unless it is set
         self._update_ticks()
 
     def _update_ticks(self):
@@ -85,15 +95,18 @@ class Axis(FigObject):
 
 
 class Tick(FigObject):
+
+    custom_style_setter = _gen_fontprops_setter('tick')
+    custom_style_getter = _gen_fontprops_getter()
+    style_change_handler = {
+        'format': lambda self, a, b: self._update_formatter(a, b),
+        'fontfamily': lambda self, a, b: self.render_callback(1) if self.render_callback else None,
+        'fontprops': lambda self, a, b: self.render_callback(1) if self.render_callback else None,
+        'visible': lambda self, a, b: self.render_callback() if self.render_callback else None,
+    }
+
     def __init__(self, name):
-        super().__init__('tick', name, {
-            **_gen_fontprops_setter(self, defaults.default_style_sheet.find_type('tick')),}, {
-            **_gen_fontprops_getter(self)}, {
-            'format': self._update_formatter,
-            'fontfamily': lambda a, b: self.render_callback(1) if self.render_callback else None,
-            'fontprops': lambda a, b: self.render_callback(1) if self.render_callback else None,
-            'visible': lambda a, b: self.render_callback() if self.render_callback else None,
-            })
+        super().__init__('tick', name)
 
     def _update_formatter(self, oldval, value):
 
@@ -116,16 +129,19 @@ class Grid(FigObject):
         super().__init__('grid', name)
 
 class Legend(FigObject):
+
+    custom_style_setter = _gen_fontprops_setter('legend')
+    custom_style_getter = _gen_fontprops_getter()
+    style_change_handler = {
+        'fontprops': lambda self, a, b: self._check_render(),
+        'fontfamily': lambda self, a, b: self._check_render(),
+        'visible': lambda self, a, b: self._check_render(),
+        'pos': lambda self, a, b: self._check_render(),
+        'column': lambda self, a, b: self._check_render(),
+    }
+
     def __init__(self, name):
-        super().__init__('legend', name, {
-            **_gen_fontprops_setter(self, defaults.default_style_sheet.find_type('legend')),}, {
-            **_gen_fontprops_getter(self)}, {
-            'fontprops': lambda a, b: self._check_render(),
-            'fontfamily': lambda a, b: self._check_render(),
-            'visible': lambda a, b: self._check_render(),
-            'pos': lambda a, b: self._check_render(),
-            'column': lambda a, b: self._check_render(),
-        })
+        super().__init__('legend', name)
         # TODO it is known that add dataline will change legend without auto positioning
     def _check_render(self):
         pos = self.attr('pos')
@@ -140,31 +156,37 @@ class Legend(FigObject):
                 break
             
 class SupLegend(FigObject):
+
+    custom_style_setter = _gen_fontprops_setter('legend')
+    custom_style_getter = _gen_fontprops_getter()
+    style_change_handler = {
+        'fontprops': lambda self, a, b: self.render_callback(2) if self.render_callback else None,
+        'fontfamily': lambda self, a, b: self.render_callback(2) if self.render_callback else None,
+        'visible': lambda self, a, b: self.render_callback(2) if self.render_callback else None,
+        'pos': lambda self, a, b: self.render_callback(2) if self.render_callback else None,
+        'column': lambda self, a, b: self.render_callback(2) if self.render_callback else None,
+        'source': lambda self, a, b: self.render_callback(2) if self.render_callback else None,
+    }
+
     def __init__(self, name):
-        super().__init__('legend', name, {
-            **_gen_fontprops_setter(self, defaults.default_style_sheet.find_type('legend')),}, {
-            **_gen_fontprops_getter(self)}, {
-            'fontprops': lambda a, b: self.render_callback(2) if self.render_callback else None,
-            'fontfamily': lambda a, b: self.render_callback(2) if self.render_callback else None,
-            'visible': lambda a, b: self.render_callback(2) if self.render_callback else None,
-            'pos': lambda a, b: self.render_callback(2) if self.render_callback else None,
-            'column': lambda a, b: self.render_callback(2) if self.render_callback else None,
-            'source': lambda a, b: self.render_callback(2) if self.render_callback else None,
-        })
+        super().__init__('legend', name)
     
 
 class DataLine(FigObject):
 
+    custom_style_setter = {
+        'color': lambda self, s, v: _set_color(s, v),
+        'label': lambda self, s, v: self._set_label(s, v),
+        'data': lambda self, s, v: _set_data(self, v),
+    }
+    style_change_handler = {
+        'side': lambda self, o, n: self._update_ext()
+    }
+
     def __init__(self, data, label, xlabel, name):
         self.data = data
 
-        super().__init__('line', name, {
-            'color':_set_color,
-            'label':self._set_label,
-            'data': lambda s,v: _set_data(self, v),
-        }, {}, {
-            'side': lambda o,n: self._update_ext()
-        })
+        super().__init__('line', name)
         self.update_style({
             'label':label, 'xlabel':xlabel, 'skippoint':1
         })
@@ -185,21 +207,25 @@ class DataLine(FigObject):
     def _update_ext(self):
         self._ext_cache = (np.min(self.data.get_x()), np.max(self.data.get_x()), 
             np.min(self.data.get_y()), np.max(self.data.get_y()))
+        _invalidate_ticks(self)
 
 
 class SmartDataLine(FigObject):
 
+    custom_style_setter = {
+        'color': lambda self, s, v: _set_color(s, v),
+        'range': lambda self, s, v: self._set_range(s, v),
+        'data': lambda self, s, v: _set_data(self, v),
+    }
+    style_change_handler = {
+        'range': lambda self, o, n: self._update_ext(o, n),
+        'side': lambda self, o, n: self._update_ext(None, self.computed_style['range']),
+    }
+
     def __init__(self, data, label, xlabel, name):
         self.data = data
 
-        super().__init__('line', name, {
-            'color':_set_color,
-            'range': self._set_range,
-            'data': lambda s,v: _set_data(self, v),
-        }, {}, {
-            'range': self._update_ext,
-            'side': lambda o,n: self._update_ext(None, self.computed_style['range']),
-        })
+        super().__init__('line', name)
         self.update_style({
             'label':label, 'xlabel':xlabel
         })
@@ -212,6 +238,7 @@ class SmartDataLine(FigObject):
         self.data.update(np.arange(value[0], value[1] + step_, step_))
         self._ext_cache = (value[0], value[1] + step_, 
             np.min(self.data.get_y()), np.max(self.data.get_y()))
+        _invalidate_ticks(self)
 
     def _update_data(self, data):
         self.data = data
@@ -219,6 +246,20 @@ class SmartDataLine(FigObject):
 
 class Bar(FigObject):
 
+    custom_style_setter = {
+        'edgecolor': lambda self, s, v: s.update({'linecolor':v}),
+        'color': lambda self, s, v: self._set_color(s, v),
+        'bin': lambda self, s, v: self._set_bin(s, v),
+        'norm': lambda self, s, v: self._set_norm(s, v),
+        'data': lambda self, s, v: _set_data(self, v),
+    }
+    style_change_handler = {
+        'bin': lambda self, o, n: self._update_bin(o, n),
+        'norm': lambda self, o, n: self._update_norm(o, n),
+        'width': lambda self, o, n: self._update_width(o, n),
+        'side': lambda self, o, n: self._update_ext(),
+    }
+
     def __init__(self, data, label, xlabel, dynamic_bin, name):
 
         self.dynamic_bin = dynamic_bin
@@ -228,18 +269,7 @@ class Bar(FigObject):
 
         self.data = data
 
-        super().__init__('bar', name, {
-            'edgecolor': lambda s,v: s.update({'linecolor':v}),
-            'color':self._set_color,
-            'bin':self._set_bin,
-            'norm':self._set_norm,
-            'data': lambda s,v: _set_data(self, v),
-        }, {}, {
-            'bin': self._update_bin,
-            'norm': self._update_norm,
-            'width': self._update_width,
-            'side': lambda o,n: self._update_ext,
-        })
+        super().__init__('bar', name)
         self.update_style({
             'label':label, 'xlabel':xlabel,
         })
@@ -283,26 +313,31 @@ class Bar(FigObject):
         self._ext_cache = (np.min(x) - self.computed_style['barwidth']/2,
             np.max(x) + self.computed_style['barwidth']/2,
             np.min(y), np.max(y))
+        _invalidate_ticks(self)
 
 
 class DrawLine(FigObject):
 
+    custom_style_setter = {
+        'color': lambda self, s, v: _set_color(s, v),
+    }
+
     def __init__(self, start_pos, end_pos, name):
 
-        super().__init__('drawline', name, {
-            'color':_set_color
-        })
+        super().__init__('drawline', name)
         self.update_style({'startpos':start_pos, 'endpos':end_pos})
     
 
 class Polygon(FigObject):
 
+    custom_style_setter = {
+        'edgecolor': lambda self, s, v: s.update({'linecolor':v}),
+        'color': lambda self, s, v: self._set_color(s, v),
+    }
+
     def __init__(self, data, name):
         self.data = data
-        super().__init__('polygon', name, {
-            'edgecolor': lambda s,v: s.update({'linecolor':v}),
-            'color':self._set_color
-        })
+        super().__init__('polygon', name)
 
     def _set_color(self, m_style, value):
         # Note this is different from _set_color.
@@ -312,29 +347,40 @@ class Polygon(FigObject):
 
 class Text(FigObject):
 
+    custom_style_setter = _gen_fontprops_setter('text')
+    custom_style_getter = _gen_fontprops_getter()
+    style_change_handler = {
+        'fontfamily': lambda self, a, b: self.render_callback(1) if self.render_callback else None,
+        'fontprops': lambda self, a, b: self.render_callback(1) if self.render_callback else None,
+        'pos': lambda self, a, b: self.render_callback() if self.render_callback else None, 
+        'text': lambda self, a, b: self.render_callback(1) if self.render_callback else None,
+        'visible': lambda self, a, b: self.render_callback() if self.render_callback else None,
+    }
+
     def __init__(self, text, pos, name):
 
-        super().__init__('text', name, {
-            **_gen_fontprops_setter(self, defaults.default_style_sheet.find_type('text')),}, {
-            **_gen_fontprops_getter(self)}, {
-            'fontfamily': lambda a, b: self.render_callback(1) if self.render_callback else None,
-            'fontprops': lambda a, b: self.render_callback(1) if self.render_callback else None,
-            'pos': lambda a, b: self.render_callback() if self.render_callback else None, 
-            'text': lambda a, b: self.render_callback(1) if self.render_callback else None,
-            'visible': lambda a, b: self.render_callback() if self.render_callback else None,
-        })
+        super().__init__('text', name)
         self.update_style({'text':text, 'pos':pos})
 
 
 class Label(FigObject):
+
+    custom_style_setter = _gen_fontprops_setter('label')
+    custom_style_getter = _gen_fontprops_getter()
+    style_change_handler = {
+        'fontfamily': lambda self, a, b: self.render_callback(1) if self.render_callback else None,
+        'fontprops': lambda self, a, b: self.render_callback(1) if self.render_callback else None,
+        'pos': lambda self, a, b: self.render_callback() if self.render_callback else None, 
+        'text': lambda self, a, b: self.render_callback(1) if self.render_callback else None,
+        'visible': lambda self, a, b: self.render_callback() if self.render_callback else None,
+    }
+
     def __init__(self, name):
 
-        super().__init__('label', name, {
-            **_gen_fontprops_setter(self, defaults.default_style_sheet.find_type('label')),}, {
-            **_gen_fontprops_getter(self)}, {
-            'fontfamily': lambda a, b: self.render_callback(1) if self.render_callback else None,
-            'fontprops': lambda a, b: self.render_callback(1) if self.render_callback else None,
-            'pos': lambda a, b: self.render_callback() if self.render_callback else None, 
-            'text': lambda a, b: self.render_callback(1) if self.render_callback else None,
-            'visible': lambda a, b: self.render_callback() if self.render_callback else None,
-        })
+        super().__init__('label', name)
+
+
+def _invalidate_ticks(element):
+    # axes of the subfigure depend on data extents of the element
+    if element.parent is not None:
+        element.parent.invalidate_ticks()
@@ -7,27 +7,29 @@ from . import defaults
 from . import errors
 
 
-class FigObject:
+class FigObject(css.Stylable):
     """ Style-modifiable object in the figure.
     """
 
-    def __init__(self, typename, name, custom_style_setter={}, custom_style_getter={}, style_change_handler={}):
+    # Tables shared by all instances of a class (not per-instance closures):
+    custom_style_setter = {}    # name -> lambda accepts self, style, value;
+    custom_style_getter = {}    # name -> lambda accepts self, style;
+    style_change_handler = {}   # name -> lambda accepts self, oldstyle, newstyle;
+
+    def __init__(self, typename, name):
         """ typename -> object idenfier;
             name -> object name;
-            custom_style_setter: lambda accepts style, value, priority;
-            custom_style_getter: lambda accepts name;
-            style_change_handler: lambda accepts oldstyle, newstyle;
         """
 
+        super().__init__()
         self.typename = typename
         self.name = name
-        self.classnames = []
         self.style = [css.Style(), css.Style()]        # style stack
-        self.computed_style = None
-        self.custom_style_setter = custom_style_setter   # dict of lambda exprs.
-        self.custom_style_getter = custom_style_getter
-        self.style_change_handler = style_change_handler
         self.render_callback = None
+        self.backend = None                 # object drawn by backend, kept between renders
+        self.tree_version = 0               # increased when names, classes or children of it or its descendants are changed
+        self._index = None
+        self._index_version = None
 
     def update_style(self, style_dict={}, priority=1, **ex_styles):
         """ Update style from style_dict (and ex_styles).
@@ -40,32 +42,40 @@ class FigObject:
         has_updated = False
 
         target = self.style[priority]
+        entries = defaults.default_style_entries[self.typename]
         ex_styles.update(style_dict)
         for d, v in ex_styles.items():
             if d in self.custom_style_setter:
-                self.custom_style_setter[d](target, v)
+                self.custom_style_setter[d](self, target, v)
                 has_updated = True
-            elif d in defaults.default_style_entries[self.typename]:
+            elif d in entries:
                 target[d] = v
                 has_updated = True
             else:
                 warnings.warn('Skipping invalid style: "%s"' % d)
 
+        if has_updated:
+            self.mark_style_dirty()
         return has_updated
 
     def remove_style(self, name, priority=1):
         """ Remove certain value in styles. Won't raise error if failed.
         """
-        self.style[priority].pop(name, None)
+        if name in self.style[priority]:
+            self.style[priority].pop(name)
+            self.mark_style_dirty()
 
     def clear_style(self, priority=1):
         """ Remove value in styles
         """
         if priority == 'all':
             for s in self.style:
-                s.clear()
-        else:
+                if s:
+                    s.clear()
+                    self.mark_style_dirty()
+        elif self.style[priority]:
             self.style[priority].clear()
+            self.mark_style_dirty()
 
     def get_style(self, name, raise_error=True, default=None):
         """ Get value of style.
@@ -75,9 +85,9 @@ class FigObject:
 
         raise KeyError if value not found.
         """
+        if name in self.custom_style_getter:
+            return self.custom_style_getter[name](self, self.style[-1])
         for s in reversed(self.style):
-            if name in self.custom_style_getter:
-                return self.custom_style_getter[name](s)
             try:
                 return s[name]
             except KeyError:
@@ -119,13 +129,14 @@ class FigObject:
             oldst = old_style.get(s, None)
             newst = new_style[s]
             if oldst != newst:
-                v(oldst, newst)
+                v(self, oldst, newst)
 
     def add_class(self, name):
         """ Add a name to class
         """
         if name not in self.classnames:
             self.classnames.append(name)
+            self.invalidate_index()
 
     def remove_class(self, name):
         """ Remove style class without error
@@ -134,9 +145,32 @@ class FigObject:
             self.classnames.pop(self.classnames.index(name))
         except ValueError:
             pass
+        else:
+            self.invalidate_index()
 
     def has_name(self, name):
-        return name == self.name
+        return name in self.get_names()
+
+    def get_names(self):
+        return [self.name]
 
     def get_children(self):
-        return []
\ No newline at end of file
+        return []
+
+    def get_index(self):
+        """ Return `css.ElementIndex` of the element and its children.
+        """
+        if self._index_version != self.tree_version:
+            self._index = css.ElementIndex(self)
+            self._index_version = self.tree_version
+        return self._index
+
+    def invalidate_index(self):
+        """ Mark indices of the element and its ancestors as outdated. Must be called
+        after names, classes or children are changed.
+        """
+        e = self
+        while e is not None:
+            e.tree_version += 1
+            e = e.parent
+        self.mark_subtree_dirty()     # new children need to be styled
\ No newline at end of file
@@ -1,5 +1,6 @@
 
 from . import FigObject
+from . import css
 from . import Subfigure
 from . import defaults
 from .component import Text, SupLegend
@@ -9,6 +10,24 @@ from ..style import FloatingPos
 
 class Figure(FigObject):
 
+    custom_style_setter = {
+        'dpi': lambda self, s, v: self._set_dpi(s, v),
+        'title': lambda self, s, v: self.title.update_style({'text': v}),
+        **_gen_size_setter('figure'),
+        **_gen_margin_setter('figure'),
+        **_gen_spacing_setter('figure'),
+        **_gen_fontprops_setter('figure'),
+    }
+    custom_style_getter = {
+        **_gen_size_getter(),
+        **_gen_margin_getter(),
+        **_gen_spacing_getter(),
+        **_gen_fontprops_getter(),
+    }
+    style_change_handler = {
+        'size': lambda self, a, b: self.render_callback() if self.render_callback else None,
+        'margin': lambda self, a, b: self.render_callback() if self.render_callback else None,
+    }
 
     def __init__(self, figure_name):
         
@@ -19,25 +38,13 @@ class Figure(FigObject):
         self.cur_subfigure = 0      # index of subfigure
         self.is_changed = True      # changed
         self.needs_rerender = 0     # 0 -- nothing; 1 -- compact only; 2 -- compact + render
+        self.estimate_rejected = False  # estimated frames were not reproduced by rendering; always compact by rendering
         self.set_dynamical = True
+        self.applied_style_key = None   # versions of stylesheets and tree, when they were last applied to all subfigures
         self.backend = None         # object for plotting
+        super().__init__('figure', figure_name)
 
-        super().__init__('figure', figure_name, {
-            'dpi':self._set_dpi,
-            'title': lambda s,v: self.title.update_style({'text': v}),
-            **_gen_size_setter(self, defaults.default_style_sheet.find_type('figure')),
-            **_gen_margin_setter(self, defaults.default_style_sheet.find_type('figure')),
-            **_gen_spacing_setter(self, defaults.default_style_sheet.find_type('figure')),
-            **_gen_fontprops_setter(self, defaults.default_style_sheet.find_type('figure')),
-        }, {
-            **_gen_size_getter(self),
-            **_gen_margin_getter(self),
-            **_gen_spacing_getter(self),
-            **_gen_fontprops_getter(self),
-        }, {
-            'size': lambda a, b: self.render_callback() if self.render_callback else None,
-            'margin': lambda a, b: self.render_callback() if self.render_callback else None,
-        })
+        self._indices = {}          # (set_dynamical, cur_subfigure) -> index of children
 
         self.update_render_callback()
 
@@ -55,8 +62,8 @@ class Figure(FigObject):
             defaults.default_options['physical-figure-size'][0]*m_style['dpi'],
             defaults.default_options['physical-figure-size'][1]*m_style['dpi']]
 
-    def has_name(self, name):
-        return name == 'gcf' or name == self.name
+    def get_names(self):
+        return ['gcf', self.name]
 
     def get_children(self):
         if self.set_dynamical:
@@ -64,10 +71,24 @@ class Figure(FigObject):
         else:
             return self.subfigures + [self.title, self.legend]
 
+    def get_index(self):
+        if self._index_version != self.tree_version:
+            self._indices = {}
+            self._index_version = self.tree_version
+        key = (self.set_dynamical, self.cur_subfigure if self.set_dynamical else None)
+        if key not in self._indices:
+            self._indices[key] = css.ElementIndex(self)
+        return self._indices[key]
+
     def clear_backend(self):
+        """ Detach all backend objects, so they are recreated at next render.
+        """
         self.backend = None
+        self.title.backend = None
+        self.legend.backend = None
         for m_subfig in self.subfigures:
-            m_subfig.backend = None
+            for e in m_subfig.get_index().elements:
+                e.backend = None
 
     def update_render_callback(self):
         self.render_callback = self._render_callback
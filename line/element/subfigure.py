@@ -3,44 +3,47 @@ from . import FigObject
 from . import errors
 
 from .component import *
-from .. import defaults
 from ._aux import _gen_fontprops_getter, _gen_fontprops_setter, _gen_padding_getter, _gen_padding_setter
 
 class Subfigure(FigObject):
 
+    custom_style_setter = {
+        'xlabel': lambda self, s, v: self.axes[0].label.update_style({'text': v}, priority=self._style_priority(s)),
+        'ylabel': lambda self, s, v: self.axes[1].label.update_style({'text': v}, priority=self._style_priority(s)),
+        'y2label': lambda self, s, v: self.axes[2].label.update_style({'text': v}, priority=self._style_priority(s)),
+        'x2label': lambda self, s, v: self.axes[3].label.update_style({'text': v}, priority=self._style_priority(s)),
+        'xrange': lambda self, s, v: self.axes[0].update_style({'range': v}, priority=self._style_priority(s)),
+        'yrange': lambda self, s, v: self.axes[1].update_style({'range': v}, priority=self._style_priority(s)),
+        'y2range': lambda self, s, v: self.axes[2].update_style({'range': v}, priority=self._style_priority(s)),
+        'x2range': lambda self, s, v: self.axes[3].update_style({'range': v}, priority=self._style_priority(s)),
+        'xscale': lambda self, s, v: self.axes[0].update_style({'scale': v}, priority=self._style_priority(s)),
+        'yscale': lambda self, s, v: self.axes[1].update_style({'scale': v}, priority=self._style_priority(s)),
+        'y2scale': lambda self, s, v: self.axes[2].update_style({'scale': v}, priority=self._style_priority(s)),
+        'x2scale': lambda self, s, v: self.axes[3].update_style({'scale': v}, priority=self._style_priority(s)),
+        'title': lambda self, s, v: self.title.update_style({'text': v}),
+        'legend': lambda self, s, v: self._set_legend(s, v),
+        **_gen_padding_setter('subfigure'),
+        **_gen_fontprops_setter('subfigure'),
+    }
+    custom_style_getter = {
+        'xlabel': lambda self, x: self.axes[0].get_style('text'),
+        'ylabel': lambda self, x: self.axes[1].get_style('text'),
+        'y2label': lambda self, x: self.axes[2].get_style('text'),
+        'x2label': lambda self, x: self.axes[3].get_style('text'),
+        'xrange': lambda self, x: self.axes[0].get_style('range'),
+        'yrange': lambda self, x: self.axes[1].get_style('range'),
+        'y2range': lambda self, x: self.axes[2].get_style('range'),
+        'x2range': lambda self, x: self.axes[3].get_style('range'),
+        **_gen_padding_getter(),
+        **_gen_fontprops_getter(),
+    }
+    style_change_handler = {
+        'group': lambda self, oldst, newst: self.update_colorid() if newst else None,
+    }
+
     def __init__(self, subfigure_name):
 
-        super().__init__('subfigure', subfigure_name, {
-            'xlabel': lambda s,v:self.axes[0].label.update_style({'text': v}, priority=self._style_priority(s)),
-            'ylabel': lambda s,v:self.axes[1].label.update_style({'text': v}, priority=self._style_priority(s)),
-            'y2label': lambda s,v:self.axes[2].label.update_style({'text': v}, priority=self._style_priority(s)),
-            'x2label': lambda s,v:self.axes[3].label.update_style({'text': v}, priority=self._style_priority(s)),
-            'xrange': lambda s,v:self.axes[0].update_style({'range': v}, priority=self._style_priority(s)),
-            'yrange': lambda s,v:self.axes[1].update_style({'range': v}, priority=self._style_priority(s)),
-            'y2range': lambda s,v:self.axes[2].update_style({'range': v}, priority=self._style_priority(s)),
-            'x2range': lambda s,v:self.axes[3].update_style({'range': v}, priority=self._style_priority(s)),
-            'xscale': lambda s,v:self.axes[0].update_style({'scale': v}, priority=self._style_priority(s)),
-            'yscale': lambda s,v:self.axes[1].update_style({'scale': v}, priority=self._style_priority(s)),
-            'y2scale': lambda s,v:self.axes[2].update_style({'scale': v}, priority=self._style_priority(s)),
-            'x2scale': lambda s,v:self.axes[3].update_style({'scale': v}, priority=self._style_priority(s)),
-            'title': lambda s,v: self.title.update_style({'text': v}),
-            'legend': self._set_legend,
-            **_gen_padding_setter(self, defaults.default_style_sheet.find_type('subfigure')),
-            **_gen_fontprops_setter(self, defaults.default_style_sheet.find_type('subfigure')),
-        }, {
-            'xlabel': lambda x:self.axes[0].get_style('text'),
-            'ylabel': lambda x:self.axes[1].get_style('text'),
-            'y2label': lambda x:self.axes[2].get_style('text'),
-            'x2label': lambda x:self.axes[3].get_style('text'),
-            'xrange': lambda x:self.axes[0].get_style('range'),
-            'yrange': lambda x:self.axes[1].get_style('range'),
-            'y2range': lambda x:self.axes[2].get_style('range'),
-            'x2range': lambda x:self.axes[3].get_style('range'),
-            **_gen_padding_getter(self),
-            **_gen_fontprops_getter(self),
-        }, {
-            'group': lambda oldst, newst: self.update_colorid() if newst else None,
-        })
+        super().__init__('subfigure', subfigure_name)
 
         self.axes = [Axis('xaxis', extent_callback = lambda: self.update_extents(0)), 
             Axis('yaxis', extent_callback = lambda: self.update_extents(1)), 
@@ -60,14 +63,22 @@ class Subfigure(FigObject):
         self.on_size_changed = None
 
         self._legend_candidates = []
+        self._render_state = None       # styles at last rendering, used by backend to blit data changes
+        self._blit_background = None
 
 
-    def has_name(self, name):
-        return name == 'gca' or self.name == name
+    def get_names(self):
+        return ['gca', self.name]
 
     def get_children(self):
         return [self.legend] + [self.title] + self.datalines + self.bars + self.drawlines + self.polygons + self.texts + self.axes
 
+    def invalidate_ticks(self):
+        """ Recompute ticks of all axes, since data extents are changed.
+        """
+        for a in self.axes:
+            a.invalidate_ticks()
+
     def update_render_callback(self):
 
         for a in self.axes:
@@ -92,6 +103,7 @@ class Subfigure(FigObject):
         if styles:
             element_queue[-1].update_style(styles)
         self.is_changed = True
+        self.invalidate_index()
         return element_queue[-1]
 
     def _refresh_colorid(self):
@@ -159,6 +171,8 @@ class Subfigure(FigObject):
                 for i in range(idx, len(elem_queue)):
                     elem_queue[i].name = '%s%d' % (prefix, i+1)
             self.is_changed = True
+            self.invalidate_index()
+            self.invalidate_ticks()
 
     def clear(self, remove_label=False):
         """ Clear lines and texts but keep style.
@@ -173,6 +187,8 @@ class Subfigure(FigObject):
             for i in range(4):
                 self.axes[i].label.update_style({'text': style.css.SpecialStyleValue.DEFAULT})
         self.is_changed = True
+        self.invalidate_index()
+        self.invalidate_ticks()
 
     def get_axes_coord(self, pos, axis_id):
         """ Transform axis coord to data coord.
@@ -239,12 +255,15 @@ class Subfigure(FigObject):
     def _activate_axis(self, b):
         """ Activate corresponding axis
         """
-        for i in range(4):
-            s = b.get_style('side', raise_error=False, default=(style.FloatingPos.LEFT, style.FloatingPos.BOTTOM))
-            self.axes[{style.FloatingPos.LEFT:1, style.FloatingPos.RIGHT:2}[s[0]]].update_style({'enabled': True})
-            self.axes[{style.FloatingPos.BOTTOM:0, style.FloatingPos.TOP:3}[s[1]]].update_style({'enabled': True})
+        s = b.get_style('side', raise_error=False, default=(style.FloatingPos.LEFT, style.FloatingPos.BOTTOM))
+        self.axes[_yaxis_of_side[s[0]]].update_style({'enabled': True})
+        self.axes[_xaxis_of_side[s[1]]].update_style({'enabled': True})
+
+
+_yaxis_of_side = {style.FloatingPos.LEFT:1, style.FloatingPos.RIGHT:2}
+_xaxis_of_side = {style.FloatingPos.BOTTOM:0, style.FloatingPos.TOP:3}
+
 
-        
 def _update_axis_label(datalines, bars, axis, horizontal):
     # subrotine called by subfigure.set_automatic_labels
 
@@ -1,9 +1,14 @@
 
 import re
+import ast
+import sys
 import logging
+import functools
+import operator
 import numpy as np
 import pandas as pd
 import warnings
+from collections import namedtuple, ChainMap
 
 from . import stat_util
 from . import model
@@ -19,6 +24,37 @@ _SPECIAL_BRACKET_MAPPER = {'$(': '(', '$!(': 'python('}
 
 logger = logging.getLogger('line')
 
+EXPR_CACHE_SIZE = 1024  # number of compiled expressions kept by `compile_expr`
+VECTOR_MIN_SIZE = 65536     # arrays shorter than this are always evaluated by `eval`
+VECTOR_BLOCK_SIZE = 65536   # rows evaluated at once by the numpy backend
+
+# elementwise functions and operators supported by vectorized evaluation; operators are
+# applied as in `eval' (e.g. `x**2' of arrays is `np.square' instead of `np.power')
+_VECTOR_FUNCTIONS = ('sin', 'cos', 'tan', 'exp', 'log', 'sinh', 'cosh', 'tanh', 'sqrt', 'abs')
+_VECTOR_BINOPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Pow: operator.pow,
+    ast.Mod: operator.mod,
+}
+_VECTOR_UNARYOPS = {
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+
+vector_backend = 'auto'     # 'auto' (numexpr if installed, otherwise numpy)/'numpy'/'python' (disabled)
+
+CompiledExpr = namedtuple('CompiledExpr', ['source', 'code', 'variables', 'vector'])
+
+
+def set_vector_backend(backend):
+    """ Set the backend of vectorized evaluation. See `vector_backend'.
+    """
+    global vector_backend
+    vector_backend = backend
+
 class ExprEvaler:
 
     FUNCTIONS = {
@@ -59,11 +95,14 @@ class ExprEvaler:
         self.m_globals['system'] = self.evaluate_shell
 
     def load(self, expr, omit_dollar=False, variable_prefix='__var'):
-        self.expr = canonicalize(expr, omit_dollar, variable_prefix=variable_prefix)
+        self.expr, self.code, self.variables, self.vector = compile_expr(expr, omit_dollar, variable_prefix)
         logger.debug(self.expr)
 
     def load_singlevar(self, expr):
         self.expr = ExprEvaler.convert_varname(expr)
+        self.code = None
+        self.variables = [self.expr]
+        self.vector = None
         logger.debug(self.expr)
     
     @staticmethod
@@ -101,7 +140,7 @@ class ExprEvaler:
     def evaluate(self):
         """ Evaluate expression; Return an array-like object.
         """
-        for v in _INNVAR_EXPR.findall(self.expr):
+        for v in self.variables:
             if v not in self.m_globals and v not in self.m_file_caches:
                 try:
                     self.m_file_caches[v] = model.load_file(self.strip_var(v))
@@ -132,7 +171,7 @@ class ExprEvaler:
         self.m_locals['cols'] = lambda x: model.util.loc_col_wildcard(self.hintvalue, str(x))
         self.m_locals['hint'] = lambda: self.hintvalue
       
-        for v in _INNVAR_EXPR.findall(self.expr):
+        for v in self.variables:
             if v not in self.m_globals and v not in self.m_file_caches:
                 try:
                     self.m_file_caches[v] = model.load_file(self.strip_var(v))
@@ -147,17 +186,169 @@ class ExprEvaler:
         return self._eval()
 
     def _eval(self, supress_builtins=True):
-        _m_globals = self.FUNCTIONS.copy()
-        _m_globals.update(self.m_file_caches)
-        _m_globals.update(self.m_globals)
+        # names are resolved lazily through layers, so nothing is copied per evaluation
+        m_namespace = ChainMap(self.m_locals, self.m_globals, self.m_file_caches, self.FUNCTIONS)
+        if self.vector is not None and vector_backend != 'python':
+            r = _eval_vector(self.expr, self.vector, m_namespace)
+            if r is not None:
+                return r
+
+        _m_globals = _Namespace(m_namespace)
         if supress_builtins:
-            _m_globals.update({'__builtins__': None})
-        return eval(self.expr, _m_globals, self.m_locals)
+            _m_globals['__builtins__'] = None
+        return eval(self.code if self.code is not None else self.expr, _m_globals, m_namespace)
 
     def strip_var(self, varname):
         return varname[5:]
         
         
+class _Namespace(dict):
+    """ Globals used in evaluation. Missing names fall back to `layers' -- names inside
+    comprehensions are looked up in globals instead of locals.
+    """
+
+    def __init__(self, layers):
+        super().__init__()
+        self.layers = layers
+
+    def __missing__(self, key):
+        return self.layers[key]
+
+
+@functools.lru_cache(maxsize=EXPR_CACHE_SIZE)
+def compile_expr(expr:str, omit_dollar=False, variable_prefix='__var'):
+    """ Canonicalize and compile expression. Returns `CompiledExpr` of canonicalized source,
+    code object (`None` if not compilable, so the error is raised by evaluation) and variables
+    referred and the tree for vectorized evaluation (`None` if not supported).
+    Results are cached, so expressions in loops are only compiled once.
+    """
+    source = canonicalize(expr, omit_dollar, variable_prefix=variable_prefix)
+    try:
+        code = compile(source, '<expr>', 'eval')
+    except SyntaxError:
+        return CompiledExpr(source, None, tuple(_INNVAR_EXPR.findall(source)), None)
+    return CompiledExpr(source, code, tuple(_INNVAR_EXPR.findall(source)), _parse_vector(source))
+
+
+def _parse_vector(source):
+    """ Return the AST of expression if it only contains arithmetic operators, elementwise
+    functions, variables and numbers. Otherwise return `None`.
+    """
+    if sys.version_info < (3, 8):   # numbers are not `ast.Constant'
+        return None
+    tree = ast.parse(source, mode='eval')
+    has_variable = False
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call):
+            if not (isinstance(node.func, ast.Name) and node.func.id in _VECTOR_FUNCTIONS and 
+                len(node.args) == 1 and not node.keywords):
+                return None
+        elif isinstance(node, ast.Name):
+            has_variable = has_variable or node.id not in _VECTOR_FUNCTIONS
+        elif isinstance(node, ast.BinOp):
+            if type(node.op) not in _VECTOR_BINOPS:
+                return None
+        elif isinstance(node, ast.UnaryOp):
+            if type(node.op) not in _VECTOR_UNARYOPS:
+                return None
+        elif isinstance(node, ast.Constant):
+            if not isinstance(node.value, (int, float)) or isinstance(node.value, bool):
+                return None
+        elif not isinstance(node, (ast.Expression, ast.expr_context, ast.operator, ast.unaryop)):
+            return None
+    return tree if has_variable else None
+
+
+def _eval_vector(source, tree, namespace):
+    """ Evaluate expression `source' (parsed as `tree') on raw arrays, by numexpr or by numpy
+    in blocks, so no full-size temporary is created for each operator.
+    Returns `None` if the operands are not suitable: they must be numbers, 1D numerical
+    arrays or single-column sheets of same length (at least `VECTOR_MIN_SIZE').
+    """
+    env = {}
+    sheets = []
+    size = None
+    for node in _iter_names(tree):
+        if node.id in _VECTOR_FUNCTIONS or node.id in env:
+            continue
+        v = namespace.get(node.id)
+        if isinstance(v, (int, float, np.number)) and not isinstance(v, bool):
+            env[node.id] = v
+            continue
+        if isinstance(v, model.SourceableSheet):
+            if v.cols() != 1 or (sheets and not v.data.index.equals(sheets[0].data.index)):
+                return None
+            sheets.append(v)
+            v = v.data.iloc[:, 0].to_numpy()
+        if not isinstance(v, np.ndarray) or v.ndim != 1 or v.dtype.kind not in 'iuf':
+            return None
+        if size is not None and len(v) != size:
+            return None
+        size = len(v)
+        env[node.id] = v
+
+    if size is None or size < VECTOR_MIN_SIZE:
+        return None
+
+    # numexpr differs from numpy in integer results and modulo of negative numbers
+    numexpr = _import_numexpr() if vector_backend == 'auto' else None
+    if numexpr is not None and (any(isinstance(v, np.ndarray) and v.dtype.kind != 'f' for v in env.values()) or
+        any(isinstance(node, ast.Mod) for node in ast.walk(tree))):
+        numexpr = None
+
+    with np.errstate(all='ignore'):     # same as pandas
+        if numexpr is not None:
+            r = numexpr.evaluate(source, local_dict=env, global_dict={})
+        else:
+            r = None
+            for i in range(0, size, VECTOR_BLOCK_SIZE):
+                b = _eval_block(tree.body, env, slice(i, i + VECTOR_BLOCK_SIZE))
+                if r is None:
+                    r = np.empty(size, dtype=b.dtype)
+                r[i:i+len(b)] = b
+
+    if not sheets:
+        return r
+    # keeps title, rows and weights same as evaluating by sheets
+    first = sheets[0]
+    return model.SourceableSheet(
+        pd.DataFrame(r[:, None], index=first.data.index, columns=first.data.columns[:1], copy=False), '<expr>',
+        rows=first.rows, weights=first.weights if all(s.weights is first.weights for s in sheets) else None)
+
+
+def _iter_names(node):
+    """ Yield names in the order of evaluation.
+    """
+    if isinstance(node, ast.Name):
+        yield node
+    for child in ast.iter_child_nodes(node):
+        yield from _iter_names(child)
+
+
+def _eval_block(node, env, slice_):
+
+    if isinstance(node, ast.BinOp):
+        return _VECTOR_BINOPS[type(node.op)](_eval_block(node.left, env, slice_), _eval_block(node.right, env, slice_))
+    elif isinstance(node, ast.UnaryOp):
+        return _VECTOR_UNARYOPS[type(node.op)](_eval_block(node.operand, env, slice_))
+    elif isinstance(node, ast.Call):
+        return ExprEvaler.FUNCTIONS[node.func.id](_eval_block(node.args[0], env, slice_))
+    elif isinstance(node, ast.Name):
+        v = env[node.id]
+        return v[slice_] if isinstance(v, np.ndarray) else v
+    else:
+        return node.value
+
+
+@functools.lru_cache(maxsize=None)
+def _import_numexpr():
+    try:
+        import numexpr
+    except ImportError:
+        return None
+    return numexpr
+
+
 def canonicalize(expr:str, omit_dollar=False, variable_prefix='__var'):
     """ Check expression quote, bracket and doing the following variable replacement:
     $foo => __varfoo
@@ -8,6 +8,7 @@ style_keywords = {
     'colorid',
     'column',
     'coord',
+    'decimate',
     'dpi',
     'enabled',
     'edgecolor', 'edgewidth',
@@ -30,6 +31,7 @@ style_keywords = {
     'palette',
     'pointsize', 'pointcolor', 'pointtype',
     'pos', 'rpos',
+    'rasterize',
     'range', 'xrange', 'yrange', 'x2range', 'y2range',
     'scale', 'xscale', 'yscale', 'x2scale', 'y2scale',
     'size', 'rsize',
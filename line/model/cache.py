@@ -0,0 +1,175 @@
+""" Persistent cache of parsed data files.
+"""
+
+import os
+import os.path
+import hashlib
+import json
+import threading
+import logging
+import numpy as np
+import pandas
+
+logger = logging.getLogger('line')
+
+
+class DataCache:
+    """ Stores parsed data (`pandas.DataFrame` with its column positions, etc.) in `cache_dir'.
+    Columns are stored as numpy arrays (npz, loaded without pickle so cache files never
+    execute code), and titles/positions/dtypes in a JSON file beside them.
+    Entries are keyed by (path, size, mtime, load arguments), so a modified file
+    or a different loading option never hits an outdated entry.
+    If the total size exceeds `max_size' (bytes; `None` means unlimited), least recently
+    used entries are removed.
+    """
+
+    SUFFIX = '.json'            # the JSON file is written last, so an entry exists only if it exists
+    DATA_SUFFIX = '.npz'
+    VERSION = 4     # bump when the layout of cached data changes
+
+    def __init__(self, cache_dir, max_size=None):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+
+    def make_key(self, filename, **load_args):
+        """ Return the key of file, or `None` if the file cannot be cached.
+        """
+        try:
+            st = os.stat(filename)
+        except OSError:
+            return None
+        key = repr((self.VERSION, os.path.abspath(filename), st.st_size, st.st_mtime_ns, sorted(load_args.items())))
+        return hashlib.sha1(key.encode()).hexdigest()
+
+    def get(self, key):
+        """ Return the cached data, or `None` if not found.
+        """
+        path = os.path.join(self.cache_dir, key)
+        if not os.path.isfile(path + self.SUFFIX):
+            return None
+        try:
+            with open(path + self.SUFFIX, 'r') as f:
+                meta = json.load(f)
+            with np.load(path + self.DATA_SUFFIX, allow_pickle=False) as arrays:
+                r = _decode(meta, arrays)
+        except Exception as e:
+            logger.debug('Discarding broken cache %s: %s' % (path, e))
+            return None
+        try:
+            os.utime(path + self.SUFFIX)     # mark as recently used
+        except OSError:
+            pass
+        return r
+
+    def put(self, key, data):
+        """ Write data into cache. Failures (including data cannot be stored as plain arrays)
+        are silently ignored.
+        """
+        path = os.path.join(self.cache_dir, key)
+        try:
+            meta, arrays = _encode(data)
+        except (TypeError, ValueError) as e:
+            logger.debug('Cannot cache %s: %s' % (path, e))
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = '%s.%d.%d.tmp' % (path, os.getpid(), threading.get_ident())
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, **arrays)
+            os.replace(tmp_path, path + self.DATA_SUFFIX)     # other processes never see a partial file
+            with open(tmp_path, 'w') as f:
+                json.dump(meta, f)
+            os.replace(tmp_path, path + self.SUFFIX)
+            if self.max_size is not None:
+                self.prune(self.max_size)
+        except OSError as e:
+            logger.debug('Cannot write cache %s: %s' % (path, e))
+
+    def prune(self, max_size):
+        """ Remove least recently used files until the total size is not larger than `max_size'.
+        """
+        entries = []
+        for fn in os.listdir(self.cache_dir):
+            if fn.endswith(self.SUFFIX):
+                path = os.path.join(self.cache_dir, fn[:-len(self.SUFFIX)])
+                try:
+                    st = os.stat(path + self.SUFFIX)
+                    size = st.st_size + os.path.getsize(path + self.DATA_SUFFIX)
+                except OSError:     # removed by another process
+                    continue
+                entries.append((st.st_mtime_ns, size, path))
+        total_size = sum(e[1] for e in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= max_size:
+                break
+            try:
+                os.remove(path + self.SUFFIX)
+                os.remove(path + self.DATA_SUFFIX)
+            except OSError:
+                continue
+            total_size -= size
+
+    def clear(self):
+        """ Remove all cached files.
+        """
+        if not os.path.isdir(self.cache_dir):
+            return
+        for fn in os.listdir(self.cache_dir):
+            if fn.endswith(self.SUFFIX) or fn.endswith(self.DATA_SUFFIX):
+                os.remove(os.path.join(self.cache_dir, fn))
+
+
+def _encode(data):
+    """ Split the result of `io._read_dataframe' into JSON-serializable metadata and
+    a dict of plain (non-object) arrays. Columns of strings are stored as unicode
+    arrays with a mask of missing values.
+    Raises TypeError/ValueError if data cannot be stored in this way.
+    """
+    meta = {'positions': data.get('positions'), 'rows': data.get('rows') is not None}
+    arrays = {}
+    for name in ('data', 'weights'):
+        df = data.get(name)
+        if df is None:
+            meta[name] = None
+            continue
+        columns = []
+        for i, c in enumerate(df.columns):
+            if not isinstance(c, (str, int, np.integer)):
+                raise TypeError('Column title %r' % (c,))
+            column = df.iloc[:, i]
+            is_str = column.dtype == object
+            if is_str:
+                missing = column.isna().to_numpy()
+                if not all(isinstance(v, str) for v in column[~missing]):
+                    raise TypeError('Column %r has objects other than str' % (c,))
+                arrays['%s_na%d' % (name, i)] = missing
+                arrays['%s%d' % (name, i)] = np.array(column.where(~missing, '').tolist(), dtype=str)
+            else:
+                arrays['%s%d' % (name, i)] = column.to_numpy()
+            columns.append([c if isinstance(c, str) else int(c), is_str])
+        meta[name] = columns
+    if meta['rows']:
+        arrays['rows'] = np.asarray(data['rows'])
+    json.dumps(meta)    # raises TypeError if not serializable
+    return meta, arrays
+
+
+def _decode(meta, arrays):
+    """ Inverse of `_encode'.
+    """
+    r = {'positions': meta['positions'], 'rows': arrays['rows'] if meta['rows'] else None}
+    for name in ('data', 'weights'):
+        if meta[name] is None:
+            r[name] = None
+            continue
+        columns = {}
+        for i, (c, is_str) in enumerate(meta[name]):
+            column = arrays['%s%d' % (name, i)]
+            if is_str:
+                column = column.astype(object)
+                column[arrays['%s_na%d' % (name, i)]] = np.nan
+            columns[i] = column
+        df = pandas.DataFrame(columns)
+        df.columns = [c for c, _ in meta[name]]
+        r[name] = df
+    return r
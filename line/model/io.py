@@ -9,35 +9,159 @@ import pandas
 import numpy as np
 import warnings
 import glob
+import zipfile
+import concurrent.futures
 
 from . import sheet
+from . import cache
+from . import stream
 
 logger = logging.getLogger('line')
 
-class SniffBuffer:
+data_cache = None   # `cache.DataCache` instance used by `load_single_file'; `None` means disabled
+load_workers = 1    # number of threads used when loading multiple files
+
+# binary formats, detected by extension first, then by magic bytes (unless the extension is of text)
+TEXT_EXTENSIONS = ('.txt', '.csv', '.tsv', '.dat')
+BINARY_EXTENSIONS = {
+    '.npy': 'npy',
+    '.npz': 'npz',
+    '.parquet': 'parquet',
+    '.feather': 'feather',
+    '.h5': 'hdf',
+    '.hdf': 'hdf',
+    '.hdf5': 'hdf',
+}
+BINARY_MAGICS = (
+    (b'\x93NUMPY', 'npy'),
+    (b'PK\x03\x04', 'npz'),
+    (b'PAR1', 'parquet'),
+    (b'ARROW1', 'feather'),
+    (b'\x89HDF\r\n\x1a\n', 'hdf'),
+)
+
+
+def set_data_cache(cache_dir, max_size=None):
+    """ Enable the persistent cache of parsed files in `cache_dir', of at most `max_size' bytes.
+    Disable it if `cache_dir' is `None'.
+    """
+    global data_cache
+    data_cache = cache.DataCache(cache_dir, max_size) if cache_dir else None
+
+
+def set_load_workers(workers):
+    """ Set number of threads used in loading multiple files. 1 means loading serially.
+    """
+    global load_workers
+    if workers < 1:
+        raise ValueError(workers)
+    load_workers = workers
+
+class PrefixedStream:
+    """ File-like object that replays the sniffed prefix before the rest of `fp'.
+    Used for non-seekable input (e.g. stdin), so the stream is never copied as a whole.
+    """
 
-    def __init__(self, fp):
+    def __init__(self, prefix, fp):
+        self.prefix = prefix
         self.fp = fp
-        self.buffer = ''
+
+    def read(self, size=-1):
+        if not self.prefix:
+            return self.fp.read(size)
+        if size is None or size < 0:
+            r = self.prefix + self.fp.read()
+            self.prefix = ''
+        else:
+            r = self.prefix[:size]
+            self.prefix = self.prefix[size:]
+        return r
 
     def readline(self):
-        if self.fp.seekable() and not self.fp is sys.stdin:
+        if not self.prefix:
             return self.fp.readline()
+        q = self.prefix.find('\n')
+        if q == -1:
+            r = self.prefix + self.fp.readline()
+            self.prefix = ''
         else:
-            r = self.fp.readline()
-            self.buffer += r
+            r = self.prefix[:q+1]
+            self.prefix = self.prefix[q+1:]
+        return r
+
+    def __iter__(self):
+        line = self.readline()
+        while line:
+            yield line
+            line = self.readline()
+
+
+class CommentFilteredStream:
+    """ File-like object skipping lines of `fp' with only whitespaces before comment, which
+    are parsed as empty rows by pandas. Used when `ignore_data_comment' is 'smart'.
+    """
+
+    _COMMENT_LINE = re.compile(r'^[^\S\n]*#[^\n]*(\n|$)', re.M)
+
+    def __init__(self, fp, block_size=65536):
+        self.fp = fp
+        self.block_size = block_size
+        self.buffer = ''    # filtered lines not read yet
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            r = self.buffer + self._COMMENT_LINE.sub('', self.fp.read())
+            self.buffer = ''
             return r
+        while len(self.buffer) < size:
+            block = read_prefix(self.fp, max(size, self.block_size))
+            if not block:
+                break
+            self.buffer += self._COMMENT_LINE.sub('', block)
+        r = self.buffer[:size]
+        self.buffer = self.buffer[size:]
+        return r
+
+    def readline(self):
+        if self.buffer:
+            q = self.buffer.find('\n')
+            r = self.buffer[:q+1] if q != -1 else self.buffer
+            self.buffer = self.buffer[len(r):]
+            return r
+        line = self.fp.readline()
+        while line and self._COMMENT_LINE.match(line):
+            line = self.fp.readline()
+        return line
+
+    def __iter__(self):
+        line = self.readline()
+        while line:
+            yield line
+            line = self.readline()
 
-    def get_fp_begin(self):
-        if self.fp.seekable() and not self.fp is sys.stdin:
-            self.fp.seek(0)
-            return self.fp
-        else:
-            m_fp = io.StringIO(self.buffer + self.fp.read())
-            return m_fp
 
-    def close(self):
-        self.fp.close()
+def read_prefix(fp, size):
+    """ Read at most `size' characters from `fp' (extended to the end of the last line).
+    """
+    prefix = fp.read(size)
+    if prefix and not prefix.endswith('\n'):
+        prefix += fp.readline()
+    return prefix
+
+
+def read_head(fp, sniff_num):
+    """ Read lines from `fp' until `sniff_num' lines of data (see `_sample_lines') are read.
+    Reading stops there, so interactive input is not blocked.
+    """
+    lines = []
+    n = 0
+    while n < sniff_num:
+        line = fp.readline()
+        if not line:
+            break
+        lines.append(line)
+        n += len(_sample_lines(io.StringIO(line), sniff_num=1))
+    return ''.join(lines)
 
 
 def load_file(*filenames, allow_wildcard=True, mode='auto', **kwargs):
@@ -49,7 +173,8 @@ def load_file(*filenames, allow_wildcard=True, mode='auto', **kwargs):
             'multiple': Always generate `SheetCollection';
             'auto': Determine type by number of files;
 
-    Additional args is passed to `load_single_file'.
+    Additional args is passed to `load_single_file'. Multiple files are loaded concurrently
+    by `load_workers' threads, keeping the order of filenames.
     """
 
     filenames_full = []
@@ -68,28 +193,80 @@ def load_file(*filenames, allow_wildcard=True, mode='auto', **kwargs):
     if mode == 'single' or (mode == 'auto' and len(filenames_full) == 1):
         return load_single_file(filenames_full[0], **kwargs)
     elif mode == 'multiple' or (mode == 'auto' and len(filenames_full) > 1):
-        return sheet.SheetCollection([
-            load_single_file(fn, **kwargs) for fn in filenames_full])
+        if load_workers > 1 and len(filenames_full) > 1:
+            # parsing mostly runs in pandas' C code, and file reading releases GIL
+            with concurrent.futures.ThreadPoolExecutor(min(load_workers, len(filenames_full))) as executor:
+                sheets = list(executor.map(lambda fn: load_single_file(fn, **kwargs), filenames_full))
+        else:
+            sheets = [load_single_file(fn, **kwargs) for fn in filenames_full]
+        return sheet.SheetCollection(sheets)
     else:
         raise ValueError(mode)
 
 
-def load_single_file(filename, *args, **kwargs):
+def load_single_file(filename, data_title='auto', data_delimiter='auto', ignore_data_comment=True, **kwargs):
     """ Load file as `SourceableSheet` instance.
+    If `data_cache' is set, the parsed data is read from/written into the cache
+    (binary files are never cached since they are not parsed).
     """
-    return sheet.SourceableSheet(load_dataframe(filename, *args, **kwargs), source=str(filename))
+    key = None
+    if data_cache is not None and isinstance(filename, str) and detect_format(filename) is None:
+        key = data_cache.make_key(filename, data_title=data_title, data_delimiter=data_delimiter,
+            ignore_data_comment=ignore_data_comment, **kwargs)
+    if key is not None:
+        r = data_cache.get(key)
+        if r is None:
+            r = _read_dataframe(filename, data_title, data_delimiter, ignore_data_comment, **kwargs)
+            data_cache.put(key, r)
+        else:
+            logger.debug('Loaded %s from cache' % filename)
+    else:
+        r = _read_dataframe(filename, data_title, data_delimiter, ignore_data_comment, **kwargs)
+
+    return sheet.SourceableSheet(source=str(filename), **r)
 
 def load_stdin(*args, **kwargs):
     
     return sheet.SourceableSheet(load_dataframe(sys.stdin, *args, **kwargs), source='<stdin>')
 
-def load_dataframe(filename, data_title='auto', data_delimiter='auto', ignore_data_comment=True, na_filter=True, sniff_num=5):
+def load_dataframe(filename, *args, **kwargs):
     """ Load file as `pandas.DataFrame` instance.
+    Args:
+        filename: Filename or file object;
+        data_title: Whether the first row is title. 'auto' means sniffing;
+        data_delimiter: Delimiter. 'white' means spaces and tabs; 'auto' means sniffing;
+        ignore_data_comment: True/False/'smart';
+        usecols: List of column positions (start from 0) or titles. Only these columns are
+            parsed. Ignored if any of them is not in the file;
+        reduce: None/'minmax'/'hist'. If set, the file is read in chunks of `stream.CHUNK_ROWS'
+            rows and only the reduced data (see `stream.REDUCERS') is kept.
+    Binary files (see `detect_format') are read by numpy/pandas directly, and arguments
+    for text files are ignored.
+    Only the first `sniff_num' lines of data are read for sniffing; the data itself is parsed
+    by pandas directly from the file (memory-mapped) or from the stream.
+    """
+    return _read_dataframe(filename, *args, **kwargs)['data']
+
+def _read_dataframe(filename, data_title='auto', data_delimiter='auto', ignore_data_comment=True, na_filter=True, 
+    usecols=None, reduce=None, sniff_num=5):
+    """ Implementation of `load_dataframe'. Returns dict of arguments of `SourceableSheet':
+    the DataFrame, positions of columns loaded (`None` if all columns are loaded),
+    and rows/weights if the data is reduced.
     """
 
+    fmt = detect_format(filename)
+    if fmt is not None:
+        return _read_binary(filename, fmt, usecols=usecols, reduce=reduce)
+
     is_buffer = not isinstance(filename, str)
-    f = SniffBuffer(open(filename, 'r') if not is_buffer else filename)
-    data_info = sniff(f, sniff_num=sniff_num)
+    f = open(filename, 'r') if not is_buffer else filename
+    try:
+        head = read_head(f, sniff_num)
+    finally:
+        if not is_buffer:
+            f.close()
+
+    data_info = sniff(io.StringIO(head), sniff_num=sniff_num)
     if data_title != 'auto':
         data_info['title'] = data_title
     if data_delimiter == 'white':
@@ -103,50 +280,185 @@ def load_dataframe(filename, data_title='auto', data_delimiter='auto', ignore_da
     else:
         data_info['comment'] = True
 
-    if data_info['comment'] == 'smart':
-        m_f = io.StringIO()
-        p_f = f.get_fp_begin()
-        line = p_f.readline()
-        while line:
-            q = line.find('#')
-            if q != -1:
-                line = line[:q]
-                if len(line) == 0 or line.isspace():
-                    pass
-                else:
-                    m_f.write(line[:q])
-                    m_f.write('\n')
-            else:
-                m_f.write(line)
-                m_f.write('\n')
-            line = p_f.readline()
-        data_info['comment'] = None
-    else:
-        m_f = f.get_fp_begin()
-
-    logger.debug(data_info)
-    r = pandas.read_csv(m_f,
+    read_args = dict(
         sep=data_info['delimiter'],
         header=0 if data_info['title'] else None,
         index_col=False,
         skip_blank_lines=True,
         skipinitialspace=True,
         comment='#' if data_info['comment'] else None,
-        na_filter=na_filter,
     )
+
+    positions = None
+    if usecols is not None:
+        positions = _resolve_usecols(head, read_args, usecols)
+
+    # lines with only whitespaces before comment are skipped, instead of parsed as empty rows
+    is_filtered = data_info['comment'] == 'smart'
     if not is_buffer:
-        f.close()
-    return r
+        m_f = open(filename, 'r') if is_filtered else filename
+    elif f.seekable() and not f is sys.stdin:
+        f.seek(0)
+        m_f = f
+    else:
+        m_f = PrefixedStream(head, f)
+    if is_filtered:
+        m_f = CommentFilteredStream(m_f)
+    memory_map = not is_buffer and not is_filtered
 
+    logger.debug(data_info)
+    try:
+        if reduce is not None:
+            return dict(positions=positions, **_read_reduced(m_f, stream.REDUCERS[reduce](),
+                na_filter=na_filter, memory_map=memory_map, usecols=positions, **read_args))
+
+        r = pandas.read_csv(m_f,
+            na_filter=na_filter,
+            memory_map=memory_map,
+            usecols=positions,
+            **read_args
+        )
+    finally:
+        if not is_buffer and is_filtered:
+            m_f.fp.close()
+    return dict(data=r, positions=positions)
+
+
+def _read_reduced(f, reducer, **kwargs):
+    """ Read file in chunks and feed them into reducer.
+    """
+    columns = None
+    reader = pandas.read_csv(f, chunksize=stream.CHUNK_ROWS, **kwargs)
+    try:
+        for chunk in reader:
+            if columns is None:
+                columns = list(chunk.columns)
+            reducer.add(chunk)
+    finally:
+        reader.close()
+    return reducer.result(columns if columns is not None else [])
+
+
+def _resolve_usecols(head, read_args, usecols):
+    """ Translate list of column positions/titles into sorted positions, by reading
+    the title in `head'. Returns `None` if any column does not exist.
+    """
+    try:
+        titles = list(pandas.read_csv(io.StringIO(head), nrows=1, **read_args).columns)
+    except (ValueError, pandas.errors.ParserError):
+        return None
+    return _match_columns(titles, usecols, read_args['header'] is not None)
 
-def sniff(f, default_delimiter=r'\s+', ignore_comment=True, sniff_num=5):
-    """ Different from csv.Sniffer -- this is for numerical data.
-    The only allowed delimiters are , tab and space.
+
+def _match_columns(titles, usecols, match_title=True):
+    """ Translate list of column positions/titles into sorted positions in `titles'.
+    Returns `None` if any column does not exist.
     """
+    positions = set()
+    for c in usecols:
+        if isinstance(c, int) and 0 <= c < len(titles):
+            positions.add(c)
+        elif match_title and c in titles:
+            positions.add(titles.index(c))
+        else:
+            return None
+    return sorted(positions)
 
-    lines = []
-    data_info = {}
 
+def detect_format(filename):
+    """ Return the binary format ('npy'/'npz'/'parquet'/'feather'/'hdf') of file,
+    by extension or magic bytes. Return `None` for text files and file objects.
+    Files with extensions in `TEXT_EXTENSIONS' are not opened.
+    """
+    if not isinstance(filename, str):
+        return None
+    ext = os.path.splitext(filename)[1].lower()
+    if ext in TEXT_EXTENSIONS:
+        return None
+    fmt = BINARY_EXTENSIONS.get(ext)
+    if fmt is not None:
+        return fmt
+    try:
+        with open(filename, 'rb') as f:
+            magic = f.read(8)
+    except OSError:
+        return None
+    for m, fmt in BINARY_MAGICS:
+        if magic.startswith(m):
+            return fmt if fmt != 'npz' or _is_npz(filename) else None
+    return None
+
+
+def _is_npz(filename):
+    """ Return if the zip file only contains npy files, as `numpy.savez' writes.
+    """
+    try:
+        with zipfile.ZipFile(filename) as f:
+            names = f.namelist()
+    except (OSError, zipfile.BadZipFile):
+        return False
+    return len(names) > 0 and all(name.endswith('.npy') for name in names)
+
+
+def _read_binary(filename, fmt, usecols=None, reduce=None):
+    """ Read binary file of format `fmt'. Returns the same as `_read_dataframe'.
+    npy files are memory-mapped; Parquet/Feather only read columns in `usecols' if all
+    of them are titles. Parquet/Feather/HDF5 require optional dependencies of pandas
+    (pyarrow/pytables).
+    """
+    positions = None
+    if fmt == 'npy':
+        r = _array_to_dataframe(np.load(filename, mmap_mode='r'))
+    elif fmt == 'npz':
+        with np.load(filename) as f:
+            arrays = {k: f[k] for k in f.files}
+        if len(arrays) == 1 and next(iter(arrays.values())).ndim > 1:
+            r = _array_to_dataframe(next(iter(arrays.values())))
+        else:   # each array is a column
+            r = pandas.DataFrame({k: v.ravel() for k, v in arrays.items()})
+    elif fmt in ('parquet', 'feather'):
+        names = list(usecols) if usecols is not None and all(isinstance(c, str) for c in usecols) else None
+        if fmt == 'parquet':
+            r = pandas.read_parquet(filename, columns=names)
+        else:
+            r = pandas.read_feather(filename, columns=names)
+        if names is not None:
+            usecols = None
+    elif fmt == 'hdf':
+        r = pandas.read_hdf(filename)
+    else:
+        raise ValueError(fmt)
+
+    if usecols is not None and fmt != 'npy':    # memory-mapped columns are free to keep
+        positions = _match_columns(list(r.columns), usecols)
+        if positions is not None:
+            r = r.iloc[:, positions]
+
+    if reduce is not None:
+        reducer = stream.REDUCERS[reduce]()
+        for i in range(0, len(r), stream.CHUNK_ROWS):
+            reducer.add(r.iloc[i:i+stream.CHUNK_ROWS])
+        return dict(positions=positions, **reducer.result(list(r.columns)))
+
+    return dict(data=r, positions=positions)
+
+
+def _array_to_dataframe(arr):
+    """ Wrap array as DataFrame without copying. 1D arrays become a single column
+    (or named columns for structured arrays); higher dimensions are flattened to 2D.
+    """
+    if arr.ndim == 1 and arr.dtype.names is None:
+        arr = arr[:, None]
+    elif arr.ndim > 2:
+        arr = arr.reshape(arr.shape[0], -1)
+    return pandas.DataFrame(arr, copy=False)
+
+
+def _sample_lines(f, ignore_comment=True, sniff_num=5, data_info=None):
+    """ Read at most `sniff_num' lines of data (without comments) from `f'.
+    `data_info['comment']' is set to 'smart' if a line has only whitespaces before comment.
+    """
+    lines = []
     line = f.readline()
 
     while line and len(lines) < sniff_num:
@@ -156,7 +468,7 @@ def sniff(f, default_delimiter=r'\s+', ignore_comment=True, sniff_num=5):
             line = line[:line.index('#')]
             if not line.isspace():
                 lines.append(line)
-            else:
+            elif data_info is not None:
                 data_info['comment'] = 'smart'
         elif len(line) == 0 or line.isspace():
             pass
@@ -164,7 +476,20 @@ def sniff(f, default_delimiter=r'\s+', ignore_comment=True, sniff_num=5):
             lines.append(line)
         
         line = f.readline()
+    return lines
+
 
+def sniff(f, default_delimiter=r'\s+', ignore_comment=True, sniff_num=5):
+    """ Different from csv.Sniffer -- this is for numerical data.
+    The only allowed delimiters are , tab and space.
+    """
+
+    data_info = {}
+    lines = _sample_lines(f, ignore_comment, sniff_num, data_info)
+    if not lines:
+        data_info['delimiter'] = default_delimiter
+        data_info['title'] = False
+        return data_info
 
     sample = ''.join(lines)
     spaces = re.findall(r'\s+', sample)
@@ -224,9 +549,13 @@ def sniff(f, default_delimiter=r'\s+', ignore_comment=True, sniff_num=5):
 
 def save_file(mat, path, columns=None, delimiter='\t', format_=None):
     """ Save the matrix into file.
+    if path has extension of binary format (.npy, .npz, .parquet, .feather, .h5), save in that format;
     if mat is pandas.DataFrame or SourceableSheet, use pandas save function;
     Otherwise invokes use np.savetxt().
     """
+    if isinstance(path, str) and os.path.splitext(path)[1].lower() in BINARY_EXTENSIONS:
+        return _save_binary(mat, path, BINARY_EXTENSIONS[os.path.splitext(path)[1].lower()], columns)
+
     if isinstance(mat, pandas.DataFrame):
         mat.to_csv(path, sep=delimiter, float_format=format_, index=False, header=columns if columns else True)
     elif isinstance(mat, sheet.SourceableSheet):
@@ -238,5 +567,30 @@ def save_file(mat, path, columns=None, delimiter='\t', format_=None):
         np.savetxt(path, mat, fmt=format_, delimiter=delimiter, header=header, comments='')
 
 
+def _save_binary(mat, path, fmt, columns=None):
+
+    if isinstance(mat, sheet.SourceableSheet):
+        df = mat.data
+    elif isinstance(mat, pandas.DataFrame):
+        df = mat
+    else:
+        df = _array_to_dataframe(np.asarray(mat))
+    if columns:
+        df = df.set_axis(list(columns), axis=1)
+
+    if fmt == 'npy':
+        np.save(path, df.to_numpy())
+    elif fmt == 'npz':
+        np.savez(path, **{str(c): df[c].to_numpy() for c in df.columns})
+    elif fmt == 'parquet':      # these formats require string titles
+        df.set_axis([str(c) for c in df.columns], axis=1).to_parquet(path, index=False)
+    elif fmt == 'feather':
+        df.set_axis([str(c) for c in df.columns], axis=1).reset_index(drop=True).to_feather(path)
+    elif fmt == 'hdf':
+        df.to_hdf(path, key='data', mode='w')
+    else:
+        raise ValueError(fmt)
+
+
 def save_stdout(mat, *args, **kwargs):
     save_file(mat, sys.stdout, *args, **kwargs)
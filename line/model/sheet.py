@@ -30,13 +30,32 @@ class SourceableSheet(np.lib.mixins.NDArrayOperatorsMixin):
     BEGIN_MATLAB = 1
     BEGIN = BEGIN_MATLAB
 
-    def __init__(self, data, source=None):
+    def __init__(self, data, source=None, positions=None, rows=None, weights=None):
+        """ `positions': Original positions (start from 0) of columns, if only part of
+        columns in the source are loaded. Column indices are translated by it.
+        `rows': Original row numbers (start from 0), if only part of rows are kept
+        (e.g. by streaming reduction). Used by `index()'.
+        `weights': `pandas.DataFrame' of weights of each element, if rows are binned
+        samples instead of raw samples.
+        """
 
+        self.positions = positions
+        self.rows = rows
+        self.weights = weights.to_frame() if isinstance(weights, pd.Series) else weights
+        if isinstance(data, pd.Series):
+            data = data.to_frame()
+        # buffers are shared (copy-on-write); only titles/index are separated by a shallow copy
         if isinstance(data, pd.DataFrame):
-            self.data = data.copy()
+            self.data = data.copy(deep=False)
         elif isinstance(data, SourceableSheet):
-            self.data = data.data.copy()
+            self.data = data.data.copy(deep=False)
             self.source = data.source
+            if positions is None:
+                self.positions = data.positions
+            if rows is None:
+                self.rows = data.rows
+            if weights is None:
+                self.weights = data.weights
         else:
             try:
                 self.data = pd.DataFrame(data)
@@ -49,6 +68,7 @@ class SourceableSheet(np.lib.mixins.NDArrayOperatorsMixin):
             assert source is None or isinstance(source, str)
             self.source = Source(source)
 
+        self._shared = True     # data may be referred by other objects
         self.iloc = self.data.iloc
         self.loc = self.data.loc
         self.shape = self.data.shape
@@ -64,18 +84,53 @@ class SourceableSheet(np.lib.mixins.NDArrayOperatorsMixin):
         else:
             raise ValueError(idx)
     
+    def __setitem__(self, idx, value):
+        """ Set column by index/title, or elements by slice (same convention as `__getitem__').
+        Shared data is copied before the first modification.
+        """
+        if isinstance(value, SourceableSheet):
+            value = value.data.iloc[:, 0].to_numpy() if value.cols() == 1 else value.to_numpy()
+        self._materialize()
+
+        if isinstance(idx, str):
+            self.data[idx] = value
+        elif isinstance(idx, int):
+            self.data.iloc[:, self._to_iloc(idx - self.BEGIN)] = value
+        elif isinstance(idx, tuple) and not isinstance(idx[1], str):
+            self.data.iloc[(idx[0], self._to_iloc(idx[1])) + idx[2:]] = value
+        elif isinstance(idx, tuple):
+            self.data.loc[idx] = value
+        elif isinstance(idx, slice):
+            self.data.iloc[idx] = value
+        else:
+            raise ValueError(idx)
+        self.shape = self.data.shape
+
+    def _materialize(self):
+        """ Make data owned by this sheet.
+        """
+        if self._shared:
+            self.data = self.data.copy()
+            self.iloc = self.data.iloc
+            self.loc = self.data.loc
+            self._shared = False
+
     def cols(self):
         return self.shape[1]
 
     def index(self):
-        """ Get a sequence of indicies [begin, begin+N)
+        """ Get a sequence of indicies [begin, begin+N), or the original row numbers
+        if rows are reduced.
         """
+        if self.rows is not None:
+            return self.rows + self.BEGIN
         return np.arange(self.BEGIN, self.data.shape[0] + self.BEGIN)
 
     def column_sloc(self, title):
         """ Get column by title
         """
-        return SourceableSheet(self.data.loc[:, title], self.source)
+        return SourceableSheet(self.data.loc[:, title], self.source, rows=self.rows,
+            weights=self.weights.loc[:, title] if self.weights is not None else None)
         
     def column_iloc(self, idx):
         """ Get column by indices
@@ -85,22 +140,42 @@ class SourceableSheet(np.lib.mixins.NDArrayOperatorsMixin):
                 return self.index()
             else:
                 raise IndexError(idx)
-        return SourceableSheet(self.data.iloc[:, idx - self.BEGIN], self.source)
+        idx = self._to_iloc(idx - self.BEGIN)
+        return SourceableSheet(self.data.iloc[:, idx], self.source, rows=self.rows,
+            weights=self.weights.iloc[:, idx] if self.weights is not None else None)
 
     def slice_loc(self, slice_):
         """ Locate element/column by slice. Always follow python's convention (start from 0)
         """
         if (isinstance(slice_, tuple) and isinstance(slice_[1], str)) or isinstance(slice_, str):
             r = self.data.loc[slice_]
+            w = self.weights.loc[slice_] if self.weights is not None else None
+        elif isinstance(slice_, tuple):
+            slice_ = (slice_[0], self._to_iloc(slice_[1])) + slice_[2:]
+            r = self.data.iloc[slice_]
+            w = self.weights.iloc[slice_] if self.weights is not None else None
         else:
             r = self.data.iloc[slice_]
+            w = self.weights.iloc[slice_] if self.weights is not None else None
         if isinstance(r, pd.Series):
-            return SourceableSheet(r, self.source)
+            # rows are kept only if not sliced
+            full_rows = isinstance(slice_, tuple) and isinstance(slice_[0], slice) and slice_[0] == slice(None)
+            return SourceableSheet(r, self.source, rows=self.rows if full_rows else None, weights=w)
         else:
             return r
 
+    def _to_iloc(self, idx):
+        """ Translate original column position to position in `data'.
+        """
+        if self.positions is None or not isinstance(idx, (int, np.integer)) or idx < 0:
+            return idx
+        try:
+            return self.positions.index(idx)
+        except ValueError:
+            raise IndexError(idx)
+
     def copy(self):
-        return SourceableSheet(self.data, self.source)
+        return SourceableSheet(self.data, self.source, self.positions, self.rows, self.weights)
 
     def columns(self):
         return list(self.data.columns)
@@ -125,7 +200,11 @@ class SourceableSheet(np.lib.mixins.NDArrayOperatorsMixin):
         r = getattr(ufunc, method)(*(i if i is not self else self.data for i in inputs), **kwargs)
         self.shape = self.data.shape
         if isinstance(r, (pd.DataFrame, pd.Series)):
-            return SourceableSheet(r, '<expr>')
+            # elementwise results of a single sheet are still aligned with its rows and weights
+            sheets = [i for i in inputs if isinstance(i, SourceableSheet)]
+            if len(sheets) == 1 and r.shape == self.data.shape:
+                return SourceableSheet(r, '<expr>', rows=self.rows, weights=self.weights)
+            return SourceableSheet(r, '<expr>', rows=self.rows if r.shape[0] == self.data.shape[0] else None)
         else:
             return r
 
@@ -148,7 +227,7 @@ class SheetCollection:
         new_data = []
         sources = [str(d.source) for d in self.data]
         for d, fn in zip(self.data, sources):
-            new_data_ = d.data
+            new_data_ = d.data.copy(deep=False)     # do not rename the shared data
             new_data_.columns = [
                 self.name_convention.replace(r'%T',str(c)).replace(r'%F',fn) for c in d.columns()
             ]
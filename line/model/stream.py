@@ -0,0 +1,122 @@
+""" Reducers for streaming (chunked) loading of large files.
+A reducer consumes chunks of `pandas.DataFrame` one by one and keeps only
+a small summary, so the whole file never has to fit in memory.
+"""
+
+import numpy as np
+import pandas
+
+
+CHUNK_ROWS = 1000000    # rows read in each chunk
+BUCKETS = 2048          # number of buckets kept by `MinMaxReducer`; larger than the pixel width of most figures
+HIST_BINS = 4096        # number of fine bins kept by `HistogramReducer`
+
+
+class MinMaxReducer:
+    """ Keep the first, last, minimum and maximum rows of each bucket of consecutive rows
+    (for every column). The rows of the result are aligned, so columns can still be
+    combined; the original row numbers are kept in `rows`.
+    The bucket size is doubled when the number of buckets exceeds 2*`buckets`.
+    """
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.bucket_rows = 1
+        self.nrows = 0
+        self.selected = None
+
+    def add(self, chunk):
+        chunk.index = pandas.RangeIndex(self.nrows, self.nrows + len(chunk))
+        self.nrows += len(chunk)
+        while self.nrows > 2 * self.buckets * self.bucket_rows:
+            self.bucket_rows *= 2
+
+        # extreme rows of a merged bucket are always among the selected rows of its parts
+        data = chunk if self.selected is None else pandas.concat((self.selected, chunk))
+        self.selected = self._reduce(data)
+
+    def _reduce(self, data):
+        if self.bucket_rows == 1:
+            return data
+
+        g = data.groupby(data.index // self.bucket_rows)
+        rows = [g.head(1).index, g.tail(1).index]
+        for c in data.columns:
+            if not np.issubdtype(data[c].dtype, np.number):
+                continue
+            m_g = data[c].dropna().groupby(data[c].dropna().index // self.bucket_rows)
+            rows.append(m_g.idxmin().to_numpy())
+            rows.append(m_g.idxmax().to_numpy())
+        return data.loc[np.unique(np.concatenate(rows))]
+
+    def result(self, columns):
+        """ Return dict of data, rows and weights.
+        """
+        if self.selected is None:
+            return {'data': pandas.DataFrame(columns=columns), 'rows': None, 'weights': None}
+        return {
+            'data': self.selected.reset_index(drop=True),
+            'rows': self.selected.index.to_numpy(),
+            'weights': None,
+        }
+
+
+class HistogramReducer:
+    """ Keep a running histogram with `bins` fine bins for each column. The range of bins
+    is doubled when new data fall outside of it.
+    The result holds the bin centers as data and counts as weights.
+    """
+
+    def __init__(self, bins=HIST_BINS):
+        self.bins = bins
+        self.hists = {}     # column -> [lower bound, bin width, counts]
+
+    def add(self, chunk):
+        for c in chunk.columns:
+            if not np.issubdtype(chunk[c].dtype, np.number):
+                continue
+            x = chunk[c].to_numpy(dtype=float)
+            x = x[np.isfinite(x)]
+            if len(x) == 0:
+                continue
+            xmin, xmax = np.min(x), np.max(x)
+            if c not in self.hists:
+                width = (xmax - xmin) / self.bins if xmax > xmin else 1.0 / self.bins
+                self.hists[c] = [xmin if xmax > xmin else xmin - 0.5, width, np.zeros(self.bins)]
+            h = self.hists[c]
+            self._extend(h, xmin, xmax)
+            counts, _ = np.histogram(x, self.bins, (h[0], h[0] + h[1] * self.bins))
+            h[2] += counts
+
+    def _extend(self, h, xmin, xmax):
+        while xmin < h[0] or xmax > h[0] + h[1] * self.bins:
+            if xmin < h[0]:
+                h[2] = np.concatenate((np.zeros(self.bins), h[2]))
+                h[0] -= h[1] * self.bins
+            else:
+                h[2] = np.concatenate((h[2], np.zeros(self.bins)))
+            h[2] = h[2].reshape(self.bins, 2).sum(axis=1)
+            h[1] *= 2
+
+    def result(self, columns):
+        data = {}
+        weights = {}
+        for c in columns:
+            if c in self.hists:
+                lo, width, counts = self.hists[c]
+                data[c] = lo + width * (np.arange(self.bins) + 0.5)
+                weights[c] = counts
+            else:
+                data[c] = np.full(self.bins, np.nan)
+                weights[c] = np.zeros(self.bins)
+        return {
+            'data': pandas.DataFrame(data, columns=columns),
+            'rows': None,
+            'weights': pandas.DataFrame(weights, columns=columns),
+        }
+
+
+REDUCERS = {
+    'minmax': MinMaxReducer,
+    'hist': HistogramReducer,
+}
@@ -118,6 +118,21 @@ def get_index(mat):
     else:
         return np.arange(sheet.SourceableSheet.BEGIN, sheet.SourceableSheet.BEGIN + mat.shape[0])
 
+def is_reduced(mat):
+    """ Return if rows of mat are reduced from raw samples (see `stream.MinMaxReducer').
+    """
+    if isinstance(mat, sheet.SheetCollection):
+        return any(is_reduced(m) for m in mat.data)
+    return isinstance(mat, sheet.SourceableSheet) and mat.rows is not None
+
+def get_weights(mat):
+    """ Return flattened weights of elements, or `None` if mat is not weighted.
+    """
+    if isinstance(mat, sheet.SourceableSheet) and mat.weights is not None:
+        return mat.weights.to_numpy().flatten()
+    else:
+        return None
+
 def stack(*mats):
 
     c = []
@@ -1,11 +1,13 @@
 
 import re
+import os
 import numpy as np
 
 from . import state
 from . import model
 from . import io_util
 from . import errors
+from . import style
 
 from .style_proc import *
 from . import expr_proc
@@ -47,14 +49,20 @@ class PlotParser:
     M_PLOT = 0
     M_HIST = 1
 
-    def __init__(self, mode=M_PLOT):
+    def __init__(self, mode=M_PLOT, line_output=True):
+        """ `line_output': Whether the data are drawn as lines, so large files can be
+        reduced to extremes (see `load_hints()').
+        """
         self.mode = mode
+        self.line_output = line_output
 
     def parse(self, m_state:state.GlobalState, m_tokens):
         
         self.m_state = m_state
         self.m_tokens = m_tokens
         self.plot_groups = []
+        self.parsed_groups = []
+        self.hint_caches = {}
         self.cur_hint = None
         self.cur_xexpr = None
 
@@ -71,6 +79,14 @@ class PlotParser:
                 # skip_tokens(m_tokens, ',')
             if self.next() == ',':
                 get_token(self.m_tokens)
+
+        # all groups are parsed before evaluation, so files are loaded only with columns required
+        self.load_hints()
+        for pg in self.parsed_groups:
+            if self.mode == PlotParser.M_PLOT:
+                self.evaluate_single_group(pg)
+            elif self.mode == PlotParser.M_HIST:
+                self.evaluate_single_hist_group(pg)
         
         logger.debug('Plot groups:' + str(self.plot_groups))
 
@@ -115,7 +131,10 @@ class PlotParser:
 
         self.cur_hint = pg.hint2
         self.cur_xexpr = pg.expr1
-        
+        self.parsed_groups.append(pg)
+
+    def evaluate_single_group(self, pg:PlottingPackage):
+
         if pg.expr1 is not None:
             pg.xdata = self.evaluate(pg.hint1, pg.expr1)
         pg.ydata = self.evaluate(pg.hint2, pg.expr2)
@@ -143,6 +162,10 @@ class PlotParser:
         self.token_stack = []
         self._parse_y(pg)
         self.cur_hint = pg.hint2
+        self.parsed_groups.append(pg)
+
+    def evaluate_single_hist_group(self, pg:PlottingPackage):
+
         pg.ydata = self.evaluate(pg.hint2, pg.expr2)
         logger.debug('New histogram group: ' + str(pg))
 
@@ -300,6 +323,8 @@ class PlotParser:
             if hintvar.startswith('$('):
                 evaler2.load(hintvar)
                 hintvalue = evaler2.evaluate()
+            elif hintvar in self.hint_caches:
+                hintvalue = self.hint_caches[hintvar]
             else:
                 if '*' in hintvar or '?' in hintvar:
                     evaler2.load('load(*expand("%s"))' % strip_quote(hintvar))
@@ -310,4 +335,127 @@ class PlotParser:
         else:
             hintvalue = None
         return evaler.evaluate_with_hintvar(hintvalue)
-        
\ No newline at end of file
+
+    def load_hints(self):
+        """ Load files used as hint, with only the columns referred by expressions of
+        parsed groups. Files are loaded entirely if the columns cannot be determined.
+        """
+        exprs = {}
+        drawn_as_points = set()     # hints of groups without lines, whose points cannot be reduced
+        for pg in self.parsed_groups:
+            for hintvar, expr in ((pg.hint1, pg.expr1), (pg.hint2, pg.expr2)):
+                if hintvar is None or expr is None or hintvar.startswith('$('):
+                    continue
+                exprs.setdefault(hintvar, []).append(expr)
+                if pg.style and pg.style.get('linetype') == style.LineType.NONE:
+                    drawn_as_points.add(hintvar)
+
+        for hintvar, hint_exprs in exprs.items():
+            filename = strip_quote(hintvar)
+            is_wildcard = '*' in hintvar or '?' in hintvar
+            if not is_wildcard and (expr_proc.ExprEvaler.convert_varname(hintvar) in self.m_state._vmhost.variables or
+                not io_util.file_exist(filename)):
+                continue
+
+            usecols = set()
+            for expr in hint_exprs:
+                columns = self._get_columns(expr)
+                if columns is None:
+                    usecols = None
+                    break
+                usecols.update(columns)
+
+            m_filenames = io_util.expand(filename) if is_wildcard else [filename]
+            kwargs = {}
+            if usecols:
+                kwargs['usecols'] = list(usecols)
+            if self._is_large(m_filenames):
+                # reduced data only keeps extremes (or histogram) of raw columns; extremes are only
+                # enough to draw lines
+                if not all(self._is_column(expr) for expr in hint_exprs):
+                    logger.debug('Cannot reduce %s: expressions are not plain columns' % filename)
+                elif self.mode == PlotParser.M_HIST:
+                    kwargs['reduce'] = 'hist'
+                elif self.line_output and hintvar not in drawn_as_points:
+                    kwargs['reduce'] = 'minmax'
+                else:
+                    logger.debug('Cannot reduce %s: data are not drawn as lines' % filename)
+
+            if not kwargs and not is_wildcard:  # wildcards are still loaded to prevent loading them multiple times
+                continue
+            logger.debug('Loading %s with %s' % (filename, kwargs))
+            self.hint_caches[hintvar] = model.load_file(*m_filenames, **kwargs)
+
+    def _is_large(self, filenames):
+        """ Return if files should be loaded by streaming, decided by option `stream-threshold`.
+        """
+        threshold = self.m_state.options['stream-threshold']
+        if threshold <= 0:
+            return False
+        return sum(os.path.getsize(fn) for fn in filenames) > threshold * 1024 * 1024
+
+    def _get_columns(self, expr):
+        """ Return set of columns (index starting from 0, or title) of hint that `expr`
+        refers to; Return `None` if the columns cannot be determined.
+        """
+        if expr.isdigit():
+            expr = '$' + expr
+        if is_quoted(expr):
+            if io_util.file_or_wildcard_exist(strip_quote(expr)):
+                return set()
+            return self._to_columns([strip_quote(expr)])
+
+        try:
+            m_expr = expr_proc.compile_expr(expr, omit_dollar=True).source
+        except errors.LineParseError:
+            return None
+
+        if re.search(r'\b(cols|hint)\(', m_expr):
+            return None
+
+        names = []
+        for m in re.finditer(r'\bcol\(', m_expr):
+            m_arg = re.match(r'\bcol\(\s*(\d+|\'[^\']*\'|"[^"]*")\s*\)', m_expr[m.start():])
+            if not m_arg:
+                return None
+            names.append(strip_quote(m_arg.group(1)))
+
+        for v in expr_proc._INNVAR_EXPR.findall(m_expr):
+            name = v[5:]
+            if v in self.m_state._vmhost.variables or v in self.m_state.file_caches:
+                continue
+            if '*' in name or '?' in name:
+                return None
+            if not io_util.file_exist(name):
+                names.append(name)
+        return self._to_columns(names)
+
+    def _is_column(self, expr):
+        """ Return if `expr` refers to a single column of hint as is (`$N`, `col(...)`, or title).
+        """
+        if expr.isdigit():
+            return True
+        if is_quoted(expr):
+            return not io_util.file_or_wildcard_exist(strip_quote(expr))
+
+        try:
+            m_expr = expr_proc.compile_expr(expr, omit_dollar=True).source.strip()
+        except errors.LineParseError:
+            return False
+
+        if re.fullmatch(r'col\(\s*(\d+|\'[^\']*\'|"[^"]*")\s*\)', m_expr):
+            return True
+        return re.fullmatch(expr_proc._INNVAR_EXPR.pattern, m_expr) is not None and \
+            m_expr not in self.m_state._vmhost.variables and m_expr not in self.m_state.file_caches and \
+            not io_util.file_exist(m_expr[5:])
+
+    def _to_columns(self, names):
+        columns = set()
+        for name in names:
+            if name.isdigit():
+                idx = int(name) - model.SourceableSheet.BEGIN
+                if idx >= 0:    # -1 is the data index
+                    columns.add(idx)
+            else:
+                columns.add(name)
+        return columns
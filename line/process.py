@@ -1,6 +1,6 @@
 
 import logging
-from collections import deque
+from collections import deque, namedtuple
 from warnings import warn
 import os
 import re
@@ -47,10 +47,96 @@ def initialize():
         from . import dataview as dataview_1
         dataview = dataview_1
 
+    update_data_options(defaults.default_options)
+
+
+def update_data_options(options):
+    """ Pass options related to data loading and evaluation to `model' and `expr_proc'.
+    """
+    expr_proc.model.io.set_data_cache(
+        os.path.join(os.path.expanduser('~/.line/'), 'cache') if options['data-cache'] else None,
+        int(options['data-cache-size'] * 2**20) if options['data-cache-size'] > 0 else None)
+    expr_proc.model.io.set_load_workers(options['load-workers'])
+    expr_proc.set_vector_backend(options['expr-backend'])
+
+
 if defaults.default_options['delayed-init'] == False:
     initialize()
 
 
+class Command:
+    """ Handler of a command in the registry.
+
+    Args:
+        execute: `execute(m_state, *args)'. Returns `None` to continue updating the figure,
+            otherwise the value is returned by `parse_and_process_command' directly.
+        parse: `parse(m_tokens)' returns the tuple of arguments. It must only depend on tokens
+            (no expressions/state), so the result can be cached and executed many times.
+            If `None`, `execute' receives the tokens (`execute(m_state, m_tokens)').
+        focus_up: Bring the figure to front after execution (interactive mode only).
+        reads_style: The command may read computed styles, so styles deferred by the
+            option `render-on-demand' are computed before execution.
+    """
+
+    def __init__(self, execute, parse=None, focus_up=False, reads_style=True):
+        self.execute = execute
+        self.parse = parse
+        self.focus_up = focus_up
+        self.reads_style = reads_style
+
+ParsedCommand = namedtuple('ParsedCommand', ['command', 'args'])
+
+commands = {}   # name -> `Command'
+
+
+def register_command(name, execute, parse=None, focus_up=False, reads_style=True):
+    """ Register a command (may be a plugin), or replace an existing one.
+    See `Command' for arguments.
+    """
+    commands[name] = Command(execute, parse, focus_up, reads_style)
+    keywords.command_keywords.add(name)
+    keywords.all_command_keywords.add(name)
+
+
+def lookup_command(m_tokens):
+    """ Consume the command name in tokens. Returns (name, `Command` or `None`).
+    """
+    command = get_token(m_tokens)
+    command = keywords.command_alias.get(command, command)   # expand short commands
+
+    if command in keywords.extended_set_keywords:
+        m_tokens.appendleft(command)
+        command = 'set'
+    return command, commands.get(command, None)
+
+
+def parse_command(m_tokens):
+    """ Pre-parse a command without executing it. Parsed tokens are consumed.
+    Returns `ParsedCommand`, or `None` if it cannot be pre-parsed (expressions,
+    commands that parse by themselves, or parsing errors, which are left to the execution).
+    """
+    if len(m_tokens) == 0 or lookup_raw(m_tokens, ret_string=True).startswith('$'):
+        return None
+    try:
+        _, command = lookup_command(m_tokens)
+        if command is None or command.parse is None:
+            return None
+        return ParsedCommand(command, command.parse(m_tokens))
+    except Exception:
+        return None
+
+
+def process_parsed_command(m_state:state.GlobalState, parsed:ParsedCommand):
+    """ Execute a command returned by `parse_command'.
+    """
+    m_state.file_caches.clear()
+    prepare_command(m_state, parsed.command)
+    ret = parsed.command.execute(m_state, *parsed.args)
+    if ret is not None:
+        return ret
+    return update_after_command(m_state, parsed.command.focus_up)
+
+
 def parse_and_process_command(tokens, m_state:state.GlobalState):
     """ Parse and execute sequence of tokens.
     Args:
@@ -82,295 +168,348 @@ def parse_and_process_command(tokens, m_state:state.GlobalState):
                 print(ret)
         return 0
 
-    command = get_token(m_tokens)
-    command = keywords.command_alias.get(command, command)   # expand short commands
+    command_name, command = lookup_command(m_tokens)
 
-    if command in keywords.extended_set_keywords:
-        m_tokens.appendleft(command)
-        command = 'set'
+    if command is None:
+        if m_state.options['direct-function-call'] and m_state._vmhost and command_name in m_state._vmhost.records:
+            m_tokens.appendleft(command_name)
+            return m_state._vmhost.exec_invoke(m_state, m_tokens)
+        else:
+            raise LineParseError('No command named "%s"' % command_name)
 
-    do_prompt = m_state.is_interactive or m_state.options['prompt-always']   # prompt
-    do_focus_up = False # update focus
+    prepare_command(m_state, command)
+    if command.parse is None:
+        ret = command.execute(m_state, m_tokens)
+    else:
+        ret = command.execute(m_state, *command.parse(m_tokens))
+    if ret is not None:
+        return ret
 
-    # Long commands
+    return update_after_command(m_state, command.focus_up)
 
-    if command == 'plot':
-        parse_and_process_plot(m_state, m_tokens, keep_existed=None)
 
-    elif command == 'plotr':
-        parse_and_process_plot(m_state, m_tokens, keep_existed=None, side=style.FloatingPos.RIGHT)
+def prepare_command(m_state:state.GlobalState, command:Command):
+    """ Compute styles deferred by `render-on-demand', if the command needs them.
+    """
+    if m_state.style_outdated and (command.reads_style or 
+        (m_state.cur_figurename is not None and m_state.cur_figure().computed_style is None)):
+        m_state.refresh_style(True)
 
-    elif command == 'append':
-        parse_and_process_plot(m_state, m_tokens, keep_existed=True)
 
-    elif command == 'hist':
-        parse_and_process_hist(m_state, m_tokens)
+def update_after_command(m_state:state.GlobalState, do_focus_up=False):
+    """ Refresh style and render the current figure after a command.
+    """
+    if m_state.cur_figurename is None:
+        return 0
+    if not m_state.is_interactive:
+        if m_state.cur_figure().is_changed:
+            if m_state.options['render-on-demand']:
+                m_state.style_outdated = True   # until a command reads style, or saving
+            else:
+                m_state.refresh_style(True)
+        return 0
 
-    elif command == 'update':
-        selection = parse_style_selector(m_tokens)
-        elements = css.StyleSheet(selection).select(m_state.cur_subfigure())
-        parser = plot_proc.PlotParser()
-        parser.parse(m_state, m_tokens)
-        if parser.plot_groups:
-            dataview.plot.do_update(m_state, elements, parser.plot_groups)
-        else:
-            warn('No data to plot')
+    # when figure.legend.source = subfigure, a change may lead to figure.legend change.
+    if m_state.cur_figure().legend.computed_style and \
+        m_state.cur_figure().legend.attr('source') == m_state.cur_subfigure().name and \
+        m_state.cur_subfigure().is_changed:
+        m_state.cur_subfigure().is_changed = True
 
-    elif command == 'fit':
-        selection = parse_style_selector(m_tokens)
-        elements = css.StyleSheet(selection).select(m_state.cur_subfigure())
-        if lookup(m_tokens) in ('linear', 'quad', 'exp', 'prop'):
-            function = get_token(m_tokens)
-        else:
-            function = 'linear'
-        style_dict = parse_style(m_tokens)
+    # update figure
+    if m_state.cur_figure().is_changed or m_state.cur_subfigure().is_changed:
+        render_cur_figure(m_state)
 
-        if not elements:
-            warn('No line is fitted')
-        else:
-            for e in elements:
-                dataview.api.fit(m_state, e, function=function, labelfmt=style_dict.pop('label', 'Fit %T'), **style_dict)
+    if do_focus_up:
+        backend.update_focus_figure(m_state)
 
-    elif command == 'remove':
-        parse_and_process_remove(m_state, m_tokens)
+    return 0
 
-    elif command == 'group':
-        group_desc = get_token(m_tokens)
-        assert_no_token(m_tokens)
-        process_group(m_state, group_desc)
 
-    elif command == 'set':
-        parse_and_process_set(m_state, m_tokens)
+# Commands. Functions with tokens as argument parse by themselves; others
+# receive arguments from the parser registered in `register_builtin_commands'.
 
-    elif command == 'show':
-        parse_and_process_show(m_state, m_tokens)
+def process_update(m_state:state.GlobalState, m_tokens:deque):
+    selection = parse_style_selector(m_tokens)
+    elements = css.StyleSheet(selection).select(m_state.cur_subfigure())
+    parser = plot_proc.PlotParser(line_output=all(
+        e.get_style('linetype', raise_error=False) != style.LineType.NONE for e in elements))
+    parser.parse(m_state, m_tokens)
+    if parser.plot_groups:
+        dataview.plot.do_update(m_state, elements, parser.plot_groups)
+    else:
+        warn('No data to plot')
 
-    elif command == 'line':
-        x1, _, y1, x2, _, y2 = zipeval([stof, make_assert_token(','), stof, stof, make_assert_token(','), stof], m_tokens)
-        
-        m_state.cur_subfigure().add_drawline((x1,y1), (x2,y2), parse_style(m_tokens))
+def parse_fit(m_tokens):
+    selection = parse_style_selector(m_tokens)
+    if lookup(m_tokens) in ('linear', 'quad', 'exp', 'prop'):
+        function = get_token(m_tokens)
+    else:
+        function = 'linear'
+    return selection, function, parse_style(m_tokens)
 
-    elif command == 'hline':
-        y = stof(get_token(m_tokens))
-        m_state.cur_subfigure().add_drawline((None,y), (None,y), parse_style(m_tokens))
+def process_fit(m_state:state.GlobalState, selection, function, style_dict):
+    elements = css.StyleSheet(selection).select(m_state.cur_subfigure())
+    style_dict = style_dict.copy()
 
-    elif command == 'vline':
-        x = stof(get_token(m_tokens))
-        m_state.cur_subfigure().add_drawline((x,None), (x,None), parse_style(m_tokens))
+    if not elements:
+        warn('No line is fitted')
+    else:
+        for e in elements:
+            dataview.api.fit(m_state, e, function=function, labelfmt=style_dict.pop('label', 'Fit %T'), **style_dict)
+
+def parse_line(m_tokens):
+    x1, _, y1, x2, _, y2 = zipeval([stof, make_assert_token(','), stof, stof, make_assert_token(','), stof], m_tokens)
+    return (x1, y1), (x2, y2), parse_style(m_tokens)
+
+def parse_hline(m_tokens):
+    y = stof(get_token(m_tokens))
+    return (None, y), (None, y), parse_style(m_tokens)
+
+def parse_vline(m_tokens):
+    x = stof(get_token(m_tokens))
+    return (x, None), (x, None), parse_style(m_tokens)
+
+def process_drawline(m_state:state.GlobalState, start, end, style_dict):
+    m_state.cur_subfigure().add_drawline(start, end, style_dict.copy())
+
+def parse_text(m_tokens):
+    text = get_token(m_tokens)
+    token1 = get_token(m_tokens)
+    if lookup(m_tokens) == ',':
+        get_token(m_tokens)
+        return text, style.str2pos(token1 + ',' + get_token(m_tokens)), parse_style(m_tokens)
+    else:
+        return text, style.str2pos(token1), {**parse_style(m_tokens), **{'coord':'axis'}}
 
-    elif command == 'fill':
-        parse_and_process_fill(m_state, m_tokens)
-        
-    elif command == 'text':
-        text = get_token(m_tokens)
-        token1 = get_token(m_tokens)
-        if lookup(m_tokens) == ',':
-            get_token(m_tokens)
-            m_state.cur_subfigure().add_text(text, style.str2pos(token1 + ',' + get_token(m_tokens)), parse_style(m_tokens))
-        else:
-            m_state.cur_subfigure().add_text(text, style.str2pos(token1), {**parse_style(m_tokens), **{'coord':'axis'}})
+def process_text(m_state:state.GlobalState, text, pos, style_dict):
+    m_state.cur_subfigure().add_text(text, pos, style_dict.copy())
 
-    elif command == 'split':
-        hsplitnum, _, vsplitnum = zipeval([stod, make_assert_token(','), stod], m_tokens)
-        assert_no_token(m_tokens)
-        process_split(m_state, hsplitnum, vsplitnum)
+def parse_split(m_tokens):
+    hsplitnum, _, vsplitnum = zipeval([stod, make_assert_token(','), stod], m_tokens)
+    assert_no_token(m_tokens)
+    return hsplitnum, vsplitnum
 
-    elif command == 'hsplit':
-        splitnum = stod(get_token(m_tokens))
-        assert_no_token(m_tokens)
-        process_split(m_state, splitnum, m_state.cur_figure().attr('split')[1])
+def parse_single_split(m_tokens):
+    splitnum = stod(get_token(m_tokens))
+    assert_no_token(m_tokens)
+    return (splitnum,)
 
-    elif command == 'vsplit':
-        splitnum = stod(get_token(m_tokens))
-        assert_no_token(m_tokens)
-        process_split(m_state, m_state.cur_figure().attr('split')[0], splitnum)
+def process_hsplit(m_state:state.GlobalState, splitnum):
+    process_split(m_state, splitnum, m_state.cur_figure().attr('split')[1])
 
-    # select or create figure
-    elif command == 'figure':
-        if len(m_tokens) == 0:
-            fig_name = None
-        else:
-            fig_name = get_token(m_tokens)
-            assert_no_token(m_tokens)
-        m_state.figure(fig_name)
+def process_vsplit(m_state:state.GlobalState, splitnum):
+    process_split(m_state, m_state.cur_figure().attr('split')[0], splitnum)
 
-        if m_state.is_interactive:
-            do_focus_up = True
+def parse_optional_name(m_tokens):
+    if len(m_tokens) == 0:
+        return (None,)
+    name = get_token(m_tokens)
+    assert_no_token(m_tokens)
+    return (name,)
 
-    # select subfigure
-    elif command == 'subfigure':
-        arg = get_token(m_tokens)
-        
-        if m_state.cur_figurename is None:
-            m_state.create_figure()
-            if m_state.is_interactive:
-                render_cur_figure(m_state)
+def parse_single_name(m_tokens):
+    name = get_token(m_tokens)
+    assert_no_token(m_tokens)
+    return (name,)
 
-        m_fig = m_state.cur_figure()
+def parse_no_argument(m_tokens):
+    return ()
 
-        if lookup(m_tokens) == ',':
-            vs = stod(arg)
-            _, hs, _, subfig_idx = zipeval([make_assert_token(','), stod, make_assert_token(','), stod], m_tokens)
-            if (hs, vs) != tuple(m_fig.attr('split')):
-                process_split(m_state, hs, vs)
-        else:
-            if arg.startswith('$'):
-                subfig_idx = process_expr(m_state, arg)
-                if isinstance(subfig_idx, str):
-                    subfig_idx = stod(arg)
-            else:
-                subfig_idx = stod(arg)
+def process_figure(m_state:state.GlobalState, fig_name):
+    """ Select or create figure.
+    """
+    m_state.figure(fig_name)
 
-        assert_no_token(m_tokens)
+def parse_and_process_subfigure(m_state:state.GlobalState, m_tokens:deque):
+    """ Select subfigure.
+    """
+    arg = get_token(m_tokens)
+    
+    if m_state.cur_figurename is None:
+        m_state.create_figure()
+        if m_state.is_interactive:
+            render_cur_figure(m_state)
 
-        subfig_idx -= 1
-        if subfig_idx < len(m_fig.subfigures):
-            m_fig.cur_subfigure = subfig_idx
-        else:
-            raise LineProcessError('subfigure %d does not exist' % (subfig_idx + 1))
+    m_fig = m_state.cur_figure()
 
-    # save figure
-    elif command == 'save':
-        if len(m_tokens) == 0:
-            warn('Using current filename: %s' % m_state.cur_save_filename)
-            filename = m_state.cur_save_filename
+    if lookup(m_tokens) == ',':
+        vs = stod(arg)
+        _, hs, _, subfig_idx = zipeval([make_assert_token(','), stod, make_assert_token(','), stod], m_tokens)
+        if (hs, vs) != tuple(m_fig.attr('split')):
+            process_split(m_state, hs, vs)
+    else:
+        if arg.startswith('$'):
+            subfig_idx = process_expr(m_state, arg)
+            if isinstance(subfig_idx, str):
+                subfig_idx = stod(arg)
         else:
-            if lookup_raw(m_tokens, ret_string=True).startswith('$'):
-                filename = str(process_expr(m_state, parse_expr(m_tokens)))
-            else:
-                filename = get_token(m_tokens)
-
-        assert_no_token(m_tokens)
+            subfig_idx = stod(arg)
 
-        process_save(m_state, filename)
+    assert_no_token(m_tokens)
 
-    elif command == 'clear':
-        m_state.cur_subfigure().clear()
+    subfig_idx -= 1
+    if subfig_idx < len(m_fig.subfigures):
+        m_fig.cur_subfigure = subfig_idx
+    else:
+        raise LineProcessError('subfigure %d does not exist' % (subfig_idx + 1))
 
-    elif command == 'replot':
-        if lookup(m_tokens, 0) == 'all':
-            m_state.cur_figure().is_changed = True
-            if m_state.options['auto-compact']:
-                m_state.cur_figure().needs_rerender = 2
+def parse_and_process_save(m_state:state.GlobalState, m_tokens:deque):
+    """ Save figure.
+    """
+    if len(m_tokens) == 0:
+        warn('Using current filename: %s' % m_state.cur_save_filename)
+        filename = m_state.cur_save_filename
+    else:
+        if lookup_raw(m_tokens, ret_string=True).startswith('$'):
+            filename = str(process_expr(m_state, parse_expr(m_tokens)))
         else:
-            m_state.cur_subfigure().is_changed = True
+            filename = get_token(m_tokens)
 
-    elif command == 'print':
-        outstr = ''
-        while len(m_tokens) > 0:
-            if m_tokens[0].startswith('$'):
-                outstr += str(process_expr(m_state, parse_expr(m_tokens)))
-            else:
-                outstr += m_tokens[0]
-                m_tokens.popleft()
-            if len(m_tokens) > 0:
-                outstr += ' '
-        print(outstr)
-
-    elif command == 'quit':
-        if m_state.options['prompt-save-when-quit']:
-            if len(m_state.figures) == 1:
-                if terminal.query_cond('Save current figure? ', do_prompt, False):
-                    process_save(m_state, m_state.cur_save_filename)
-
-            for name, figure in m_state.figures.items():
-                m_state.cur_save_filename = None
-                m_state.cur_figurename = name
-                if terminal.query_cond('Save figure %s? ' % name, do_prompt, False):
-                    process_save(m_state, '')
-                if m_state.is_interactive:
-                    backend.close_figure(m_state)
-
-        return True
-
-    elif command == 'input':
-        m_state.is_interactive = True
-        if lookup(m_tokens) == 'norender':    # no render exisiting fiture
-            return 0
-
-        _cur_figurename = m_state.cur_figurename
-        for fig in m_state.figures:
-            m_state.cur_figurename = fig
-            m_state.cur_figure().is_changed = True
-            render_cur_figure(m_state)
-        m_state.cur_figurename = _cur_figurename
+    assert_no_token(m_tokens)
 
-    elif command == 'display':
-        process_display(m_state)
+    process_save(m_state, filename)
 
-    elif command == 'cd':
-        dest = get_token(m_tokens)
-        assert_no_token(m_tokens)
-        
-        if io_util.dir_exist(dest):
-            os.chdir(dest)
+def process_clear(m_state:state.GlobalState):
+    m_state.cur_subfigure().clear()
+
+def parse_replot(m_tokens):
+    return (lookup(m_tokens, 0) == 'all',)
+
+def process_replot(m_state:state.GlobalState, replot_all):
+    if replot_all:
+        m_state.cur_figure().is_changed = True
+        if m_state.options['auto-compact']:
+            m_state.cur_figure().needs_rerender = 2
+    else:
+        m_state.cur_subfigure().is_changed = True
+
+def parse_and_process_print(m_state:state.GlobalState, m_tokens:deque):
+    outstr = ''
+    while len(m_tokens) > 0:
+        if m_tokens[0].startswith('$'):
+            outstr += str(process_expr(m_state, parse_expr(m_tokens)))
         else:
-            raise LineProcessError('Directory "%s" does not exist' % dest)
+            outstr += m_tokens[0]
+            m_tokens.popleft()
+        if len(m_tokens) > 0:
+            outstr += ' '
+    print(outstr)
 
-    elif command == 'ls':
-        files = os.listdir()
-        if len(files) < 40 or terminal.query_cond('List all %d files? ' % len(files), 
-            m_state.options['prompt-always'] or m_state.is_interactive, not m_state.is_interactive):
-            print('\t'.join(files))
+def process_quit(m_state:state.GlobalState):
+    do_prompt = m_state.is_interactive or m_state.options['prompt-always']   # prompt
+    if m_state.options['prompt-save-when-quit']:
+        if len(m_state.figures) == 1:
+            if terminal.query_cond('Save current figure? ', do_prompt, False):
+                process_save(m_state, m_state.cur_save_filename)
+
+        for name, figure in m_state.figures.items():
+            m_state.cur_save_filename = None
+            m_state.cur_figurename = name
+            if terminal.query_cond('Save figure %s? ' % name, do_prompt, False):
+                process_save(m_state, '')
+            if m_state.is_interactive:
+                backend.close_figure(m_state)
 
-    elif command == 'pwd':
-        print(os.getcwd())
+    return True
 
-    elif command == 'load':
-        filename = get_token(m_tokens)
-        process_load(m_state, filename, [process_expr(m_state, t) if t.startswith('$') else strip_quote(t) for t in (m_tokens)])
+def parse_input(m_tokens):
+    return (lookup(m_tokens) == 'norender',)
 
-    elif command == 'pause':
-        interval = stof(get_token(m_tokens))
-        if interval > 0:
-            time.sleep(interval)
-        else:
-            input('Press Enter to continue...')
-    elif m_state.options['direct-function-call'] and m_state._vmhost and command in m_state._vmhost.records:
-        m_tokens.appendleft(command)
-        return m_state._vmhost.exec_invoke(m_state, m_tokens)
+def process_input(m_state:state.GlobalState, norender):
+    m_state.is_interactive = True
+    if norender:    # no render exisiting fiture
+        return 0
+
+    _cur_figurename = m_state.cur_figurename
+    for fig in m_state.figures:
+        m_state.cur_figurename = fig
+        m_state.cur_figure().is_changed = True
+        render_cur_figure(m_state)
+    m_state.cur_figurename = _cur_figurename
+
+def process_cd(m_state:state.GlobalState, dest):
+    if io_util.dir_exist(dest):
+        os.chdir(dest)
     else:
-        raise LineParseError('No command named "%s"' % command)
+        raise LineProcessError('Directory "%s" does not exist' % dest)
 
-    if m_state.cur_figurename is None:
-        return 0
-    if not m_state.is_interactive:
-        if m_state.cur_figure().is_changed:
-            m_state.refresh_style(True)
-        return 0
+def process_ls(m_state:state.GlobalState):
+    files = os.listdir()
+    if len(files) < 40 or terminal.query_cond('List all %d files? ' % len(files), 
+        m_state.options['prompt-always'] or m_state.is_interactive, not m_state.is_interactive):
+        print('\t'.join(files))
 
-    # when figure.legend.source = subfigure, a change may lead to figure.legend change.
-    if m_state.cur_figure().legend.computed_style and \
-        m_state.cur_figure().legend.attr('source') == m_state.cur_subfigure().name and \
-        m_state.cur_subfigure().is_changed:
-        m_state.cur_subfigure().is_changed = True
+def process_pwd(m_state:state.GlobalState):
+    print(os.getcwd())
 
-    # update figure
-    if m_state.cur_figure().is_changed or m_state.cur_subfigure().is_changed:
-        render_cur_figure(m_state)
+def parse_and_process_load(m_state:state.GlobalState, m_tokens:deque):
+    filename = get_token(m_tokens)
+    process_load(m_state, filename, [process_expr(m_state, t) if t.startswith('$') else strip_quote(t) for t in (m_tokens)])
 
-    if do_focus_up:
-        backend.update_focus_figure(m_state)
+def parse_pause(m_tokens):
+    return (stof(get_token(m_tokens)),)
 
-    return 0
+def process_pause(m_state:state.GlobalState, interval):
+    if interval > 0 and m_state.is_interactive:
+        backend.pause(m_state, interval)
+    elif interval > 0:
+        time.sleep(interval)
+    else:
+        input('Press Enter to continue...')
+
+
+def register_builtin_commands():
+
+    register_command('plot', lambda m_state, m_tokens: parse_and_process_plot(m_state, m_tokens, keep_existed=None), reads_style=False)
+    register_command('plotr', lambda m_state, m_tokens: parse_and_process_plot(m_state, m_tokens, keep_existed=None, side=style.FloatingPos.RIGHT), reads_style=False)
+    register_command('append', lambda m_state, m_tokens: parse_and_process_plot(m_state, m_tokens, keep_existed=True), reads_style=False)
+    register_command('hist', parse_and_process_hist, reads_style=False)
+    register_command('update', process_update)
+    register_command('fit', process_fit, parse_fit)
+    register_command('remove', parse_and_process_remove)
+    register_command('group', process_group, parse_single_name)
+    register_command('set', parse_and_process_set)
+    register_command('show', parse_and_process_show)
+    register_command('line', process_drawline, parse_line, reads_style=False)
+    register_command('hline', process_drawline, parse_hline, reads_style=False)
+    register_command('vline', process_drawline, parse_vline, reads_style=False)
+    register_command('fill', parse_and_process_fill)
+    register_command('text', process_text, parse_text, reads_style=False)
+    register_command('split', process_split, parse_split)
+    register_command('hsplit', process_hsplit, parse_single_split)
+    register_command('vsplit', process_vsplit, parse_single_split)
+    register_command('figure', process_figure, parse_optional_name, focus_up=True)
+    register_command('subfigure', parse_and_process_subfigure)
+    register_command('save', parse_and_process_save, reads_style=False)
+    register_command('clear', process_clear, parse_no_argument, reads_style=False)
+    register_command('replot', process_replot, parse_replot, reads_style=False)
+    register_command('print', parse_and_process_print, reads_style=False)
+    register_command('quit', process_quit, parse_no_argument)
+    register_command('input', process_input, parse_input)
+    register_command('display', process_display, parse_no_argument, reads_style=False)
+    register_command('cd', process_cd, parse_single_name, reads_style=False)
+    register_command('ls', process_ls, parse_no_argument, reads_style=False)
+    register_command('pwd', process_pwd, parse_no_argument, reads_style=False)
+    register_command('load', parse_and_process_load, reads_style=False)
+    register_command('pause', process_pause, parse_pause, reads_style=False)
 
 def render_cur_figure(m_state:state.GlobalState):
 
+    if m_state.options['render-on-demand'] and not m_state.style_outdated and \
+        not m_state.cur_figure().is_changed and not m_state.cur_subfigure().is_changed:
+        return  # already rendered
+
     logger.debug('Rendering...')
     m_state.refresh_style(True)
     if m_state.cur_figure().is_changed:
         rerender_times = m_state.cur_figure().needs_rerender
         if m_state.options['auto-compact'] and rerender_times > 0:            
-            if rerender_times >= 1:
-                backend.update_figure(m_state, True)
-            m_state.cur_figure().update_style(margin=subfigure_arr.get_compact_figure_padding(m_state.cur_figure()))
-            for sf in m_state.cur_figure().subfigures:
-                sf.update_style({'padding': subfigure_arr.get_compact_subfigure_padding(sf)})
-            if len(m_state.cur_figure().subfigures) > 1:
-                m_state.refresh_style(True)
-                split.align_subfigures(m_state.cur_figure(), 'axis')
-            else:
-                m_state.refresh_style(False)
+            # frames of texts are estimated if possible, instead of rendering
+            if not m_state.cur_figure().estimate_rejected and compact_by_estimate(m_state):
+                return
+
+            backend.update_figure(m_state, True)
+            compact_figure(m_state)
 
             # Rendering > 2 only works in multiple subfigures.
             m_state.cur_figure().needs_rerender = rerender_times - 1 \
@@ -388,6 +527,61 @@ def render_cur_figure(m_state:state.GlobalState):
         m_state.cur_subfigure().is_changed = False 
 
 
+def compact_by_estimate(m_state:state.GlobalState):
+    """ Compact current figure by estimated frames and render it. The layout is kept only if
+    the rendered frames reproduce the estimate; otherwise it is restored, the figure is marked
+    by `estimate_rejected' (so it is never estimated again) and `False' is returned, so it is
+    compacted by rendering as before.
+    """
+    m_fig = m_state.cur_figure()
+    saved_styles = [(e, e.style[1].copy()) for e in [m_fig] + m_fig.subfigures]
+    rerender_times = m_fig.needs_rerender
+    while rerender_times > 0 and backend.estimate_figure(m_state):
+        compact_figure(m_state)
+        rerender_times = rerender_times - 1 \
+            if rerender_times > 2 and len(m_fig.subfigures) > 1 \
+            else 0
+        m_state.refresh_style(True)
+
+    if rerender_times == 0 and backend.estimate_figure(m_state):
+        estimated_padding = get_compact_padding(m_fig)
+        backend.update_figure(m_state, True)
+        if np.array_equal(estimated_padding, get_compact_padding(m_fig)):
+            m_fig.needs_rerender = 0
+            m_fig.is_changed = False
+            for m_subfig in m_fig.subfigures:
+                m_subfig.is_changed = False
+            return True
+
+    logger.debug('Layout cannot be estimated. Compacting by rendering...')
+    for e, s in saved_styles:
+        e.style[1].clear()
+        e.style[1].update(s)
+        e.mark_style_dirty()
+    m_fig.estimate_rejected = True
+    m_fig.is_changed = True
+    m_state.refresh_style(True)
+    return False
+
+def compact_figure(m_state:state.GlobalState):
+    """ Update margin and paddings of current figure by its rendered (or estimated) frames.
+    """
+    m_state.cur_figure().update_style(margin=subfigure_arr.get_compact_figure_padding(m_state.cur_figure()))
+    for sf in m_state.cur_figure().subfigures:
+        sf.update_style({'padding': subfigure_arr.get_compact_subfigure_padding(sf)})
+    if len(m_state.cur_figure().subfigures) > 1:
+        m_state.refresh_style(True)
+        split.align_subfigures(m_state.cur_figure(), 'axis')
+    else:
+        m_state.refresh_style(False)
+
+def get_compact_padding(m_fig:state.Figure):
+    """ Margin and paddings that a compact figure should have, in a list.
+    """
+    return subfigure_arr.get_compact_figure_padding(m_fig) + \
+        [p for sf in m_fig.subfigures for p in subfigure_arr.get_compact_subfigure_padding(sf)]
+
+
 def parse_and_process_plot(m_state:state.GlobalState, m_tokens:deque, keep_existed, side=style.FloatingPos.LEFT):
     """ Parsing and processing `plot` and `append` commands.
 
@@ -514,6 +708,7 @@ def parse_and_process_set(m_state:state.GlobalState, m_tokens:deque):
                 raise LineParseError('Invalid option: "%s"' % opt)
             except ValueError:
                 raise LineParseError('Invalid value for %s: "%s"' % (opt, arg))
+        update_data_options(m_state.options)
 
     elif test_token_inc(m_tokens, 'default'):
         selection = parse_style_selector(m_tokens)
@@ -722,4 +917,7 @@ def process_load(m_state:state.GlobalState, filename, args):
     m_state._vmhost.pop_args()
     os.chdir(cwd)
     m_state.is_interactive = is_interactive
-    backend.initialize(m_state)
\ No newline at end of file
+    backend.initialize(m_state)
+
+
+register_builtin_commands()
@@ -2,9 +2,13 @@
 import numpy as np
 
     
-def histogram(mat, bins=10, norm='pdf'):
+def histogram(mat, bins=10, norm='pdf', weights=None):
 
-    h, e = np.histogram(np.array(mat).flatten(), bins, density=False)
+    x = np.asarray(mat).reshape(-1)
+    if weights is not None:     # binned samples: drop empty bins
+        m = weights > 0
+        x, weights = x[m], weights[m]
+    h, e = np.histogram(x, bins, weights=weights, density=False)
     if norm in ('Density', 'density', 'PDF', 'pdf', 'Distribution', 'distribution'):
         h = h / np.sum(h) / (e[1]-e[0])
     elif norm in ('Probability', 'probability', 'Prob', 'prob'):
@@ -12,3 +16,24 @@ def histogram(mat, bins=10, norm='pdf'):
 
     e = e[1:] - (e[1]-e[0])/2
     return np.hstack((e[:, None], h[:, None]))
+
+
+def minmax_decimate(x, y, lo, hi, columns):
+    """ Reduce a line with ascending x to at most 4 points (first, last, minimum, maximum)
+    per column, when [lo, hi] is divided into `columns` columns (M4 algorithm). The drawn
+    line is unchanged at that resolution. Points outside [lo, hi] share one column at each side.
+    Returns indices of points kept.
+    """
+    col = np.floor((x - lo) * (columns / (hi - lo)))
+    col = np.clip(col, -1, columns, out=col)
+    starts = np.flatnonzero(np.diff(col)) + 1
+    ends = np.append(starts, len(x))
+    starts = np.insert(starts, 0, 0)
+
+    col_id = np.repeat(np.arange(len(starts)), ends - starts)
+    keep = [starts, ends - 1]
+    for reduce_ in (np.minimum, np.maximum):
+        extreme = reduce_.reduceat(y, starts)
+        idx = np.flatnonzero(y == extreme[col_id])
+        keep.append(idx[np.diff(col_id[idx], prepend=-1) != 0])     # first one in each column
+    return np.unique(np.concatenate(keep))
@@ -24,6 +24,7 @@ class GlobalState:
         self.is_interactive = None
 
         self.file_caches = {}
+        self.style_outdated = False         # style computing is deferred (option `render-on-demand')
         
         self.options = {}   # Additional program options
         self._vmhost = None
@@ -99,15 +100,31 @@ class GlobalState:
         """ Recompute style of children
         """
         if len(self.figures) > 0:
-            self.cur_figure().set_dynamical = not refresh_all_subfigure
-
-            # clear sys-set styles first, then apply
-            ss = css.StyleSheet(css.AllSelector(), css.ResetStyle())
-            ss.apply_to(self.cur_figure(), priority=0)
-            self.custom_stylesheet.apply_to(self.cur_figure(), priority=0)
-            self.class_stylesheet.apply_to(self.cur_figure(), priority=0)
-            css.compute_style(self.cur_figure(), self.default_stylesheet)
-            self.cur_figure().set_dynamical = True
+            m_fig = self.cur_figure()
+            m_fig.set_dynamical = not refresh_all_subfigure
+
+            # clear sys-set styles first, then apply. If neither stylesheets nor the tree are changed
+            # since last time, only changed elements (and their ancestors) need it.
+            style_key = (m_fig.tree_version, self.custom_stylesheet.version, self.class_stylesheet.version)
+            if m_fig.applied_style_key != style_key:
+                ss = css.StyleSheet(css.AllSelector(), css.ResetStyle())
+                ss.apply_to(m_fig, priority=0)
+                self.custom_stylesheet.apply_to(m_fig, priority=0)
+                self.class_stylesheet.apply_to(m_fig, priority=0)
+                if refresh_all_subfigure:
+                    m_fig.applied_style_key = style_key
+            else:
+                elements = css.find_dirty(m_fig)
+                for e in elements:
+                    e.clear_style(priority=0)
+                self.custom_stylesheet.apply_to_elements(elements, m_fig, priority=0)
+                self.class_stylesheet.apply_to_elements(elements, m_fig, priority=0)
+            css.compute_style(m_fig, self.default_stylesheet)
+            if not refresh_all_subfigure:   # other subfigures are not visited
+                m_fig.subtree_dirty = m_fig.subtree_dirty or any(s.subtree_dirty for s in m_fig.subfigures)
+            m_fig.set_dynamical = True
+        if refresh_all_subfigure:
+            self.style_outdated = False
 
     def figure(self, fig_name=None):
         """ Set current figure. Create one if necessary.
@@ -1,9 +1,11 @@
 
 import enum
 import re
+import sys
 
 from . import errors
 from .literal import is_inheritable_style, is_copyable_style, translate_style_val
+from ..keywords import inheritable_styles
 
 _selector_matcher = re.compile(r'(?P<a>[\.\#\s]?[^\.#{\s\[]+)\s*((?P<b>[\#]?[^\.#{\s\[]+)|(?P<c>\[\w+\=[\w\,]+\]))?')
 
@@ -14,6 +16,8 @@ class SpecialStyleValue(enum.Enum):
 
 
 class Style(dict):
+
+    __slots__ = ()
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -37,23 +41,42 @@ class ResetStyle:
 
 
 class Stylable:
-    """ Not actually used. Describe the interfaces of element used by CSS.
+    """ Base of elements used by CSS. Describe the interfaces, and keep the states
+    of last computing (see `compute_inheritance').
     """
+
     def __init__(self):
         self.typename = ""              # str
         self.classnames = []            # list of str
         self.computed_style = None      # dict
+        self.parent = None              # Stylable; set when the tree is traversed
+        self.style_dirty = True         # bool; set when the style is changed
+        self.subtree_dirty = True       # bool; set when the style of itself or any descendant is changed
+        self.last_exported_style = None     # written by `compute_inheritance'
+        self.last_inherited_style = None
+        self.child_inherited_style = None
+        self.default_style_version = None
 
     def has_name(self, name:str)->bool:
         """ Whether having the `name`
         """
         return False            # return bool
 
+    def get_names(self)->list:
+        """ Return all names (including aliases)
+        """
+        return []               # return list of str
+
     def get_children(self)->list:
         """ Return all children elements
         """
         return []               # return list of Stylable
 
+    def get_index(self):
+        """ Return `ElementIndex` of itself and all descendants.
+        """
+        return ElementIndex(self)
+
     def get_style(self, key:str, raise_error:bool):
         """ Return corresponding style value. 
         If `raise_error` is set, raises `KeyError` if key not found.
@@ -70,6 +93,66 @@ class Stylable:
         """
         pass
 
+    def mark_style_dirty(self):
+        """ Mark the style as changed, so it is recomputed by next `compute_inheritance'.
+        """
+        self.style_dirty = True
+        self.mark_subtree_dirty()
+
+    def mark_subtree_dirty(self):
+        """ Mark the element and its ancestors as having changed descendants.
+        """
+        stylable = self
+        while stylable is not None:
+            stylable.subtree_dirty = True
+            stylable = stylable.parent
+
+
+class ElementIndex:
+    """ Lookup tables of an element and all its descendants, so selectors
+    do not need to traverse the tree. Elements are kept in the order of traversal.
+    """
+
+    def __init__(self, stylable):
+        self.elements = []
+        self.by_type = {}       # typename -> list of elements
+        self.by_name = {}       # name -> list of elements
+        self.by_class = {}      # classname -> list of elements
+        self._add(stylable)
+
+    def _add(self, stylable):
+        self.elements.append(stylable)
+        self.by_type.setdefault(stylable.typename, []).append(stylable)
+        for name in stylable.get_names():
+            self.by_name.setdefault(name, []).append(stylable)
+        for classname in stylable.classnames:
+            self.by_class.setdefault(classname, []).append(stylable)
+        for child in stylable.get_children():
+            child.parent = stylable
+            self._add(child)
+
+
+class _SingleIndex(ElementIndex):
+    """ Lookup tables of a single element (without descendants).
+    """
+
+    def __init__(self, stylable):
+        self.elements = [stylable]
+        self.by_type = {stylable.typename: self.elements}
+        self.by_name = dict((name, self.elements) for name in stylable.get_names())
+        self.by_class = dict((classname, self.elements) for classname in stylable.classnames)
+
+
+def _get_ancestors(stylable, root):
+    """ Return ancestors of `stylable' below and including `root', outermost first.
+    """
+    ret = []
+    while stylable is not root and stylable.parent is not None:
+        stylable = stylable.parent
+        ret.append(stylable)
+    ret.reverse()
+    return ret
+
 
 class Selector:
     """ Base class of selector
@@ -78,9 +161,17 @@ class Selector:
         """ Return elements and specificity
         """
         ret = []
-        self._select(stylable, ret)
+        self._select_indexed(stylable.get_index(), ret)
         return ret
 
+    def match(self, stylable, root):
+        """ Return the specificity if `stylable' is selected when selecting from `root',
+        otherwise None.
+        """
+        ret = []
+        self._select_indexed(_SingleIndex(stylable), ret)
+        return ret[0][1] if ret else None
+
     def __hash__(self):
         return hash(self.__str__())
 
@@ -94,10 +185,8 @@ class AllSelector(Selector):
 
     WEIGHT = -1
 
-    def _select(self, stylable, ret):
-        ret.append((stylable, -1))
-        for child in stylable.get_children():
-            self._select(child, ret)
+    def _select_indexed(self, index, ret):
+        ret.extend((e, -1) for e in index.elements)
 
 
 class TypeSelector(Selector):
@@ -108,11 +197,8 @@ class TypeSelector(Selector):
     def __init__(self, typename):
         self.typename = typename
 
-    def _select(self, stylable, ret):
-        if stylable.typename == self.typename:
-            ret.append((stylable, self.WEIGHT))
-        for child in stylable.get_children():
-            self._select(child, ret)
+    def _select_indexed(self, index, ret):
+        ret.extend((e, self.WEIGHT) for e in index.by_type.get(self.typename, ()))
 
     def __str__(self):
         return self.typename
@@ -126,11 +212,9 @@ class ClassSelector(Selector):
     def __init__(self, classname):
         self.classname = classname
 
-    def _select(self, stylable, ret):
-        if self.classname in stylable.classnames:  # this does not consider the order of class
-            ret.append((stylable, self.WEIGHT + stylable.classnames.index(self.classname)))
-        for child in stylable.get_children():
-            self._select(child, ret)
+    def _select_indexed(self, index, ret):
+        for e in index.by_class.get(self.classname, ()):   # this does not consider the order of class
+            ret.append((e, self.WEIGHT + e.classnames.index(self.classname)))
 
     def __str__(self):
         return '.' + self.classname
@@ -144,6 +228,11 @@ class ClassTypeSelector(Selector):
         self.classname = classname
         self.typename = typename
 
+    def _select_indexed(self, index, ret):
+        # elements of the class are usually few, so only traverse if there is any
+        if self.classname in index.by_class and self.typename in index.by_type:
+            self._select(index.elements[0], ret)
+
     def _select(self, stylable, ret):
         if self.classname in stylable.classnames:
             for child in stylable.get_children():
@@ -158,6 +247,13 @@ class ClassTypeSelector(Selector):
         for child in stylable.get_children():
             self._select2(child, ret, order) 
 
+    def match(self, stylable, root):
+        if self.typename == stylable.typename:
+            for a in _get_ancestors(stylable, root):
+                if self.classname in a.classnames:
+                    return self.WEIGHT + a.classnames.index(self.classname)
+        return None
+
     def __str__(self):
         return '.%s %s' % (self.classname, self.typename)
 
@@ -170,11 +266,10 @@ class StyleSelector(Selector):
         self.stylename = stylename
         self.styleval = styleval
 
-    def _select(self, stylable, ret):
-        if stylable.get_style(self.stylename, raise_error=False) == self.styleval:
-            ret.append((stylable, self.WEIGHT))
-        for child in stylable.get_children():
-            self._select(child, ret)        
+    def _select_indexed(self, index, ret):
+        for e in index.elements:
+            if e.get_style(self.stylename, raise_error=False) == self.styleval:
+                ret.append((e, self.WEIGHT))
 
     def __str__(self):
         return '[%s=%s]' % (self.stylename, self.styleval)
@@ -189,12 +284,10 @@ class TypeStyleSelector(Selector):
         self.stylename = stylename
         self.styleval = styleval
 
-    def _select(self, stylable, ret):
-        if self.typename == stylable.typename and\
-            stylable.get_style(self.stylename, raise_error=False) == self.styleval:
-            ret.append((stylable, self.WEIGHT))
-        for child in stylable.get_children():
-            self._select(child, ret)   
+    def _select_indexed(self, index, ret):
+        for e in index.by_type.get(self.typename, ()):
+            if e.get_style(self.stylename, raise_error=False) == self.styleval:
+                ret.append((e, self.WEIGHT))
 
     def __str__(self):
         return '%s[%s=%s]' % (self.typename, self.stylename, self.styleval)
@@ -209,12 +302,10 @@ class ClassStyleSelector(Selector):
         self.stylename = stylename
         self.styleval = styleval
 
-    def _select(self, stylable, ret):
-        if self.classname in stylable.classnames and stylable.get_style(self.stylename, raise_error=False) == self.styleval:
-            ret.append((stylable, self.WEIGHT))
-
-        for child in stylable.get_children():
-            self._select(child, ret)
+    def _select_indexed(self, index, ret):
+        for e in index.by_class.get(self.classname, ()):
+            if e.get_style(self.stylename, raise_error=False) == self.styleval:
+                ret.append((e, self.WEIGHT))
 
     def __str__(self):
         return '.%s [%s=%s]' % (self.classname, self.stylename, self.styleval)
@@ -227,11 +318,8 @@ class NameSelector(Selector):
     def __init__(self, name):
         self.name = name
 
-    def _select(self, stylable, ret):
-        if stylable.has_name(self.name):
-            ret.append((stylable, self.WEIGHT))
-        for child in stylable.get_children():
-            self._select(child, ret)
+    def _select_indexed(self, index, ret):
+        ret.extend((e, self.WEIGHT) for e in index.by_name.get(self.name, ()))
 
     def __str__(self):
         return '#' + self.name
@@ -246,6 +334,10 @@ class ClassNameSelector(Selector):
         self.classname = classname
         self.name = name
 
+    def _select_indexed(self, index, ret):
+        if self.classname in index.by_class and self.name in index.by_name:
+            self._select(index.elements[0], ret)
+
     def _select(self, stylable, ret):
         if self.classname in stylable.classnames:
             for child in stylable.get_children():
@@ -260,6 +352,13 @@ class ClassNameSelector(Selector):
         for child in stylable.get_children():
             self._select2(child, ret, order) 
 
+    def match(self, stylable, root):
+        if stylable.has_name(self.name):
+            for a in _get_ancestors(stylable, root):
+                if self.classname in a.classnames:
+                    return self.WEIGHT + a.classnames.index(self.classname)
+        return None
+
     def __str__(self):
         return '.%s #%s' % (self.classname, self.name)
 
@@ -272,6 +371,8 @@ class StyleSheet:
             self.data = dict((s, style) for s in selectors)  # selector:style dict
         else:
             self.data = {selectors:style}
+        self.version = 0    # increased by `update'
+        self._type_styles = {}  # typename -> style of TypeSelector; cleared by `update'
 
     def apply_to(self, stylable, *args, **kwargs):
         """ Calculate used value of stylable (and its children)
@@ -297,6 +398,27 @@ class StyleSheet:
 
         return has_updated
 
+    def apply_to_elements(self, elements, root, *args, **kwargs):
+        """ Same as `apply_to(root)', but only `elements' (in the tree of `root') are updated.
+        """
+        has_updated = False
+
+        for element in elements:
+            data = []
+            for selector, style in self.data.items():
+                priority = selector.match(element, root)
+                if priority is not None:
+                    data.append((priority, style))
+            data.sort(key=lambda x:x[0])
+            for priority, style in data:
+                if isinstance(style, ResetStyle):
+                    has_updated = True
+                    element.clear_style(*args, **kwargs)
+                else:
+                    has_updated = element.update_style(style, *args, **kwargs) or has_updated
+
+        return has_updated
+
     def set_as_default(self, stylable):
         """ Apply the stylesheet to default values;
         Restrictions:
@@ -337,19 +459,78 @@ class StyleSheet:
                     self.data[selector] = style
                 else:
                     self.data[selector].update(style)
+        self.version += 1
+        self._type_styles.clear()
 
     def find(self, key):
         return self.data[key]
 
     def find_type(self, key):
-        return self.data[TypeSelector(key)]
+        try:
+            return self._type_styles[key]
+        except KeyError:
+            style = self._type_styles[key] = self.data[TypeSelector(key)]
+            return style
+
+
+def _style_equal(s1, s2):
+    try:
+        return bool(s1 == s2)
+    except Exception:   # e.g. arrays
+        return False
+
+
+def compute_inheritance(stylable, parent_style, default_stylesheet, inherited_style=None):
+    """ Compute inheritance and write into computed_style.
+    An element is recomputed only if its exported style, inherited styles or
+    default stylesheet are changed since last time.
+    Children are visited only if they or their descendants are changed (`subtree_dirty'),
+    or what they inherit is changed, so unchanged subtrees are skipped.
+    `inherited_style': The inheritable part of `parent_style', shared by siblings.
+    """
+
+    if inherited_style is None:
+        inherited_style = _get_inherited_style(parent_style)
+    default_version = (id(default_stylesheet), default_stylesheet.version)
+
+    if stylable.computed_style is None or \
+        stylable.default_style_version != default_version or \
+        (inherited_style is not stylable.last_inherited_style and not _style_equal(inherited_style, stylable.last_inherited_style)):
+        _compute_element_style(stylable, parent_style, default_stylesheet, stylable.export_style())
+    elif stylable.style_dirty:
+        exported_style = stylable.export_style()
+        if not _style_equal(exported_style, stylable.last_exported_style):
+            _compute_element_style(stylable, parent_style, default_stylesheet, exported_style)
+
+    stylable.style_dirty = False
+    stylable.last_inherited_style = inherited_style
+    stylable.default_style_version = default_version
+
+    children = stylable.get_children()
+    if children:
+        # the snapshot is kept if not changed, so children can compare it by identity
+        child_inherited_style = _get_inherited_style(stylable.computed_style)
+        if _style_equal(child_inherited_style, stylable.child_inherited_style):
+            child_inherited_style = stylable.child_inherited_style
+        else:
+            stylable.child_inherited_style = child_inherited_style
+        for c in children:
+            c.parent = stylable
+            if c.subtree_dirty or c.default_style_version != default_version or \
+                c.last_inherited_style is not child_inherited_style:
+                compute_inheritance(c, stylable.computed_style, default_stylesheet, child_inherited_style)
 
+    # handlers may change styles of elements already visited
+    stylable.subtree_dirty = stylable.style_dirty or any(c.subtree_dirty for c in children)
 
-def compute_inheritance(stylable, parent_style, default_stylesheet):
-    """ Compute inheritance and write into computed_style
-    """
 
-    default_style = default_stylesheet.find(TypeSelector(stylable.typename))
+def _get_inherited_style(style):
+    return {d: style.get(d) for d in inheritable_styles}
+
+
+def _compute_element_style(stylable, parent_style, default_stylesheet, exported_style):
+
+    default_style = default_stylesheet.find_type(stylable.typename)
     old_computed_style = {} if not stylable.computed_style else stylable.computed_style.copy()
 
     if not stylable.computed_style:
@@ -358,7 +539,7 @@ def compute_inheritance(stylable, parent_style, default_stylesheet):
         stylable.computed_style = dict(((d, v) for d, v in stylable.computed_style.items() if not is_copyable_style(d)))
         stylable.computed_style.update(default_style)
 
-    for d, v in stylable.export_style().items():
+    for d, v in exported_style.items():
         if v is SpecialStyleValue.INHERIT:
             if is_inheritable_style(d):
                 try:
@@ -374,10 +555,23 @@ def compute_inheritance(stylable, parent_style, default_stylesheet):
             stylable.computed_style[d] = v
 
     stylable.on_style_updated(old_computed_style, stylable.computed_style)
+    stylable.last_exported_style = exported_style
+
+
+def find_dirty(stylable):
+    """ Return elements of which the style is changed since last `compute_inheritance',
+    together with their ancestors.
+    """
+    ret = []
+    if stylable.subtree_dirty:
+        ret.append(stylable)
+        for c in stylable.get_children():
+            c.parent = stylable
+            ret.extend(find_dirty(c))
+        if len(ret) == 1 and not stylable.style_dirty:
+            ret.clear()
+    return ret
 
-    for c in stylable.get_children():
-        compute_inheritance(c, stylable.computed_style, default_stylesheet)
-        
 
 def compute_style(stylable, default_stylesheet):
     """ Compute default and inherit for computed_style for stylable.
@@ -473,7 +667,7 @@ def load_css(fp):
             m_value = value_matcher.match(content)
             if m_value is None:
                 fail_parse(content)
-            name, val = clean_str(m_value.group(1)), clean_str(m_value.group(2))
+            name, val = sys.intern(clean_str(m_value.group(1))), clean_str(m_value.group(2))
             style[name] = translate_style_val(name, val)
             content = content[m_value.end():]
         ss.data[selector] = style
@@ -84,6 +84,11 @@ def translate_style_val(style_name:str, style_val:str):
         else:
             return stod(style_val)
 
+    elif style_name == 'decimate':
+        if style_val in ('auto', 'none'):
+            return style_val
+        return stod(style_val)
+
     elif style_name in ('scale', 'xscale', 'yscale'):
         if style_val not in ('linear', 'log'):
             raise LineParseError('Invalid scale "%s"' % style_val)
@@ -111,6 +116,9 @@ def translate_style_val(style_name:str, style_val:str):
     elif style_name == 'visible':
         return stob(style_val)
 
+    elif style_name == 'rasterize':
+        return style_val if style_val == 'auto' else stob(style_val)
+
     # int
     elif style_name in ('skippoint', 'zindex'):
         return stod(style_val)
@@ -40,6 +40,8 @@ PointTypeStr = ('o','+','*', '.', 'x', 's', 'd', '^', 'v', '>', '<', 'p', 'h', '
 
 class Color(tuple):
 
+    __slots__ = ()
+
     RED = (1, 0, 0)
     YELLOW = (1, 1, 0)
     GREEN = (0, 1, 0)
@@ -172,6 +174,8 @@ def str2pos(s):
 
 class Padding:
 
+    __slots__ = ('data',)
+
     def __init__(self, *args):
         if len(args) == 1:
             if isinstance(args[0], (int, float)):
@@ -231,6 +235,8 @@ class Padding:
         return 1 - self.data[1] - self.data[3]
 
 class Rect:
+
+    __slots__ = ('x', 'y', 'width', 'height')
     
     def __init__(self, *args):
         if len(args) == 1:
@@ -271,6 +277,8 @@ class FontProperty:
     """ Properties other than fontfamily
     """
 
+    __slots__ = ('_holder',)
+
     _OPTIONS = {
         'style': ('normal', 'italic', 'oblique'),
         'variant': ('normal', 'small-caps'),
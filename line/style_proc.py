@@ -2,6 +2,7 @@
 """
 
 import logging
+import sys
 import warnings
 
 from . import style
@@ -157,7 +158,7 @@ def parse_single_style(m_tokens, require_equal=False, recog_comma=True, recog_co
     elif style_name == 'off':
         return 'visible', False
 
-    style_name = keywords.style_alias.get(style_name, style_name)
+    style_name = sys.intern(keywords.style_alias.get(style_name, style_name))
     is_invalid = style_name not in keywords.style_keywords
     if is_invalid and raise_error:
         raise LineParseError('Invalid style "%s"' % style_name)
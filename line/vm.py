@@ -1,4 +1,5 @@
 
+import re
 from collections import namedtuple
 
 from . import process
@@ -13,9 +14,26 @@ class CodeBlock:
         self.loop_range = None
         self.cond = None
         self.stmts = []
+        self.instrs = None      # compiled statements; `False` if cannot be compiled
 
 LineDebugInfo = namedtuple('LineDebugInfo', ['filename', 'lineid', 'token_pos'])
 
+# compiled statements. `tokens' are the remaining tokens when the statement is evaluated
+# (same as `process'; for error reporting), and the whole statement for `CommandInstr'.
+CommandInstr = namedtuple('CommandInstr', ['tokens', 'info'])               # executed by `process'
+ParsedCommandInstr = namedtuple('ParsedCommandInstr', ['command', 'tokens', 'info'])   # see `process.parse_command'
+ExprInstr = namedtuple('ExprInstr', ['varname', 'expr', 'tokens', 'info'])  # $expr or $var = expr
+LetInstr = namedtuple('LetInstr', ['varname', 'expr', 'tokens', 'info'])    # let var = expr
+ForInstr = namedtuple('ForInstr', ['loop_var', 'expr', 'body', 'tokens', 'info'])
+IfInstr = namedtuple('IfInstr', ['expr', 'body', 'else_body', 'tokens', 'info'])
+FunctionInstr = namedtuple('FunctionInstr', ['name', 'block', 'tokens', 'info'])   # let fun = do ... done
+
+
+class CompileError(Exception):
+    """ The block is not in a regular structure, and has to be executed by replaying.
+    """
+    pass
+
 class VMHost:
 
     MODE_EXEC = 0
@@ -52,17 +70,19 @@ class VMHost:
             self.error = None
             return self.process_unsafe(state, tokens, line_debug_info)
         except Exception as e:
-            if self.debug:
-                raise
-            else:
-                p = -len(tokens)-1
-                if p <= -len(line_debug_info.token_pos):
-                    p = 0
-                self.error = e
-                self.backtrace = LineDebugInfo(line_debug_info.filename, 
-                    line_debug_info.lineid,
-                    line_debug_info.token_pos[p])
-                return 3, self.backtrace, self.error
+            return self._handle_error(e, tokens, line_debug_info)
+
+    def _handle_error(self, e, tokens, line_debug_info):
+        if self.debug:
+            raise e
+        p = -len(tokens)-1
+        if p <= -len(line_debug_info.token_pos):
+            p = 0
+        self.error = e
+        self.backtrace = LineDebugInfo(line_debug_info.filename, 
+            line_debug_info.lineid,
+            line_debug_info.token_pos[p])
+        return 3, self.backtrace, self.error
 
     def process_unsafe(self, state, tokens, line_debug_info):
         
@@ -188,20 +208,211 @@ class VMHost:
         return 0
 
     def exec_block(self, state, block):
+        if block.instrs is None:
+            try:
+                block.instrs = self.compile_stmts(block.stmts)
+            except CompileError:
+                block.instrs = False
+
         if block.loop_var:
             for x in block.loop_range:
                 self.set_variable(block.loop_var, x)
-                for stmt, info in block.stmts:
-                    r = self.process(state, stmt.copy(), info)
-                    if r != 0:
-                        return r
+                r = self.exec_stmts(state, block)
+                if r != 0:
+                    return r
+            return 0
         else:
+            return self.exec_stmts(state, block)
+
+    def exec_stmts(self, state, block):
+        if block.instrs is False:   # replay
             for stmt, info in block.stmts:
                 r = self.process(state, stmt.copy(), info)
                 if r != 0:
                     return r
+            return 0
+        return self.exec_instrs(state, block.instrs)
+
+    def exec_instrs(self, state, instrs):
+        for instr in instrs:
+            if isinstance(instr, CommandInstr):
+                r = self.process(state, instr.tokens.copy(), instr.info)
+            else:
+                try:
+                    self.pc = (instr.info, instr.tokens)
+                    self.error = None
+                    r = self.exec_instr(state, instr)
+                except Exception as e:
+                    r = self._handle_error(e, instr.tokens, instr.info)
+            if r != 0:
+                return r
         return 0
 
+    def exec_instr(self, state, instr):
+        """ Execute a compiled statement other than `CommandInstr'. Same as `exec_special'
+        and the expression part of `process.parse_and_process_command'.
+        """
+        if isinstance(instr, ParsedCommandInstr):
+            return process.process_parsed_command(state, instr.command)
+
+        elif isinstance(instr, ExprInstr):
+            state.file_caches.clear()
+            ret = process.process_expr(state, instr.expr)
+            if instr.varname is not None:
+                self.set_variable(instr.varname, ret)
+            elif not (ret is None and not state.is_interactive):
+                print(ret)
+            return 0
+
+        elif isinstance(instr, LetInstr):
+            self.set_variable(instr.varname, process.process_expr(state, instr.expr))
+            return 0
+
+        elif isinstance(instr, ForInstr):
+            ret = process.process_expr(state, instr.expr)
+            if isinstance(ret, str):
+                ret = ret.split()
+            for x in ret:
+                self.set_variable(instr.loop_var, x)
+                r = self.exec_instrs(state, instr.body)
+                if r != 0:
+                    return r
+            return 0
+
+        elif isinstance(instr, IfInstr):
+            cond = process.process_expr(state, instr.expr)
+            if isinstance(cond, str):
+                cond = parse_util.stob(cond) if cond != "" else False
+            if cond:
+                return self.exec_instrs(state, instr.body)
+            elif instr.else_body is not None:
+                return self.exec_instrs(state, instr.else_body)
+            return 0
+
+        elif isinstance(instr, FunctionInstr):
+            self.records[instr.name] = instr.block
+            return 0
+
+        else:
+            raise ValueError(instr)
+
+    def compile_stmts(self, stmts):
+        """ Compile recorded statements into instructions, so control statements and
+        expressions are not parsed again in each execution.
+        Raises `CompileError' if the statements cannot be compiled.
+        """
+        instrs = []
+        i = 0
+        while i < len(stmts):
+            tokens, info = stmts[i]
+            i += 1
+            if len(tokens) == 0:
+                continue
+            m_tokens = tokens.copy()
+            head = parse_util.lookup(m_tokens)
+
+            try:
+                if head == 'for':
+                    parse_util.get_token(m_tokens)
+                    loop_var = parse_util.get_token(m_tokens)
+                    parse_util.assert_token(parse_util.get_token(m_tokens), '=')
+                    expr = parse_util.parse_expr(m_tokens)
+                    parse_util.assert_token(parse_util.get_token(m_tokens), 'do')
+                    pos_tokens = m_tokens.copy()
+                    body, _, i = self._collect_block(stmts, i, m_tokens, info)
+                    instrs.append(ForInstr(loop_var, expr, self.compile_stmts(body), pos_tokens, info))
+
+                elif head == 'if':
+                    parse_util.get_token(m_tokens)
+                    expr = parse_util.parse_expr(m_tokens)
+                    pos_tokens = m_tokens.copy()
+                    if not parse_util.test_token_inc(m_tokens, 'then'):     # if ... call: a single statement
+                        instrs.append(CommandInstr(tokens, info))
+                        continue
+                    body, else_body, i = self._collect_block(stmts, i, m_tokens, info, allow_else=True)
+                    instrs.append(IfInstr(expr, self.compile_stmts(body), 
+                        self.compile_stmts(else_body) if else_body is not None else None, pos_tokens, info))
+
+                elif head == 'let' and parse_util.lookup(m_tokens, 3) == 'do':
+                    parse_util.get_token(m_tokens)
+                    fname = parse_util.get_token(m_tokens)
+                    parse_util.get_token(m_tokens)
+                    parse_util.get_token(m_tokens)
+                    block = CodeBlock()
+                    block.stmts, _, i = self._collect_block(stmts, i, m_tokens, info)
+                    instrs.append(FunctionInstr(fname, block, tokens, info))
+
+                elif head == 'let':
+                    parse_util.get_token(m_tokens)
+                    varname = parse_util.get_token(m_tokens)
+                    parse_util.assert_token(parse_util.get_token(m_tokens), '=')
+                    expr = parse_util.parse_expr(m_tokens)
+                    parse_util.assert_no_token(m_tokens)
+                    instrs.append(LetInstr(varname, expr, m_tokens, info))
+
+                elif head in ('done', 'end', 'else'):
+                    raise CompileError()
+
+                elif parse_util.lookup_raw(m_tokens, ret_string=True).startswith('$'):
+                    if re.match(r'\$[_0-9a-zA-Z\*\?\.]+', parse_util.lookup_raw(m_tokens, ret_string=True)) and \
+                        parse_util.lookup_raw(m_tokens, 1) == '=':
+                        varname = parse_util.get_token(m_tokens)
+                        parse_util.get_token(m_tokens)
+                    else:
+                        varname = None
+                    instrs.append(ExprInstr(varname, ''.join(m_tokens), m_tokens, info))
+
+                else:
+                    parsed = process.parse_command(m_tokens)
+                    if parsed is not None:
+                        instrs.append(ParsedCommandInstr(parsed, m_tokens, info))
+                    else:
+                        instrs.append(CommandInstr(tokens, info))
+
+            except errors.LineParseError:   # report the error when executing
+                instrs.append(CommandInstr(tokens, info))
+
+        return instrs
+
+    def _collect_block(self, stmts, i, remaining_tokens, info, allow_else=False):
+        """ Collect statements of a block starting from stmts[i], until the matching `done'/`end',
+        in the same way of recording. Returns (statements, statements in else part, next index).
+        """
+        body = []
+        else_body = None
+        if remaining_tokens:    # statements in the same line of "do"/"then"
+            if self._is_block_begin(remaining_tokens):
+                raise CompileError()
+            body.append((remaining_tokens, info))
+
+        level = 1
+        while i < len(stmts):
+            tokens, m_info = stmts[i]
+            i += 1
+            head = parse_util.lookup(tokens)
+            if head in ('done', 'end'):
+                level -= 1
+                if level == 0:
+                    return body, else_body, i
+            elif head == 'else' and allow_else and else_body is None:
+                if level > 1:   # recording matches it greedily; keep that behavior by replaying
+                    raise CompileError()
+                m_tokens = tokens.copy()
+                parse_util.get_token(m_tokens)
+                if self._is_block_begin(m_tokens):
+                    raise CompileError()
+                else_body = [(m_tokens, m_info)] if m_tokens else []
+                continue
+            elif self._is_block_begin(tokens):
+                level += 1
+            (body if else_body is None else else_body).append((tokens, m_info))
+
+        raise CompileError()
+
+    def _is_block_begin(self, tokens):
+        return parse_util.lookup(tokens) in ('if', 'for') or (
+            parse_util.lookup(tokens) == 'let' and parse_util.lookup(tokens, 3) == 'do')
+
     def record(self, tokens, line_debug_info):
         self._cur_record().stmts.append((tokens.copy(), line_debug_info))
         return 0
@@ -0,0 +1,33 @@
+""" Memory benchmark of `SourceableSheet' on a wide table.
+Usage: python bench-sheet.py [rows] [columns]
+"""
+
+import sys
+sys.path.append('..')
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+from line.model.sheet import SourceableSheet
+
+
+def measure(name, func):
+    tracemalloc.start()
+    r = func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print('%-28s %10.1f MB' % (name, peak / 2**20))
+    return r
+
+
+rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+columns = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+df = pd.DataFrame(np.random.rand(rows, columns))
+print('table: %d x %d, %.1f MB' % (rows, columns, df.memory_usage().sum() / 2**20))
+
+data = measure('wrap', lambda: SourceableSheet(df, 'bench'))
+measure('copy', lambda: data.copy())
+measure('column selection', lambda: [data[i] for i in range(1, columns + 1)])
+measure('slicing', lambda: [data[:, i] for i in range(columns)])
+measure('($data[2]*2+1)/3', lambda: (data[2]*2 + 1) / 3)
+measure('sheet of sheet', lambda: SourceableSheet(data))
@@ -0,0 +1,53 @@
+""" Memory/time benchmark of element styles on a figure with many elements.
+Usage: python bench-style.py [splits] [lines per subfigure]
+"""
+
+import sys
+sys.path.append('..')
+import time
+import tracemalloc
+import numpy as np
+
+from line import state, defaults
+from line.style import css
+from line.dataview import datapack
+from line.positioning import split
+
+
+def measure(name, func):
+    tracemalloc.start()
+    t = time.perf_counter()
+    r = func()
+    t = time.perf_counter() - t
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print('%-28s %8.1f MB (peak %8.1f MB) %8.3f s' % (name, current / 2**20, peak / 2**20, t))
+    return r
+
+
+splits = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+lines = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+m_state = state.GlobalState()
+defaults.init_global_state(m_state)
+m_fig = m_state.figure()
+m_state.refresh_style(True)
+split.split_figure(m_fig, splits, splits, resize_figure=False)
+m_state.refresh_style(True)
+x = np.arange(10.0)
+print('figure: %d subfigures x %d lines' % (splits**2, lines))
+
+
+def create():
+    for m_subfig in m_fig.subfigures:
+        for i in range(lines):
+            m_subfig.add_dataline(datapack.StaticPairedDataPack(x, x*i), 'line%d' % i, 'x',
+                {'linewidth': 1, 'pointsize': 2, 'zindex': 1})
+
+elements = lambda: [e for m_subfig in m_fig.subfigures for e in m_subfig.get_index().elements]
+
+measure('create elements', create)
+measure('compute style', lambda: m_state.refresh_style(True))
+measure('recompute style', lambda: m_state.refresh_style(True))
+measure('export style', lambda: [e.export_style() for e in elements()])
+measure('copy computed style', lambda: [dict(e.computed_style) for e in elements()])
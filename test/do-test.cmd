@@ -1,6 +1,16 @@
 @echo off
 python test-lexer.py
 python test-plot.py
+python test-compact.py
+python test-dataload.py
+python test-cache.py
+python test-projection.py
+python test-command.py
+python test-sheet.py
+python test-restyle.py
+python test-index.py
+python test-stream.py
+python test-render.py
 cd ../
 echo. & echo "--------- testing lex ----------" & echo.
 python -m line -d test/test-lex.line
@@ -20,6 +30,8 @@ if %errorlevel% neq 0 exit /b %errorlevel%
 echo. & echo "--------- testing stdin ----------" & echo.
 cat example/test-data.txt | python -m line -d test/test-stdin.line 
 if %errorlevel% neq 0 exit /b %errorlevel%
+cat test/dataload/comments.txt | python -m line -d test/test-stdin.line
+if %errorlevel% neq 0 exit /b %errorlevel%
 echo. & echo "--------- testing style ----------" & echo.
 python -m line -d test/test-style.line
 if %errorlevel% neq 0 exit /b %errorlevel%
@@ -2,6 +2,16 @@
 set -e
 python test-lexer.py
 python test-plot.py
+python test-compact.py
+python test-dataload.py
+python test-cache.py
+python test-projection.py
+python test-command.py
+python test-sheet.py
+python test-restyle.py
+python test-index.py
+python test-stream.py
+python test-render.py
 cd ../
 printf "\n--------- testing lex ----------\n"
 python -m line -d test/test-lex.line
@@ -15,6 +25,7 @@ printf "\n--------- testing expr ----------\n"
 python -m line -d test/test-expr.line a
 printf "\n--------- testing stdin ----------\n"
 cat example/test-data.txt | python -m line -d test/test-stdin.line 
+cat test/dataload/comments.txt | python -m line -d test/test-stdin.line
 printf "\n--------- testing style ----------\n"
 python -m line -d test/test-style.line
 printf "\n--------- testing element ----------\n"
@@ -0,0 +1,120 @@
+import sys
+import os
+import shutil
+import tempfile
+sys.path.append('..')
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+import pandas
+
+from line import defaults, terminal, process
+from line.model import io as model_io
+from line.model import cache
+
+# Files are parsed again only if they are changed, or loaded with different options.
+
+def count_parsing(filename):
+    counter = [0]
+    read_dataframe = model_io._read_dataframe
+
+    def read_and_count(*args, **kwargs):
+        counter[0] += args[0] == filename
+        return read_dataframe(*args, **kwargs)
+
+    model_io._read_dataframe = read_and_count
+    return counter
+
+
+def cache_files(cache_dir):
+    return sorted(fn for fn in os.listdir(cache_dir) if fn.endswith('.json'))
+
+
+def entry_sizes(cache_dir):
+    return [sum(os.path.getsize(os.path.join(cache_dir, fn[:-5] + suffix)) for suffix in ('.json', '.npz'))
+        for fn in cache_files(cache_dir)]
+
+
+class Exploit:
+    def __reduce__(self):
+        return (exec, ('raise RuntimeError("code executed")',))
+
+
+if __name__ == '__main__':
+
+    defaults.default_options['prompt-overwrite'] = False
+    terminal.CMDHandler._debug = True   # raise errors
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.environ['HOME'] = os.environ['USERPROFILE'] = tmpdir   # cache is written to ~/.line/cache
+        cache_dir = os.path.join(tmpdir, '.line', 'cache')
+        filename = os.path.join(tmpdir, 'test-data.txt')
+        shutil.copy('../example/test-data.txt', filename)
+        counter = count_parsing(filename)
+
+        cmd_handler = terminal.CMDHandler()
+        m_state = cmd_handler.m_state
+        plot = lambda: cmd_handler.proc_lines(['plot %s t:y1\n' % filename])
+        n_points = lambda: len(m_state.cur_subfigure().datalines[0].data.get_y())
+
+        cmd_handler.proc_lines(['set option data-cache=true\n'])
+        plot()
+        assert counter[0] == 1 and len(cache_files(cache_dir)) == 1
+        n_full = n_points()
+
+        # hit
+        plot()
+        assert counter[0] == 1 and n_points() == n_full
+
+        # size is changed
+        with open(filename, 'a') as f:
+            f.write('2.1\t1.0\t1.0\n')
+        plot()
+        assert counter[0] == 2 and n_points() == n_full + 1
+        assert len(cache_files(cache_dir)) == 2
+
+        # mtime is changed
+        st = os.stat(filename)
+        os.utime(filename, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        plot()
+        assert counter[0] == 3 and n_points() == n_full + 1
+        plot()
+        assert counter[0] == 3
+
+        # data option is changed (file is reduced by streaming)
+        cmd_handler.proc_lines(['set option stream-threshold=0.000001\n'])
+        plot()
+        assert counter[0] == 4 and len(cache_files(cache_dir)) == 4
+        cmd_handler.proc_lines(['set option stream-threshold=0\n'])
+        plot()
+        assert counter[0] == 4 and n_points() == n_full + 1
+
+        # size limit: least recently used files are removed
+        entry_size = min(entry_sizes(cache_dir))  # of full data, like the next entry
+        cmd_handler.proc_lines(['set option data-cache-size=%f\n' % (entry_size * 1.5 / 2**20)])
+        os.utime(filename, ns=(st.st_atime_ns, st.st_mtime_ns + 2 * 10**9))
+        plot()
+        assert counter[0] == 5 and len(cache_files(cache_dir)) == 1
+
+        # disabled
+        cmd_handler.proc_lines(['set option data-cache=false\n'])
+        plot()
+        assert counter[0] == 6
+
+        # titles, strings, missing values, reduced rows and weights are kept
+        data_cache = cache.DataCache(os.path.join(tmpdir, 'cache2'))
+        df = pandas.DataFrame({'t': [1.0, np.nan, 3.0], 'label': ['a', np.nan, 'c'], 3: [1, 2, 3]})
+        data_cache.put('k1', dict(data=df, positions=[0, 2, 3], rows=np.array([0, 5, 9]), weights=df[['t']]))
+        r = data_cache.get('k1')
+        assert r['data'].equals(df) and list(r['data'].columns) == ['t', 'label', 3]
+        assert r['positions'] == [0, 2, 3] and np.array_equal(r['rows'], [0, 5, 9])
+        assert r['weights'].equals(df[['t']])
+        data_cache.put('k2', dict(data=df, positions=None))
+        r = data_cache.get('k2')
+        assert r['rows'] is None and r['weights'] is None and r['positions'] is None
+
+        # pickled objects in cache files are never loaded
+        with open(os.path.join(data_cache.cache_dir, 'k1.npz'), 'wb') as f:
+            np.savez(f, data0=np.array([Exploit()], dtype=object))
+        assert data_cache.get('k1') is None
+        data_cache.put('k3', dict(data=pandas.DataFrame({'x': [Exploit()]}), positions=None))
+        assert data_cache.get('k3') is None
@@ -0,0 +1,68 @@
+import sys
+import collections
+sys.path.append('..')
+import matplotlib
+matplotlib.use('Agg')
+
+from line import defaults, terminal, process
+
+# Commands registered by `process.register_command' run in the same way as builtin ones,
+# and are parsed only once in loops and functions.
+
+parsed = []
+executed = []
+
+def parse_summate(m_tokens):
+    args = []
+    while len(m_tokens) > 0:
+        args.append(int(process.get_token(m_tokens)))
+    parsed.append(args)
+    return tuple(args)
+
+def execute_summate(m_state, *args):
+    executed.append(sum(args))
+
+
+if __name__ == '__main__':
+
+    defaults.default_options['prompt-overwrite'] = False
+    terminal.CMDHandler._debug = True   # raise errors
+    process.register_command('summate', execute_summate, parse_summate, reads_style=False)
+
+    name, command = process.lookup_command(collections.deque(['summate', '1', '2']))
+    assert name == 'summate' and command.execute is execute_summate
+    name, command = process.lookup_command(collections.deque(['no_such_command']))
+    assert command is None
+
+    cmd_handler = terminal.CMDHandler()
+    m_state = cmd_handler.m_state
+
+    # directly
+    m_parsed = process.parse_command(collections.deque(['summate', '1', '2']))
+    assert m_parsed.args == (1, 2)
+    process.process_parsed_command(m_state, m_parsed)
+    assert executed == [3]
+
+    # by command line
+    cmd_handler.proc_lines(['summate 3 4\n'])
+    assert executed == [3, 7]
+
+    # by VM: parsed once, executed in every iteration
+    process_parsed_command = process.process_parsed_command
+    n_processed = [0]
+    def process_and_count(*args):
+        n_processed[0] += 1
+        return process_parsed_command(*args)
+    process.process_parsed_command = process_and_count
+    del parsed[:]
+    try:
+        cmd_handler.proc_lines(['for i = "1 2 3" do\n', '    summate 5 6\n', 'done\n'])
+    finally:
+        process.process_parsed_command = process_parsed_command
+    assert executed == [3, 7, 11, 11, 11]
+    assert n_processed[0] == 3 and parsed == [[5, 6]], (n_processed, parsed)
+
+    # replaced, without parser
+    process.register_command('summate', lambda m_state, m_tokens: executed.append(list(m_tokens)))
+    cmd_handler.proc_lines(['summate 8 9\n'])
+    assert executed[-1] == ['8', '9'], executed
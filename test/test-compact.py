@@ -0,0 +1,61 @@
+import sys
+import os
+sys.path.append('..')
+import matplotlib
+matplotlib.use('Agg')
+
+from line import defaults, terminal, process
+
+# Compacting by estimated frames must give the same margin and paddings as compacting by rendering.
+
+def get_layouts(filename, estimate):
+    layouts = []
+    depth = [0]
+    estimated = [0]
+    rejected = [0]
+    render_cur_figure = process.render_cur_figure
+    compact_by_estimate = process.compact_by_estimate
+
+    def render_and_record(m_state):
+        depth[0] += 1
+        try:
+            render_cur_figure(m_state)
+        finally:
+            depth[0] -= 1
+        if depth[0] == 0:
+            m_fig = m_state.cur_figure()
+            layouts.append((m_state.cur_figurename, m_fig.computed_style['margin'],
+                [m_subfig.computed_style['padding'] for m_subfig in m_fig.subfigures]))
+
+    def compact_and_count(m_state):
+        assert not m_state.cur_figure().estimate_rejected   # rejected figures are not estimated again
+        ret = estimate and compact_by_estimate(m_state)
+        estimated[0] += ret
+        rejected[0] += estimate and not ret
+        return ret
+
+    process.render_cur_figure = render_and_record
+    process.compact_by_estimate = compact_and_count
+    try:
+        cmd_handler = terminal.CMDHandler()
+        cmd_handler.m_state._vmhost.push_args([filename])
+        cmd_handler.proc_file(filename)
+    finally:
+        process.render_cur_figure = render_cur_figure
+        process.compact_by_estimate = compact_by_estimate
+    return layouts, estimated[0], rejected[0], len(cmd_handler.m_state.figures)
+
+
+if __name__ == '__main__':
+
+    os.chdir('..')
+    defaults.default_options['prompt-overwrite'] = False
+    for filename in ('test/test-style.line', 'test/test-figure.line', 'test/test-element.line'):
+        rendered, _, _, _ = get_layouts(filename, False)
+        estimated, n_estimated, n_rejected, n_figures = get_layouts(filename, True)
+        assert len(rendered) == len(estimated)
+        for r, e in zip(rendered, estimated):
+            assert r == e, (r, e)
+        # each figure is estimated until the estimate is rejected once
+        assert n_estimated > 0, filename
+        assert n_rejected <= n_figures, (filename, n_rejected, n_figures)
@@ -0,0 +1,111 @@
+import sys
+import os
+import io
+import tempfile
+import zipfile
+sys.path.append('..')
+import numpy as np
+
+from line.model import io as model_io
+
+# Loading text data by file (memory-mapped), buffer and non-seekable stream must give the same result.
+
+class UnseekableStream:
+
+    def __init__(self, text):
+        self.fp = io.StringIO(text)
+
+    def read(self, size=-1):
+        return self.fp.read(size)
+
+    def readline(self):
+        return self.fp.readline()
+
+    def seekable(self):
+        return False
+
+
+class LiveStream:
+    """ Interactive input, where reading more than the lines typed so far blocks.
+    """
+    def __init__(self, text):
+        self.lines = text.splitlines(True)
+
+    def read(self, size=-1):
+        raise AssertionError('blocked')
+
+    def readline(self):
+        if not self.lines:
+            raise AssertionError('blocked')
+        return self.lines.pop(0)
+
+
+def load_all(filename, **kwargs):
+    with open(filename, 'r') as f:
+        text = f.read()
+    results = [
+        model_io.load_dataframe(filename, **kwargs),
+        model_io.load_dataframe(io.StringIO(text), **kwargs),
+        model_io.load_dataframe(UnseekableStream(text), **kwargs),
+    ]
+    for r in results[1:]:
+        assert r.equals(results[0]), (r, results[0])
+    return results[0]
+
+
+if __name__ == '__main__':
+
+    os.chdir('..')
+    filename = 'test/dataload/comments.txt'
+
+    # indented comment is an empty row; the row of nan is kept
+    r = load_all(filename)
+    assert list(r.columns) == ['t', 'y1', 'y2']
+    assert len(r) == 6
+    assert r.iloc[1].isna().all() and r.iloc[3].isna().all()
+    assert r['y2'].iloc[2] == 2.5
+
+    # 'smart' skips lines of comment only
+    r = load_all(filename, ignore_data_comment='smart')
+    assert len(r) == 5
+    assert r.iloc[2].isna().all()
+    assert np.array_equal(r['t'].iloc[[0, 1, 3, 4]], [0.0, 0.1, 0.2, 0.3])
+
+    r = load_all(filename, ignore_data_comment='smart', reduce='minmax')
+    assert np.array_equal(r.sort_index()['y2'].dropna(), [2.0, 2.5, 3.0, 3.5])
+
+    # sniffing reads only the lines needed
+    text = '# t y\n\n' + ''.join('%d %d\n' % (i, i*i) for i in range(5))
+    assert model_io.read_head(LiveStream(text), 5) == text
+    assert model_io.read_head(LiveStream(text), 2) == '# t y\n\n0 0\n1 1\n'
+
+    header = ''.join('# comment line %d\n' % i for i in range(10000))
+    with open(filename, 'r') as f:
+        text = header + f.read()
+    r = model_io.load_dataframe(io.StringIO(text))
+    assert r.equals(load_all(filename))
+    r = model_io.load_dataframe(UnseekableStream(text), ignore_data_comment='smart')
+    assert r.equals(load_all(filename, ignore_data_comment='smart'))
+
+    # binary formats: by extension, then by magic bytes; other zip files are text
+    with tempfile.TemporaryDirectory() as tmpdir:
+        npz_file = os.path.join(tmpdir, 'data.npz')
+        np.savez(npz_file, t=np.arange(3.0))
+        os.rename(npz_file, os.path.join(tmpdir, 'data'))
+        zip_file = os.path.join(tmpdir, 'data.zip')
+        with zipfile.ZipFile(zip_file, 'w') as f:
+            f.write(filename, 'comments.txt')
+        assert model_io.detect_format(os.path.join(tmpdir, 'data')) == 'npz'
+        assert model_io.detect_format(zip_file) is None
+        assert model_io.detect_format(os.path.join(tmpdir, 'data.npy')) == 'npy'
+        assert model_io.detect_format(filename) is None
+
+        # files with text extensions are never opened for sniffing magic bytes
+        def open_and_fail(*args, **kwargs):
+            raise AssertionError('opened %s' % args[0])
+        model_io.open = open_and_fail
+        try:
+            assert model_io.detect_format(filename) is None
+            assert model_io.detect_format(os.path.join(tmpdir, 'data.csv')) is None
+        finally:
+            del model_io.open
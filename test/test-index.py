@@ -0,0 +1,67 @@
+import sys
+import os
+sys.path.append('..')
+import matplotlib
+matplotlib.use('Agg')
+
+from line import terminal
+from line.style import css
+
+# Selectors see added, renamed and reclassed elements; indices are rebuilt only when
+# the tree they cover is changed.
+
+def select_names(selector, root):
+    return sorted(e.name for e, p in selector.select(root))
+
+
+if __name__ == '__main__':
+
+    os.chdir('..')
+    terminal.CMDHandler._debug = True   # raise errors
+    cmd_handler = terminal.CMDHandler()
+    m_state = cmd_handler.m_state
+    cmd_handler.proc_lines([
+        'figure f1\n',
+        'plot example/test-data.txt t:y1, t:y2\n',
+        'figure f2\n',
+        'plot example/test-data.txt t:y1\n',
+        'display\n',
+        'figure f1\n',
+    ])
+    m_fig1 = m_state.figures['f1']
+    m_fig2 = m_state.figures['f2']
+    m_subfig = m_fig1.subfigures[0]
+    line1, line2 = m_subfig.datalines
+
+    # reused when nothing changed
+    index_fig1, index_fig2, index_subfig, index_line = m_fig1.get_index(), m_fig2.get_index(), m_subfig.get_index(), line1.get_index()
+    assert m_fig1.get_index() is index_fig1 and m_subfig.get_index() is index_subfig and line1.get_index() is index_line
+    assert select_names(css.TypeSelector('line'), m_subfig) == ['line1', 'line2']
+
+    # added
+    cmd_handler.proc_lines(['hold on\n', 'plot example/test-data.txt t:($y1*2)\n'])
+    assert select_names(css.TypeSelector('line'), m_subfig) == ['line1', 'line2', 'line3']
+    assert select_names(css.TypeSelector('line'), m_fig1) == ['line1', 'line2', 'line3']
+    assert m_fig2.get_index() is index_fig2     # other figures are not affected
+    assert line1.get_index() is index_line      # neither are siblings
+    line3 = m_subfig.datalines[2]
+
+    # renamed
+    cmd_handler.proc_lines(['remove line1\n'])
+    assert select_names(css.NameSelector('line1'), m_fig1) == ['line1']
+    assert [e for e, p in css.NameSelector('line1').select(m_fig1)] == [line2]
+    assert [e for e, p in css.NameSelector('line2').select(m_subfig)] == [line3]
+    assert css.NameSelector('line3').select(m_subfig) == []
+
+    # reclassed
+    cmd_handler.proc_lines(['set line2 +highlight\n'])
+    assert [e for e, p in css.ClassSelector('highlight').select(m_fig1)] == [line3]
+    cmd_handler.proc_lines(['set line2 -highlight\n'])
+    assert css.ClassSelector('highlight').select(m_fig1) == []
+    cmd_handler.proc_lines(['set gca +highlight\n'])
+    assert [e for e, p in css.ClassTypeSelector('highlight', 'line').select(m_fig1)] == [line2, line3]
+
+    index_fig1, index_subfig = m_fig1.get_index(), m_subfig.get_index()
+    cmd_handler.proc_lines(['set line1 color=red\n', 'display\n'])
+    assert m_fig1.get_index() is index_fig1 and m_subfig.get_index() is index_subfig
+    assert m_fig2.get_index() is index_fig2
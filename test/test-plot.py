@@ -24,3 +24,30 @@ line.clear()
 line.hist(np.random.rand(100), label='hist', norm='count')
 
 line.show()
+
+# decimation keeps the first, last, minimum and maximum points of every column
+from line import stat_util
+from line.backend import mpl
+
+x = np.sort(np.random.rand(20000))
+y = np.random.randn(20000)
+lo, hi, columns = 0.1, 0.9, 50
+kept = stat_util.minmax_decimate(x, y, lo, hi, columns)
+col = np.clip(np.floor((x - lo) * (columns / (hi - lo))), -1, columns)
+assert np.array_equal(np.unique(col[kept]), np.unique(col))
+for c in np.unique(col):
+    idx = np.flatnonzero(col == c)
+    m_kept = kept[col[kept] == c]
+    assert len(m_kept) <= 4
+    assert idx[0] in m_kept and idx[-1] in m_kept
+    assert y[m_kept].min() == y[idx].min() and y[m_kept].max() == y[idx].max()
+
+line.clear()
+l1 = line.plot(x, y, decimate=100)
+l2 = line.plot(x, y, decimate='none')
+line.show()
+dx, dy = mpl._get_decimated_data(l1, line.gca().axes[0], None)
+assert 4 < len(dx) <= 4 * 102 and dx[0] == x[0] and dx[-1] == x[-1]
+assert dy.min() == y.min() and dy.max() == y.max()
+dx, dy = mpl._get_decimated_data(l2, line.gca().axes[0], None)
+assert dx is l2.data.get_x() and dy is l2.data.get_y()
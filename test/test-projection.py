@@ -0,0 +1,66 @@
+import sys
+import os
+import tempfile
+sys.path.append('..')
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+
+from line import defaults, terminal, plot_proc
+
+# Plotting files with only the columns referred by expressions must give the same data as loading them entirely.
+
+def get_plotted(commands, project):
+    loaded = []
+    load_file = plot_proc.model.load_file
+    get_columns = plot_proc.PlotParser._get_columns
+
+    def load_and_record(*filenames, **kwargs):
+        r = load_file(*filenames, **kwargs)
+        loaded.append(r.positions)
+        return r
+
+    plot_proc.model.load_file = load_and_record
+    if not project:
+        plot_proc.PlotParser._get_columns = lambda self, expr: None
+    try:
+        cmd_handler = terminal.CMDHandler()
+        cmd_handler.proc_lines(commands)
+        datalines = cmd_handler.m_state.cur_subfigure().datalines
+        plotted = [(l.get_style('label'), np.asarray(l.data.get_x()), np.asarray(l.data.get_y())) for l in datalines]
+    finally:
+        plot_proc.model.load_file = load_file
+        plot_proc.PlotParser._get_columns = get_columns
+    return plotted, loaded
+
+
+if __name__ == '__main__':
+
+    defaults.default_options['prompt-overwrite'] = False
+    terminal.CMDHandler._debug = True   # raise errors
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = os.path.join(tmpdir, 'data.txt')
+        x = np.linspace(0, 1, 20)
+        np.savetxt(filename, np.array([x, x**2, np.sin(x), np.cos(x), np.exp(x)]).T,
+            header='a b c d e', comments='')
+
+        for plot in (
+            'plot %s 1:2, 1:4',                             # numbered columns
+            'plot %s a:c, a:e',                             # named columns
+            'plot %s d:3',                                  # both
+            'plot %s $0:$5, 2',                             # index
+            'plot %s 1:(col(\'e\')+1), b:sin(col(4))',      # expressions
+            'plot %s 1:2, a:($4*2), ($5-1)',                # expressions of columns not plotted directly
+            'plot %s a:cols(\'[cd]\')',                     # columns that cannot be determined
+            ):
+            commands = [plot % filename + '\n']
+            projected, projected_positions = get_plotted(commands, True)
+            full, full_positions = get_plotted(commands, False)
+            assert all(p is None for p in full_positions)
+            if 'cols' in plot:
+                assert projected_positions == [None], projected_positions
+            else:
+                assert len(projected_positions) == 1 and projected_positions[0] is not None, projected_positions
+            assert len(projected) == len(full) > 0, plot
+            for p, f in zip(projected, full):
+                assert p[0] == f[0] and np.array_equal(p[1], f[1]) and np.array_equal(p[2], f[2]), (plot, p, f)
@@ -0,0 +1,210 @@
+import sys
+import os
+import tempfile
+sys.path.append('..')
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.colors
+
+from line import terminal, backend, errors
+from line.backend import mpl
+
+# Artists and axes of the backend are kept between renders, and updated as the elements change.
+
+def check_lines(m_subfig):
+    """ Each line is drawn by exactly one artist, and no other line is left in the axes.
+    """
+    artists = [l.backend for l in m_subfig.datalines]
+    assert len(set(artists)) == len(artists) and None not in artists
+    assert set(m_subfig.backend.lines) == set(artists), (m_subfig.backend.lines, artists)
+    return artists
+
+
+def record_updates():
+    """ Record how subfigures are updated: 'blit' or 'full'.
+    """
+    updates = []
+    blit_subfigure = mpl._blit_subfigure
+    update_subfigure = mpl._update_subfigure
+
+    def blit_and_record(m_subfig):
+        ret = blit_subfigure(m_subfig)
+        if ret:
+            updates.append('blit')
+        return ret
+
+    def update_and_record(*args):
+        updates.append('full')
+        return update_subfigure(*args)
+
+    mpl._blit_subfigure = blit_and_record
+    mpl._update_subfigure = update_and_record
+    return updates
+
+
+def record_saves():
+    """ Record `simplify_threshold' of paths of lines in the current figure when it is saved.
+    """
+    saves = []
+    savefig = mpl.plt.savefig
+
+    def save_and_record(filename, **kwargs):
+        saves.append([l.backend.get_path().simplify_threshold for s in m_state.cur_figure().subfigures
+            for l in s.datalines])
+        return savefig(filename, **kwargs)
+
+    mpl.plt.savefig = save_and_record
+    return saves
+
+
+def render(cmd_handler, *lines):
+    """ Run lines as typed in interactive mode, where the figure is rendered after each command.
+    """
+    for line in lines:
+        cmd_handler.handle_line(line + '\n', cmd_handler.token_buffer, cmd_handler.token_begin_pos)
+        cmd_handler.token_buffer.clear()
+        cmd_handler.token_begin_pos.clear()
+
+
+if __name__ == '__main__':
+
+    os.chdir('..')
+    terminal.CMDHandler._debug = True   # raise errors
+    cmd_handler = terminal.CMDHandler()
+    m_state = cmd_handler.m_state
+    m_state.is_interactive = True
+    backend.initialize(m_state, silent=True)
+
+    # retained lines
+    render(cmd_handler, 'plot example/test-data.txt t:y1, t:y2, t:($y1*2)')
+    m_subfig = m_state.cur_subfigure()
+    line1, line2, line3 = m_subfig.datalines
+    artist1, artist2, artist3 = check_lines(m_subfig)
+
+    render(cmd_handler, 'set line1 color=red linewidth=3')
+    assert check_lines(m_subfig) == [artist1, artist2, artist3]
+    assert matplotlib.colors.to_rgb(artist1.get_color()) == (1.0, 0.0, 0.0) and artist1.get_linewidth() == 3
+
+    render(cmd_handler, 'set line2 visible=false')
+    assert check_lines(m_subfig) == [artist1, artist2, artist3]
+    assert not artist2.get_visible() and artist1.get_visible()
+
+    render(cmd_handler, 'update line3 example/test-data.txt t:y2')
+    assert check_lines(m_subfig) == [artist1, artist2, artist3]
+    assert list(artist3.get_ydata()) == list(line3.data.get_y())
+
+    render(cmd_handler, 'remove line1')
+    assert check_lines(m_subfig) == [artist2, artist3]
+    assert artist1.axes is None
+
+    render(cmd_handler, 'clear')
+    assert check_lines(m_subfig) == []
+
+    # twin axes are kept while enabled, and removed when disabled
+    render(cmd_handler, 'plot example/test-data.txt t:y1')
+    m_subfig = m_state.cur_subfigure()
+    plt_fig = m_state.cur_figure().backend
+    assert plt_fig.axes == [m_subfig.backend]
+    for i in range(3):
+        render(cmd_handler, 'set y2axis enabled=true')
+        y2 = m_subfig.axes[2].backend
+        assert plt_fig.axes == [m_subfig.backend, y2]
+        render(cmd_handler, 'set x2axis enabled=true')
+        x2 = m_subfig.axes[3].backend
+        assert plt_fig.axes == [m_subfig.backend, y2, x2]
+        render(cmd_handler, 'set line1 color=blue')
+        assert plt_fig.axes == [m_subfig.backend, y2, x2]
+        assert m_subfig.axes[2].backend is y2 and m_subfig.axes[3].backend is x2
+        render(cmd_handler, 'set y2axis enabled=false')
+        assert plt_fig.axes == [m_subfig.backend, x2] and m_subfig.axes[2].backend is None
+        render(cmd_handler, 'set x2axis enabled=false')
+        assert plt_fig.axes == [m_subfig.backend] and m_subfig.axes[3].backend is None
+    assert m_state.cur_figure().backend is plt_fig
+
+    # data-only updates with fixed ranges are blitted; changing ranges requires a full redraw
+    updates = record_updates()
+    render(cmd_handler, 'set option auto-adjust-range=false', 'plot example/test-data.txt t:y1, t:y2',
+        'set xrange=0:3 yrange=-10:10')
+    m_subfig = m_state.cur_subfigure()
+    line1 = m_subfig.datalines[0]
+    artist1 = line1.backend
+    for k in range(2, 5):
+        del updates[:]
+        render(cmd_handler, 'update line1 example/test-data.txt t:($y1*%d)' % k, 'pause 0.01')
+        assert updates == ['blit'], updates
+        assert line1.backend is artist1 and list(artist1.get_ydata()) == list(line1.data.get_y())
+        assert m_subfig.axes[1].attr('range')[:2] == (-10, 10)
+
+    render(cmd_handler, 'set option auto-adjust-range=true')
+    for k in range(5, 8):
+        del updates[:]
+        render(cmd_handler, 'update line1 example/test-data.txt t:($y1*%d)' % k)
+        assert 'blit' not in updates and updates, updates
+        assert line1.backend is artist1 and list(artist1.get_ydata()) == list(line1.data.get_y())
+        assert m_subfig.axes[1].attr('range')[1] >= max(line1.data.get_y())
+
+    # measured extents of texts follow changes of font, instead of hitting stale cached ones
+    def frame_of(element):
+        r = element.attr('frame')
+        return (r.x, r.y, r.width, r.height)
+
+    render(cmd_handler, 'plot example/test-data.txt t:y1', 'title "Hello world"', 'xlabel "time"')
+    m_subfig = m_state.cur_subfigure()
+    title_frame = frame_of(m_subfig.title)
+    render(cmd_handler, 'set title fontsize=30')
+    assert frame_of(m_subfig.title)[3] > title_frame[3]
+    label_frame = frame_of(m_subfig.axes[0].label)
+    render(cmd_handler, 'set xlabel fontfamily=monospace')
+    assert frame_of(m_subfig.axes[0].label)[2] != label_frame[2]
+
+    # same as measured without caches
+    frames = frame_of(m_subfig.title), frame_of(m_subfig.axes[0].label)
+    for f in (mpl._get_font_properties, mpl._get_text_extent, mpl._get_legend_extent):
+        f.cache_clear()
+    render(cmd_handler, 'set title fontsize=12', 'set title fontsize=30')
+    assert (frame_of(m_subfig.title), frame_of(m_subfig.axes[0].label)) == frames
+
+    # rasterized above `rasterize-threshold' in vector outputs, unless style `rasterize' is set
+    render(cmd_handler, 'set option rasterize-threshold=10', 'plot example/test-data.txt t:y1, t:y2',
+        'fill line1', 'hold on', 'hist example/test-data.txt y1 bin=5')
+    m_subfig = m_state.cur_subfigure()
+    line1, line2 = m_subfig.datalines
+    polygon1, bar1 = m_subfig.polygons[0], m_subfig.bars[0]
+    assert len(line1.data.get_x()) > 10 and len(bar1.backend) < 10
+    assert line1.backend.get_rasterized() and line2.backend.get_rasterized()
+    assert all(p.get_rasterized() for p in polygon1.backend)
+    assert not any(p.get_rasterized() for p in bar1.backend)
+
+    render(cmd_handler, 'set option rasterize-threshold=3', 'set line1 rasterize=false')
+    assert not line1.backend.get_rasterized() and line2.backend.get_rasterized()
+    assert all(p.get_rasterized() for p in bar1.backend)
+
+    render(cmd_handler, 'set option rasterize-threshold=100', 'set line1 rasterize=true')
+    assert line1.backend.get_rasterized() and not line2.backend.get_rasterized()
+    assert not any(p.get_rasterized() for p in polygon1.backend)
+    assert not any(p.get_rasterized() for p in bar1.backend)
+
+    render(cmd_handler, 'set option rasterize-threshold=0', 'set line1 rasterize=auto')
+    assert not line1.backend.get_rasterized() and not line2.backend.get_rasterized()
+
+    # vector outputs are simplified by `simplify-threshold', and lines are simplified as before afterwards
+    screen_threshold = matplotlib.rcParams['path.simplify_threshold']
+    saves = record_saves()
+    render(cmd_handler, 'set option simplify-threshold=0.8')
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for ext, threshold in (('pdf', 0.8), ('svg', 0.8), ('png', screen_threshold)):
+            del saves[:]
+            render(cmd_handler, 'save %s' % os.path.join(tmpdir, 'simplify.' + ext))
+            assert saves == [[threshold, threshold]], saves
+            assert [l.backend.get_path().simplify_threshold for l in m_subfig.datalines] == \
+                [screen_threshold, screen_threshold]
+    render(cmd_handler, 'set option simplify-threshold=0.25')
+
+    # options out of range are rejected, instead of failing when saving
+    try:
+        render(cmd_handler, 'set option simplify-threshold=2')
+    except errors.LineParseError:
+        pass
+    else:
+        assert False, 'simplify-threshold out of range is accepted'
+    assert m_state.options['simplify-threshold'] == 0.25
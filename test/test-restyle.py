@@ -0,0 +1,90 @@
+import sys
+import os
+sys.path.append('..')
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+
+from line import terminal
+from line.style import css
+
+# After rendering, changing the style of an element recomputes only that element,
+# and gives the same styles as recomputing the whole figure.
+
+restyled = []
+_compute_element_style = css._compute_element_style
+
+def compute_and_record(stylable, *args):
+    restyled.append(stylable)
+    return _compute_element_style(stylable, *args)
+
+
+def value_equal(v1, v2):
+    if callable(v1):    # formatters are recreated
+        return callable(v2)
+    elif isinstance(v1, np.ndarray):
+        return np.array_equal(v1, v2)
+    return v1 == v2
+
+def style_equal(s1, s2):
+    return s1.keys() == s2.keys() and all(value_equal(s1[d], s2[d]) for d in s1)
+
+def get_styles(m_fig):
+    return [(e, dict(e.computed_style)) for e in m_fig.get_index().elements]
+
+def restyle_all(m_state):
+    m_fig = m_state.cur_figure()
+    styles = get_styles(m_fig)
+    m_fig.applied_style_key = None      # reset and reapply all stylesheets
+    for e, s in styles:
+        e.last_exported_style = None    # recompute all elements
+        e.mark_style_dirty()
+    m_state.refresh_style(True)
+    return styles
+
+
+if __name__ == '__main__':
+
+    os.chdir('..')
+    terminal.CMDHandler._debug = True   # raise errors
+    cmd_handler = terminal.CMDHandler()
+    m_state = cmd_handler.m_state
+    cmd_handler.proc_lines([
+        'plot example/test-data.txt t:y1, t:y2, t:($y1*2)\n',
+        'text "abc" 0.5,0.5\n',
+        'display\n',
+    ])
+    m_subfig = m_state.cur_subfigure()
+    line1, line2, line3 = m_subfig.datalines
+
+    css._compute_element_style = compute_and_record
+    try:
+        cmd_handler.proc_lines(['set line1 color=red linewidth=3\n'])
+        m_state.refresh_style(True)
+        assert restyled == [line1], restyled
+        assert line1.attr('linecolor') == (1.0, 0.0, 0.0) and line1.attr('linewidth') == 3
+
+        # palette colors (selected by colorid) are reapplied to the changed element only
+        del restyled[:]
+        cmd_handler.proc_lines(['set line2 colorid=3\n'])
+        m_state.refresh_style(True)
+        assert restyled == [line2], restyled
+        assert line2.attr('linecolor') == line3.attr('linecolor')
+
+        # nothing changed
+        del restyled[:]
+        m_state.refresh_style(True)
+        assert restyled == []
+
+        # only data is changed, so are the axes
+        del restyled[:]
+        cmd_handler.proc_lines(['update line3 example/test-data.txt t:($y1*4)\n'])
+        m_state.refresh_style(True)
+        assert set(restyled) == set(m_subfig.axes), restyled
+        assert m_subfig.axes[1].attr('range')[1] >= 4.0
+    finally:
+        css._compute_element_style = _compute_element_style
+
+    styles = restyle_all(m_state)
+    for e, s in styles:
+        assert style_equal(s, e.computed_style), (e.name, s, e.computed_style)
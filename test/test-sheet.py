@@ -0,0 +1,38 @@
+import sys
+import os
+import tempfile
+sys.path.append('..')
+import numpy as np
+
+from line.model import io as model_io
+from line.model.sheet import SourceableSheet
+
+# Sheets share data with their sources, and copy it before being modified.
+
+if __name__ == '__main__':
+
+    os.chdir('..')
+    a = model_io.load_file('example/test-data.txt')
+    y1 = a.to_numpy()[:, 1].copy()
+
+    b = a[2]
+    c = a.copy()
+    b[1] = 0.0
+    c['y1'] = 1.0
+    c[1:3] = -1.0
+    assert (b.to_numpy() == 0).all()
+    assert (c.to_numpy()[3:, 1] == 1).all() and (c.to_numpy()[1:3] == -1).all()
+    assert np.array_equal(a.to_numpy()[:, 1], y1)
+
+    # a shared memory-mapped file is never written
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = os.path.join(tmpdir, 'data.npy')
+        np.save(filename, np.arange(10.0).reshape(5, 2))
+        m = model_io.load_file(filename)
+        n = SourceableSheet(m)
+        n[1] = 5.0
+        n[(slice(0, 2), 1)] = 6.0
+        assert np.array_equal(n.to_numpy(), [[5, 6], [5, 6], [5, 5], [5, 7], [5, 9]])
+        assert np.array_equal(m.to_numpy(), np.arange(10.0).reshape(5, 2))
+        assert np.array_equal(np.load(filename), np.arange(10.0).reshape(5, 2))
+        del m, n
@@ -0,0 +1,61 @@
+import sys
+import os
+import tempfile
+sys.path.append('..')
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+
+from line import terminal
+
+# Plotting a large file by streaming keeps the extents of the full plot, but only for lines.
+
+def plot_extents(cmd_handler, command):
+    cmd_handler.proc_lines([command, 'display\n'])
+    m_subfig = cmd_handler.m_state.cur_subfigure()
+    return [(l.data.get_x().min(), l.data.get_x().max(), l.data.get_y().min(), l.data.get_y().max())
+        for l in m_subfig.datalines], [a.attr('range')[:2] for a in m_subfig.axes[:2]]
+
+
+if __name__ == '__main__':
+
+    os.chdir('..')
+    terminal.CMDHandler._debug = True   # raise errors
+    cmd_handler = terminal.CMDHandler()
+    m_state = cmd_handler.m_state
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = os.path.join(tmpdir, 'stream.txt')
+        t = np.arange(50000)
+        y = np.sin(t / 100) + np.random.RandomState(0).normal(size=len(t))
+        np.savetxt(filename, np.array([t, y, -y]).T, header='t y z', comments='')
+
+        for command in ('plot %s t:y, t:z\n' % filename, 'plot %s y\n' % filename):
+            cmd_handler.proc_lines(['set option stream-threshold=0\n'])
+            full_extents = plot_extents(cmd_handler, command)
+            assert not m_state.cur_subfigure().datalines[0].data.reduced
+            cmd_handler.proc_lines(['set option stream-threshold=0.1\n'])
+            streamed_extents = plot_extents(cmd_handler, command)
+            line1 = m_state.cur_subfigure().datalines[0]
+            assert line1.data.reduced and len(line1.data.get_y()) < len(y)
+            assert streamed_extents == full_extents, (streamed_extents, full_extents)
+
+        # reduced lines cannot be fitted
+        try:
+            cmd_handler.proc_lines(['fit line1\n'])
+        except ValueError:
+            pass
+        else:
+            assert False, 'reduced line is fitted'
+
+        # points are not reduced
+        cmd_handler.proc_lines(['plot %s t:y o\n' % filename])
+        line1 = m_state.cur_subfigure().datalines[0]
+        assert not line1.data.reduced and len(line1.data.get_y()) == len(y)
+        cmd_handler.proc_lines(['update line1 %s t:z\n' % filename])
+        assert not line1.data.reduced and len(line1.data.get_y()) == len(y)
+
+        cmd_handler.proc_lines(['plot %s t:y\n' % filename, 'update line1 %s t:z\n' % filename])
+        line1 = m_state.cur_subfigure().datalines[0]
+        assert line1.data.reduced and np.isclose(np.max(line1.data.get_y()), np.max(-y))
+        cmd_handler.proc_lines(['set option stream-threshold=0\n'])